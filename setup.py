@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # Note: Do not embed any non-ASCII characters in this file until pip has been
 # fixed. See https://github.com/xonsh/xonsh/issues/487.
+import glob
 import os
 import subprocess
 import sys
@@ -20,6 +21,11 @@ TABLES = [
 ]
 
 
+def table_files():
+    """The legacy table modules and the versioned parser tables."""
+    return TABLES + glob.glob("xonsh/*.lrtab")
+
+
 def python_tag():
     ver = sys.version_info
     return f"py{ver.major}{ver.minor}"
@@ -27,7 +33,7 @@ def python_tag():
 
 def clean_tables():
     """Remove the lexer/parser modules that are dynamically created."""
-    for f in TABLES:
+    for f in table_files():
         if os.path.isfile(f):
             os.remove(f)
             print("Removed " + f)
@@ -167,7 +173,7 @@ class xsdist(sdist):
         clean_tables()
         build_tables()
         dirty = dirty_version()
-        files.extend(TABLES)
+        files.extend(table_files())
         super().make_release_tree(basedir, files)
         if dirty:
             restore_version()
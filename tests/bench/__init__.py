@@ -0,0 +1,5 @@
+"""Benchmarks for the xonsh front-end (lexer, parsers, execer, code cache).
+
+Run them with ``python -m tests.bench`` from the repository root; see
+``python -m tests.bench --help`` for the options.
+"""
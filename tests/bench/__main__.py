@@ -0,0 +1,73 @@
+"""Command line interface of the front-end benchmarks::
+
+    python -m tests.bench -o before.json
+    python -m tests.bench -o after.json --compare before.json
+"""
+import argparse
+import json
+import sys
+
+from tests.bench.suite import (
+    BENCHMARKS,
+    Context,
+    compare,
+    format_results,
+    load_results,
+    run_benchmarks,
+)
+from xonsh.built_ins import XSH
+from xonsh.execer import Execer
+
+
+def main(args=None):
+    p = argparse.ArgumentParser("python -m tests.bench", description=__doc__)
+    p.add_argument("-o", "--output", help="write the JSON results to this file")
+    p.add_argument(
+        "-k",
+        dest="names",
+        action="append",
+        help="only run benchmarks whose name contains this (repeatable)",
+    )
+    p.add_argument("--repeat", type=int, default=5, help="rounds per benchmark")
+    p.add_argument(
+        "--min-time", type=float, default=0.2, help="minimum seconds per round"
+    )
+    p.add_argument("--compare", help="JSON results of a previous run to compare to")
+    p.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="slowdown ratio reported as a regression, default: 1.1",
+    )
+    p.add_argument("--list", action="store_true", help="list the benchmarks")
+    ns = p.parse_args(args)
+    if ns.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    execer = Execer(filename="<bench>")
+    XSH.load(ctx={}, execer=execer)
+    try:
+        results = run_benchmarks(
+            Context(execer), names=ns.names, repeat=ns.repeat, min_time=ns.min_time
+        )
+    finally:
+        XSH.unload()
+    print(format_results(results), file=sys.stderr)
+    if ns.output:
+        with open(ns.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    else:
+        json.dump(results, sys.stdout, indent=1)
+    if not ns.compare:
+        return 0
+    regressed = False
+    for name, ratio, slower in compare(load_results(ns.compare), results, ns.threshold):
+        mark = "REGRESSION" if slower else ""
+        print(f"{name:<32} {ratio:6.2f}x {mark}", file=sys.stderr)
+        regressed |= slower
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
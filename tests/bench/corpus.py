@@ -0,0 +1,112 @@
+"""The corpus of realistic xonsh code that the benchmarks run over."""
+import os
+import random
+import typing as tp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SKIP_DIRS = frozenset([".git", "__pycache__", "build", "dist", "node_modules"])
+
+
+class Source(tp.NamedTuple):
+    """A named piece of xonsh code."""
+
+    name: str
+    kind: str
+    """One of ``xsh``, ``xontrib`` or ``synthetic``."""
+    code: str
+
+    @property
+    def lines(self):
+        return [l for l in self.code.splitlines() if l.strip()]
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        code = f.read()
+    return code if code.endswith("\n") else code + "\n"
+
+
+def xsh_files(root=ROOT):
+    """The ``.xsh`` files that ship with the repository."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for fname in sorted(filenames):
+            if fname.endswith(".xsh"):
+                path = os.path.join(dirpath, fname)
+                yield Source(os.path.relpath(path, root), "xsh", _read(path))
+
+
+def xontrib_files(root=ROOT):
+    """The bundled xontribs."""
+    xontribs = os.path.join(root, "xontrib")
+    for fname in sorted(os.listdir(xontribs)):
+        if fname.endswith((".py", ".xsh")):
+            path = os.path.join(xontribs, fname)
+            yield Source(os.path.relpath(path, root), "xontrib", _read(path))
+
+
+COMMANDS = [
+    "ls -la {path}",
+    "git status --short",
+    "git log --oneline -n {n} {path}",
+    "grep -rn {word} {path} | sort | uniq -c",
+    "cat {path} | wc -l",
+    "find {path} -name '*.py' -newer {path}",
+    "echo $HOME $PATH @(x + 1)",
+    "cp -r {path} /tmp/{word}-backup",
+    "tar czf {word}.tar.gz {path} 2>/dev/null",
+    "make -j{n} {word} 2>&1 | tee build.log",
+    "docker run --rm -v $PWD:/src {word}:latest",
+    "rsync -avz --exclude .git {path} host:/srv/{word}",
+    "curl -sSL https://example.com/{word}?page={n} > out.json",
+    "python -m pytest -x -k {word} {path}",
+    "ps aux | grep {word} | head -n {n}",
+    "echo @$(which {word}) $(date)",
+    "du -sh {word}/* e>o | sort -h",
+    "ssh host 'cd {path} && ls'",
+    "sed -i 's/{word}/x/g' {path}",
+]
+WORDS = ["xonsh", "main", "build", "test", "deploy", "foo", "bar", "parser"]
+PATHS = ["src", "./docs", "~/projects/xonsh", "/var/log", "tests/*.py", "`.*py`"]
+
+
+def synthetic_script(seed, nlines=120):
+    """A deterministic, subprocess-heavy script mixing bare commands,
+    captured subprocesses and python control flow.
+    """
+    rng = random.Random(seed)
+
+    def cmd():
+        return rng.choice(COMMANDS).format(
+            path=rng.choice(PATHS), word=rng.choice(WORDS), n=rng.randint(1, 64)
+        )
+
+    lines = ["x = 41", "files = []"]
+    while len(lines) < nlines:
+        choice = rng.random()
+        if choice < 0.55:
+            lines.append(cmd())
+        elif choice < 0.7:
+            lines.append(f"out = $({cmd()})")
+        elif choice < 0.8:
+            lines.append(f"$VAR_{rng.randint(0, 9)} = '{rng.choice(WORDS)}'")
+        elif choice < 0.9:
+            lines.append(f"for f in g`{rng.choice(WORDS)}*`:")
+            lines.append(f"    {cmd()}")
+            lines.append("    files.append(f)")
+        else:
+            lines.append(f"if !({cmd()}):")
+            lines.append(f"    print({rng.choice(WORDS)!r}, x)")
+            lines.append("else:")
+            lines.append(f"    {cmd()}")
+    return "\n".join(lines) + "\n"
+
+
+def synthetic_files(count=4):
+    for seed in range(count):
+        yield Source(f"synthetic-{seed}.xsh", "synthetic", synthetic_script(seed))
+
+
+def load_corpus(root=ROOT):
+    """The whole corpus as a list of ``Source`` objects."""
+    return [*xsh_files(root), *xontrib_files(root), *synthetic_files()]
@@ -0,0 +1,335 @@
+"""Benchmark definitions and a small runner producing JSON results."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import typing as tp
+
+from tests.bench.corpus import ROOT, load_corpus
+from tests.completers.test_bash_completer import STUB_COMPLETION
+from xonsh import __version__ as XONSH_VERSION
+from xonsh import codecache
+from xonsh.completers.bash_completion import bash_completions
+from xonsh.lexer import Lexer, get_tokens
+from xonsh.parsers.completion_context import CompletionContextParser
+
+BENCHMARKS: tp.Dict[str, tp.Callable] = {}
+
+
+def benchmark(name):
+    """Registers a benchmark factory.  The factory takes a ``Context`` and
+    returns a ``(func, ninputs)`` tuple, where calling ``func()`` once runs
+    the benchmark over ``ninputs`` inputs.
+    """
+
+    def decorator(factory):
+        BENCHMARKS[name] = factory
+        return factory
+
+    return decorator
+
+
+class Context:
+    """Everything the benchmarks share: the corpus, an execer and a
+    scratch directory for the code cache.
+    """
+
+    def __init__(self, execer, corpus=None, tmpdir=None):
+        self.execer = execer
+        self.corpus = load_corpus() if corpus is None else corpus
+        self.tmpdir = tmpdir or tempfile.mkdtemp(prefix="xonsh-bench-")
+        self._parseable = None
+        self._compilable = None
+
+    @property
+    def lines(self):
+        return [line for src in self.corpus for line in src.lines]
+
+    def _filter(self, check):
+        ok = []
+        for src in self.corpus:
+            try:
+                check(src.code)
+            except Exception:
+                # not every file in the repo is valid in this Python version
+                continue
+            ok.append(src)
+        return ok
+
+    @property
+    def parseable(self):
+        """Sources the context-free parser accepts."""
+        if self._parseable is None:
+            self._parseable = self._filter(self.execer.parser.parse)
+        return self._parseable
+
+    @property
+    def compilable(self):
+        """Sources the execer can compile with context transformation."""
+        if self._compilable is None:
+            self._compilable = self._filter(self.compile)
+        return self._compilable
+
+    def compile(self, code, transform=True):
+        return self.execer.compile(
+            code, glbs={}, locs={}, filename="<bench>", transform=transform
+        )
+
+
+@benchmark("lexer.split")
+def bench_lexer_split(ctx):
+    lexer = Lexer()
+    lines = ctx.lines
+
+    def run():
+        for line in lines:
+            lexer.split(line)
+
+    return run, len(lines)
+
+
+@benchmark("lexer.get_tokens")
+def bench_get_tokens(ctx):
+    codes = [src.code for src in ctx.corpus]
+
+    def run():
+        for code in codes:
+            for _ in get_tokens(code, False):
+                pass
+
+    return run, len(codes)
+
+
+@benchmark("parser.parse")
+def bench_parser_parse(ctx):
+    parse = ctx.execer.parser.parse
+    codes = [src.code for src in ctx.parseable]
+
+    def run():
+        for code in codes:
+            parse(code)
+
+    return run, len(codes)
+
+
+@benchmark("execer.compile")
+def bench_execer_compile(ctx):
+    codes = [src.code for src in ctx.compilable]
+
+    def run():
+        for code in codes:
+            ctx.compile(code)
+
+    return run, len(codes)
+
+
+@benchmark("execer.compile.no_transform")
+def bench_execer_compile_no_transform(ctx):
+    codes = [src.code for src in ctx.parseable]
+
+    def run():
+        for code in codes:
+            ctx.compile(code, transform=False)
+
+    return run, len(codes)
+
+
+@benchmark("execer.compile.lines")
+def bench_execer_compile_lines(ctx):
+    """Line by line, as the interactive shell sees the input."""
+    lines = []
+    for line in ctx.lines:
+        if line[0].isspace() or line.rstrip().endswith(":"):
+            continue
+        try:
+            ctx.compile(line + "\n")
+        except Exception:
+            continue
+        lines.append(line + "\n")
+
+    def run():
+        for line in lines:
+            ctx.compile(line)
+
+    return run, len(lines)
+
+
+@benchmark("completion_context.parse")
+def bench_completion_context(ctx):
+    parser = CompletionContextParser()
+    lines = ctx.lines
+
+    def run():
+        for line in lines:
+            parser.parse(line, len(line))
+            parser.parse(line, len(line) // 2)
+
+    return run, 2 * len(lines)
+
+
+@benchmark("codecache.code_cache_check")
+def bench_code_cache_hit(ctx):
+    names = []
+    for i, src in enumerate(ctx.compilable):
+        cachefname = os.path.join(ctx.tmpdir, f"code-{i}")
+        codecache.update_cache(ctx.compile(src.code), cachefname)
+        names.append(cachefname)
+
+    def run():
+        for cachefname in names:
+            hit, _ = codecache.code_cache_check(cachefname)
+            assert hit
+
+    return run, len(names)
+
+
+@benchmark("codecache.script_cache_check")
+def bench_script_cache_hit(ctx):
+    pairs = []
+    for i, src in enumerate(ctx.compilable):
+        filename = os.path.join(ctx.tmpdir, f"script-{i}.xsh")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(src.code)
+        cachefname = filename + ".cache"
+        codecache.update_cache(ctx.compile(src.code), cachefname)
+        pairs.append((filename, cachefname))
+
+    def run():
+        for filename, cachefname in pairs:
+            hit, _ = codecache.script_cache_check(filename, cachefname)
+            assert hit
+
+    return run, len(pairs)
+
+
+def _bench_bash_completion(ctx, worker):
+    script = os.path.join(ctx.tmpdir, "stub_completion.bash")
+    with open(script, "w", encoding="utf-8") as f:
+        f.write(STUB_COMPLETION)
+    env = dict(os.environ)
+
+    def run():
+        bash_completions("a", "stub a", 5, 6, env=env, paths=[script], worker=worker)
+
+    return run, 1
+
+
+@benchmark("bash_completion.one_shot")
+def bench_bash_completion_one_shot(ctx):
+    return _bench_bash_completion(ctx, worker=False)
+
+
+@benchmark("bash_completion.worker")
+def bench_bash_completion_worker(ctx):
+    return _bench_bash_completion(ctx, worker=True)
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Times ``func``, calling it often enough per round to take at least
+    ``min_time`` seconds.  Returns the number of calls per round and the
+    per-call times of each round.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed * 10 >= min_time else 10
+    return number, [t / number for t in timer.repeat(repeat, number)]
+
+
+def path_fractions(counts):
+    """The fraction of the inputs that took each parse path of the execer."""
+    total = sum(counts.values())
+    return {path: n / total for path, n in sorted(counts.items())} if total else {}
+
+
+def git_commit():
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode().strip()
+
+
+def run_benchmarks(ctx, names=None, repeat=5, min_time=0.2):
+    """Runs the selected benchmarks and returns the JSON-serializable results."""
+    results = []
+    for name, factory in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        func, ninputs = factory(ctx)
+        ctx.execer.parse_paths.clear()
+        number, times = measure(func, repeat=repeat, min_time=min_time)
+        results.append(
+            {
+                "name": name,
+                "inputs": ninputs,
+                "number": number,
+                "repeat": repeat,
+                "min": min(times),
+                "median": statistics.median(times),
+                "mean": statistics.mean(times),
+                "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "parse_paths": path_fractions(ctx.execer.parse_paths),
+            }
+        )
+    return {
+        "meta": {
+            "xonsh": XONSH_VERSION,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": sys.platform,
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+            "corpus": {
+                kind: sum(1 for src in ctx.corpus if src.kind == kind)
+                for kind in ("xsh", "xontrib", "synthetic")
+            },
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline, current, threshold=1.1):
+    """Compares the ``min`` times of two result sets.  Returns a list of
+    ``(name, ratio, regressed)`` tuples, where ratio is current / baseline.
+    """
+    base = {b["name"]: b for b in baseline["benchmarks"]}
+    rows = []
+    for bench in current["benchmarks"]:
+        old = base.get(bench["name"])
+        if old is None or not old["min"]:
+            continue
+        ratio = bench["min"] / old["min"]
+        rows.append((bench["name"], ratio, ratio > threshold))
+    return rows
+
+
+def format_results(results):
+    lines = []
+    for b in results["benchmarks"]:
+        per_input = b["min"] / b["inputs"] if b["inputs"] else 0.0
+        lines.append(
+            f"{b['name']:<32} {b['min'] * 1e3:10.3f} ms"
+            f" {per_input * 1e6:10.1f} us/input  ({b['inputs']} inputs)"
+        )
+        paths = b.get("parse_paths")
+        if paths:
+            parts = ", ".join(f"{p} {f:.0%}" for p, f in paths.items())
+            lines.append(f"{'':<32} parse paths: {parts}")
+    return "\n".join(lines)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,47 @@
+"""Smoke tests keeping the front-end benchmarks runnable."""
+import json
+
+import pytest
+
+from tests.bench.corpus import load_corpus, synthetic_script
+from tests.bench.suite import BENCHMARKS, Context, compare, run_benchmarks
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return load_corpus()
+
+
+def test_corpus_kinds(corpus):
+    kinds = {src.kind for src in corpus}
+    assert kinds == {"xsh", "xontrib", "synthetic"}
+    assert synthetic_script(0) == synthetic_script(0)
+
+
+def test_run_benchmarks(xonsh_execer, corpus, tmp_path):
+    sample = [
+        next(src for src in corpus if src.kind == "synthetic"),
+        next(src for src in corpus if src.name.endswith("abbrevs.py")),
+    ]
+    ctx = Context(xonsh_execer, corpus=sample, tmpdir=str(tmp_path))
+    assert ctx.compilable == sample
+    assert ctx.parseable == sample[1:]
+    results = run_benchmarks(ctx, repeat=1, min_time=0)
+    results = json.loads(json.dumps(results))
+    assert [b["name"] for b in results["benchmarks"]] == list(BENCHMARKS)
+    for bench in results["benchmarks"]:
+        assert bench["inputs"] > 0
+        assert bench["min"] >= 0
+    paths = {b["name"]: b["parse_paths"] for b in results["benchmarks"]}
+    assert paths["lexer.split"] == {}
+    assert sum(paths["execer.compile.lines"].values()) == pytest.approx(1)
+    assert paths["execer.compile.no_transform"] == {"xonsh": 1.0}
+    assert results["meta"]["corpus"] == {"xsh": 0, "xontrib": 1, "synthetic": 1}
+
+
+def test_compare():
+    def results(**times):
+        return {"benchmarks": [{"name": k, "min": v} for k, v in times.items()]}
+
+    rows = compare(results(a=1.0, b=1.0), results(a=1.5, b=0.9, c=1.0))
+    assert rows == [("a", 1.5, True), ("b", 0.9, False)]
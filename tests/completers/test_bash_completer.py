@@ -1,5 +1,6 @@
 import pytest
 
+import xonsh.completers.bash_completion as bash_completion
 from xonsh.completers.bash import complete_from_bash
 from xonsh.completers.tools import RichCompletion
 from xonsh.parsers.completion_context import (
@@ -22,6 +23,8 @@ def setup(monkeypatch, tmp_path, xession):
     (tmp_path / "testdir").mkdir()
     (tmp_path / "spaced dir").mkdir()
     monkeypatch.chdir(str(tmp_path))
+    yield
+    bash_completion.close_bash_worker()
 
 
 @skip_if_on_darwin
@@ -235,7 +238,8 @@ def test_equal_sign_arg(command_context, completions, lprefix, exp_append_space)
 
 
 @pytest.fixture
-def bash_completer(fake_process):
+def bash_completer(fake_process, xession, monkeypatch):
+    monkeypatch.setitem(xession.env, "BASH_COMPLETIONS_WORKER", False)
     fake_process.register_subprocess(
         command=["bash", fake_process.any()],
         # completion for "git push origin :dev-b"
@@ -267,3 +271,76 @@ def test_git_delete_remote_branch(bash_completer):
         isinstance(comp, RichCompletion) and comp.append_space is False
         for comp in bash_completions
     )
+
+
+STUB_COMPLETION = """
+# stands in for the size of the bash-completion framework
+for i in {1..2000}; do eval "_stub_pad_$i() { :; }"; done
+_stub() { COMPREPLY=($(compgen -W "alpha beta gamma" -- "$2")); }
+complete -F _stub stub
+"""
+
+
+@pytest.fixture
+def stub_completion(monkeypatch, tmp_path, xession):
+    script = tmp_path / "stub_completion.bash"
+    script.write_text(STUB_COMPLETION)
+    monkeypatch.setitem(xession.env, "BASH_COMPLETIONS", [str(script)])
+    return CompletionContext(
+        CommandContext(args=(CommandArg("stub"),), arg_index=1, prefix="a")
+    )
+
+
+def _worker_pid():
+    return bash_completion._BASH_WORKER.proc.pid
+
+
+@skip_if_on_windows
+@pytest.mark.parametrize("worker", [False, True])
+def test_stub_completion(stub_completion, xession, monkeypatch, worker):
+    monkeypatch.setitem(xession.env, "BASH_COMPLETIONS_WORKER", worker)
+    for _ in range(2):
+        comps, lprefix = complete_from_bash(stub_completion)
+        assert comps == {"alpha"} and lprefix == 1
+    assert (bash_completion._BASH_WORKER is not None) == worker
+
+
+@skip_if_on_windows
+def test_worker_restarts(stub_completion, xession, monkeypatch):
+    complete_from_bash(stub_completion)
+    pid = _worker_pid()
+    monkeypatch.setitem(xession.env, "PWD", "/")
+    monkeypatch.setitem(xession.env, "LAST_RETURN_CODE", 1)
+    complete_from_bash(stub_completion)
+    assert _worker_pid() == pid
+
+    bash_completion._BASH_WORKER.proc.kill()
+    bash_completion._BASH_WORKER.proc.wait()
+    assert complete_from_bash(stub_completion)[0] == {"alpha"}
+    assert _worker_pid() != pid
+
+    pid = _worker_pid()
+    monkeypatch.setitem(xession.env, "STUB_SETTING", "1")
+    assert complete_from_bash(stub_completion)[0] == {"alpha"}
+    assert _worker_pid() != pid
+
+
+@skip_if_on_windows
+def test_worker_timeout(stub_completion, xession, monkeypatch, tmp_path):
+    script = tmp_path / "stub_completion.bash"
+    script.write_text(
+        STUB_COMPLETION
+        + "_hang() { sleep 10; }\n"
+        + "complete -F _hang hang\n"
+    )
+    complete_from_bash(stub_completion)
+    pid = _worker_pid()
+    monkeypatch.setitem(xession.env, "BASH_COMPLETIONS_TIMEOUT", 0.5)
+    hang = CompletionContext(
+        CommandContext(args=(CommandArg("hang"),), arg_index=1, prefix="a")
+    )
+    assert complete_from_bash(hang) == (set(), 0)
+    assert bash_completion._BASH_WORKER is None
+
+    assert complete_from_bash(stub_completion)[0] == {"alpha"}
+    assert _worker_pid() != pid
@@ -0,0 +1,83 @@
+import pytest
+
+from xonsh.completers import matcher
+
+
+@pytest.mark.parametrize(
+    "query, text, tier",
+    [
+        ("gi", "git", matcher.PREFIX),
+        ("it", "git", matcher.SUBSTRING),
+        ("gco", "git-checkout", matcher.SUBSEQUENCE),
+        ("ocg", "git-checkout", matcher.MISMATCH),
+        ("GI", "git", matcher.MISMATCH),
+    ],
+)
+def test_match_tier(query, text, tier):
+    assert matcher.match_tier(query, text) == tier
+
+
+def test_match_tier_ignorecase():
+    assert matcher.match_tier("GI", "git", case_sensitive=False) == matcher.PREFIX
+
+
+@pytest.mark.parametrize(
+    "query, better, worse",
+    [
+        ("fb", "foo_bar", "foobar"),  # start of a word
+        ("fb", "fooBar", "foobar"),  # camelCase hump
+        ("ab", "xab", "xaxb"),  # consecutive characters
+        ("ab", "a_b", "a__b"),  # shorter gap
+        ("Ab", "Ab", "ab"),  # case
+    ],
+)
+def test_score(query, better, worse):
+    def score(text):
+        return matcher.score(
+            text, query, matcher._positions(text.lower(), query.lower())
+        )
+
+    assert score(better) > score(worse)
+
+
+def test_rank():
+    candidates = ["logconfig", "git-checkout", "gcompris", "other", "g_c_o"]
+    assert matcher.rank("gco", candidates) == [
+        "gcompris",
+        "logconfig",
+        "g_c_o",
+        "git-checkout",
+    ]
+    assert matcher.rank("gco", candidates, limit=2) == ["gcompris", "logconfig"]
+    assert matcher.rank("", candidates, limit=2) == ["g_c_o", "gcompris"]
+
+
+def test_rank_ignorecase():
+    candidates = ["GitCheckOut", "gco", "Other"]
+    assert matcher.rank("GCO", candidates) == ["GitCheckOut"]
+    assert matcher.rank("GCO", candidates, case_sensitive=False) == [
+        "gco",
+        "GitCheckOut",
+    ]
+
+
+def test_rank_key():
+    candidates = [("b", "x"), ("ab", "y")]
+    assert matcher.rank("b", candidates, key=lambda c: c[0]) == candidates
+
+
+def test_rank_uses_shortest_window():
+    # "a" is matched just before "b", not at the start
+    assert matcher._positions("a-xxxxab", "ab") == [6, 7]
+
+
+def test_sort_key():
+    texts = ["zzz", "git-checkout", "gcompris", "logconfig"]
+    texts.sort(key=lambda t: matcher.sort_key("gco", t))
+    assert texts == ["gcompris", "logconfig", "git-checkout", "zzz"]
+
+
+@pytest.mark.parametrize("query", ["a-]", "^b", "\\"])
+def test_special_characters(query):
+    assert matcher.is_match(f"x{query[0]}y{query[1:]}", query)
+    assert not matcher.is_match("xyz", query)
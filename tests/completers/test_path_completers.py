@@ -1,9 +1,11 @@
+import os
 import tempfile
 from unittest.mock import patch
 
 import pytest
 
 import xonsh.completers.path as xcp
+from xonsh.pytest.tools import skip_if_on_windows
 
 
 @pytest.fixture(autouse=True)
@@ -106,3 +108,72 @@ def test_path_in_python_code(num_args, completion_context_parse):
         line = "@(" + inner_line
         out = xcp.complete_path(completion_context_parse(line, len(line)))
         assert out == exp
+
+
+
+def _age(path, seconds=10):
+    mtime = os.stat(path).st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """the directories listed by the cache"""
+    scanned = []
+    scan = xcp._scan
+    monkeypatch.setattr(xcp, "_scan", lambda path: scanned.append(path) or scan(path))
+    return scanned
+
+
+def test_dir_cache_reuses_unchanged_listing(tmp_path, scans):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").touch()
+    cache = xcp.DirCache()
+
+    # just modified, a change may keep the modification time
+    assert cache.listdir(tmp_path) == {"a": True, "b": False}
+    assert cache.listdir(tmp_path) == {"a": True, "b": False}
+    assert len(scans) == 2
+
+    _age(tmp_path)
+    cache.listdir(tmp_path)
+    assert cache.listdir(tmp_path) == {"a": True, "b": False}
+    assert len(scans) == 3
+
+    (tmp_path / "c").touch()
+    _age(tmp_path)
+    assert cache.listdir(tmp_path) == {"a": True, "b": False, "c": False}
+    assert len(scans) == 4
+
+
+@skip_if_on_windows
+def test_dir_view(tmp_path, xession, scans):
+    for name in ("Data", "dist", ".hidden"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "doc.txt").touch()
+    (tmp_path / "link").symlink_to(tmp_path / "dist")
+    view = xcp.DirCache().view()
+    prefix = str(tmp_path / "d")
+
+    assert set(view.startswith(prefix)) == {prefix + "ist", prefix + "oc.txt"}
+    assert len(view.startswith(prefix, csc=False)) == 3
+    assert view.startswith(str(tmp_path / ".h")) == [str(tmp_path / ".hidden")]
+    assert len(view.startswith(str(tmp_path) + os.sep, include_dotfiles=True)) == 5
+    assert view.startswith(str(tmp_path / "missing" / "d")) == []
+
+    assert view.isdir(tmp_path / "Data")
+    assert not view.isdir(tmp_path / "doc.txt")
+    assert view.isdir(tmp_path / "link")
+    assert len(scans) == 1
+
+
+def test_complete_dirs_from_listing(tmp_path, xession, completion_context_parse):
+    xession.env.update({"CASE_SENSITIVE_COMPLETIONS": True, "CDPATH": set()})
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dirfile").touch()
+    line = f"cd {tmp_path / 'di'}"
+    context = completion_context_parse(line, len(line))
+
+    completions, _ = xcp.complete_dir(context.command)
+
+    assert completions == {str(tmp_path / "dir") + os.sep}
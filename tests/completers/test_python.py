@@ -1,7 +1,19 @@
+import os
+import sys
+import threading
+import types
+
 import pytest
 
+import xonsh.completers.imports as imports
+import xonsh.completers.python as pycomp
+from xonsh.completer import invalidate_cache
 from xonsh.completers.imports import complete_import
-from xonsh.completers.python import complete_python, python_signature_complete
+from xonsh.completers.python import (
+    attr_complete,
+    complete_python,
+    python_signature_complete,
+)
 from xonsh.parsers.completion_context import CompletionContext, PythonContext
 from xonsh.pytest.tools import skip_if_pre_3_8
 
@@ -111,3 +123,159 @@ def test_complete_import(command, exp, completer_obj):
         result, _ = result
     result = set(result)
     assert result == exp
+
+
+class Proxy:
+    """an object with an expensive ``__dir__``"""
+
+    def __init__(self):
+        self.dirs = 0
+        self.loads = 0
+
+    def __dir__(self):
+        self.dirs += 1
+        return ["value", "other"]
+
+    @property
+    def value(self):
+        self.loads += 1
+        return 1
+
+
+def _attrs(prefix, ctx):
+    return attr_complete(prefix, ctx, lambda s, x: s.startswith(x))
+
+
+def test_attr_complete_cached_while_editing():
+    proxy = Proxy()
+    ctx = {"proxy": proxy}
+    assert _attrs("proxy.v", ctx) == {"proxy.value"}
+    assert _attrs("proxy.va", ctx) == {"proxy.value"}
+    assert (proxy.dirs, proxy.loads) == (1, 1)
+
+    # rebinding the name is seen at once
+    ctx["proxy"] = other = Proxy()
+    assert _attrs("proxy.va", ctx) == {"proxy.value"}
+    assert (other.dirs, other.loads) == (1, 1)
+
+    # running a command invalidates the cache
+    invalidate_cache()
+    assert _attrs("proxy.va", ctx) == {"proxy.value"}
+    assert (other.dirs, other.loads) == (2, 2)
+
+
+def test_dir_follows_new_attributes():
+    module = types.ModuleType("mod")
+    ctx = {"mod": module}
+    assert _attrs("mod.a", ctx) == set()
+    module.added = 1
+    assert _attrs("mod.a", ctx) == {"mod.added"}
+
+
+def test_dir_follows_new_base_attributes():
+    class A:
+        pass
+
+    class B(A):
+        pass
+
+    ctx = {"b": B()}
+    assert _attrs("b.x", ctx) == set()
+    A.xyz = 1
+    assert _attrs("b.x", ctx) == {"b.xyz"}
+
+
+def test_dir_follows_replaced_attributes():
+    module = types.ModuleType("mod")
+    module.a = 1
+    ctx = {"mod": module}
+    assert _attrs("mod.", ctx) >= {"mod.a"}
+    del module.a
+    module.b = 2
+    # like running a command does
+    invalidate_cache()
+    attrs = _attrs("mod.", ctx)
+    assert "mod.b" in attrs and "mod.a" not in attrs
+
+
+def test_signature_cached_for_bound_methods():
+    class A:
+        def method(self, arg):
+            pass
+
+    args = python_signature_complete("", "a.method(", 9, {"a": A()}, always_true)
+    assert args == {"arg="}
+    first = pycomp._signature(A().method)
+    assert pycomp._signature(A().method) is first
+    invalidate_cache()
+    assert pycomp._signature(A().method) is not first
+
+
+@pytest.mark.parametrize("bound_first", [True, False])
+def test_signature_of_bound_and_unbound_methods(bound_first):
+    class A:
+        def method(self, arg):
+            pass
+
+    ctx = {"a": A(), "A": A}
+    lines = ["a.method(", "A.method("]
+    expected = [{"arg="}, {"self=", "arg="}]
+    if not bound_first:
+        lines.reverse()
+        expected.reverse()
+    for line, exp in zip(lines, expected):
+        assert python_signature_complete("", line, len(line), ctx, always_true) == exp
+
+
+@pytest.fixture
+def site_dir(tmp_path, monkeypatch):
+    """a folder on ``sys.path`` with a module and a package"""
+    site = tmp_path / "site"
+    (site / "pkg").mkdir(parents=True)
+    (site / "pkg" / "__init__.py").touch()
+    (site / "mod.py").touch()
+    monkeypatch.setattr(sys, "path", [str(site)])
+    return site
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """the folders listed by the modules cache"""
+    folders = []
+    list_modules = imports._root_modules_in
+    monkeypatch.setattr(
+        imports,
+        "_root_modules_in",
+        lambda path: folders.append(path) or list_modules(path),
+    )
+    return folders
+
+
+def test_modules_cache_is_saved(xession, site_dir, listed):
+    cache = imports.ModulesCache()
+    assert sorted(cache.modules(str(site_dir))) == ["mod", "pkg"]
+    cache.save()
+
+    other = imports.ModulesCache()
+    assert sorted(other.modules(str(site_dir))) == ["mod", "pkg"]
+    assert listed == [str(site_dir)]
+
+    (site_dir / "new.py").touch()
+    mtime = os.stat(site_dir).st_mtime + 10
+    os.utime(site_dir, (mtime, mtime))
+    assert sorted(other.modules(str(site_dir))) == ["mod", "new", "pkg"]
+    assert len(listed) == 2
+
+
+def test_root_modules_listed_in_background(xession, site_dir, listed, monkeypatch):
+    monkeypatch.setattr(imports, "TIMEOUT_GIVEUP", 0)
+    cache = imports.ModulesCache()
+    monkeypatch.setattr(xession, "modules_cache", cache)
+
+    # the folder is not waited for
+    assert "mod" not in imports.get_root_modules()
+    for thread in threading.enumerate():
+        if thread.name == "xonsh-modules-cache":
+            thread.join()
+    assert {"mod", "pkg", "sys"} <= set(imports.get_root_modules())
+    assert listed == [str(site_dir)]
@@ -1,4 +1,6 @@
+import concurrent.futures
 import functools
+import threading
 from unittest.mock import Mock
 
 import pytest
@@ -275,3 +277,149 @@ def test_promptformatter_clears_cache(formatter):
     formatter(template, fields)
 
     assert spam.call_count == 2
+
+
+def test_fields_with_deps_are_kept_across_prompts(formatter, xession):
+    spam = Mock(return_value="spam", deps=("$SPAM",))
+    eggs = Mock(return_value="eggs")
+    fields = PromptFields(xession, init=False)
+    fields.update({"spam": spam, "eggs": eggs})
+    xession.env["SPAM"] = "one"
+
+    for _ in range(3):
+        fields.reset()
+        formatter("{spam} and {eggs}", fields)
+    assert (spam.call_count, eggs.call_count) == (1, 3)
+    assert fields.recomputed == ["eggs"]
+
+    xession.env["SPAM"] = "two"
+    fields.reset()
+    formatter("{spam} and {eggs}", fields)
+    assert spam.call_count == 2
+
+
+def test_prompt_field_deps(xession):
+    field = PromptField(deps=("other",), updator=Mock())
+    fields = PromptFields(xession, init=False)
+    fields.update({"field": field, "other": "a"})
+
+    fields.pick("field")
+    fields.reset()
+    fields.pick("field")
+    assert field.updator.call_count == 1
+
+    fields["other"] = "b"
+    fields.reset()
+    fields.pick("field")
+    assert field.updator.call_count == 2
+
+
+def test_prompt_fields_debug(xession, capsys):
+    fields = PromptFields(xession, init=False)
+    fields.update({"spam": lambda: "spam"})
+    xession.env["PROMPT_FIELDS_DEBUG"] = True
+
+    fields.pick("spam")
+    fields.reset()
+    assert "computed fields: spam" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{RED}{user}@{BOLD_BLUE}{cwd}{RESET} $ ",
+        "{branch}{BACKGROUND_GREEN} {RESET}",
+        "{broken} {RED}",
+        "{{escaped}} {RED}",
+    ],
+)
+@pytest.mark.parametrize(
+    "branch", ["main", "{YELLOW}main", "{RED}x{RESET}", "{", "open{", "}"]
+)
+def test_color_tokens_match_partial_color_tokenize(
+    formatter, xession, template, branch
+):
+    from xonsh.style_tools import partial_color_tokenize
+
+    fields = {"user": "me", "cwd": "~/code", "branch": branch, "broken": "{BLUE"}
+    expected = partial_color_tokenize(formatter(template, fields))
+    assert formatter.color_tokens(template, fields) == expected
+
+
+def test_prefetch(xession):
+    spam = Mock(return_value="spam", deps=("$SPAM",))
+    eggs = Mock(return_value="eggs")
+    fields = PromptFields(xession, init=False)
+    fields.update({"spam": spam, "eggs": eggs})
+    xession.env["SPAM"] = "one"
+
+    fields.prefetch(["spam", "eggs"])
+    assert fields.pick("spam") == "spam"
+    assert fields.pick("eggs") == "eggs"
+    assert (spam.call_count, eggs.call_count) == (1, 1)
+    assert fields.recomputed == ["eggs"]
+
+
+def test_prefetch_waits_only_for_picked_field(xession):
+    event = threading.Event()
+    released = []
+
+    def slow():
+        released.append(event.wait(5))
+        return "slow"
+
+    slow.deps = ("$SPAM",)
+    cheap = Mock(return_value="cheap", deps=("$SPAM",))
+    fields = PromptFields(xession, init=False)
+    fields.update({"slow": slow, "cheap": cheap})
+
+    try:
+        fields.prefetch(["slow", "cheap"])
+        assert fields.pick("cheap") == "cheap"
+    finally:
+        event.set()
+    assert fields.pick("slow") == "slow"
+    # the slow field was still running when the cheap one was picked
+    assert released == [True]
+    assert cheap.call_count == 1
+
+
+def test_prefetch_does_not_block_prompt_pool(xession, monkeypatch):
+    from xonsh.prompt import base
+
+    monkeypatch.setattr(
+        base, "_THREAD_POOL", concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    )
+    slow = Mock(return_value="slow", deps=("$SPAM",))
+    fields = PromptFields(xession, init=False)
+    fields.update({"slow": slow})
+
+    def job():
+        # e.g. the directory changed while the async prompt was running
+        fields.prefetch(["slow"])
+        return fields.pick("slow")
+
+    assert base.prompt_thread_pool().submit(job).result(5) == "slow"
+
+
+def test_prefetch_wait_is_bounded(xession):
+    event = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        if len(calls) == 1:
+            event.wait(5)
+        return "slow"
+
+    slow.deps = ("$SPAM",)
+    slow.timeout = 0.05
+    fields = PromptFields(xession, init=False)
+    fields.update({"slow": slow})
+    try:
+        fields.prefetch(["slow"])
+        assert fields.pick("slow") == "slow"
+        assert not event.is_set()
+    finally:
+        event.set()
+    assert len(calls) == 2
@@ -14,3 +14,16 @@ def test_cwd_escapes_curly_brackets_with_more_curly_brackets(xession, tmpdir):
 
     xession.env["PWD"] = "}}"
     assert _replace_home_cwd() == "}}}}"
+
+
+def test_dynamically_collapsed_pwd_follows_width(xession):
+    from xonsh.prompt.cwd import _dynamically_collapsed_pwd
+
+    xession.env["PWD"] = "/usr/local/share/applications"
+    xession.env["DYNAMIC_CWD_ELISION_CHAR"] = ""
+    xession.env["DYNAMIC_CWD_WIDTH"] = "20"
+    assert _dynamically_collapsed_pwd() == "/u/l/sh/applications"
+    xession.env["DYNAMIC_CWD_WIDTH"] = "30"
+    assert _dynamically_collapsed_pwd() == "/usr/local/share/applications"
+    xession.env["DYNAMIC_CWD_WIDTH"] = "20"
+    assert _dynamically_collapsed_pwd() == "/u/l/sh/applications"
@@ -2,6 +2,7 @@ import os
 
 import pytest
 
+from xonsh.fswatch import HAVE_INOTIFY
 from xonsh.prompt import gitstatus
 from xonsh.prompt.base import _format_value
 
@@ -17,6 +18,7 @@ def prompts(xession):
     yield fields
     fields.clear()
     fields.reset()
+    gitstatus.snapshot.value = None
 
 
 @pytest.fixture
@@ -29,6 +31,124 @@ def fake_proc(fake_process):
     return wrap
 
 
+DIRTY_STATUS = (
+    b"# branch.oid 1a2b3c4d5e6f7a8b9c0d1a2b3c4d5e6f7a8b9c0d",
+    b"# branch.head gitstatus-opt",
+    b"# branch.upstream origin/gitstatus-opt",
+    b"# branch.ab +7 -2",
+    b"1 .M N... 100644 100644 100644 e69de29 e69de29 requirements/tests.txt",
+    b"1 AM N... 000000 100644 100644 0000000 e69de29 tests/prompt/test_gitstatus.py",
+    b"1 .M N... 100644 100644 100644 e69de29 e69de29 tests/prompt/test_vc.py",
+    b"",
+)
+
+
+def test_snapshot_parse():
+    status = "\0".join(
+        [
+            "# branch.oid (initial)",
+            "# branch.head (detached)",
+            "2 R. N... 100644 100644 100644 e69de29 e69de29 R100 new name.txt",
+            "old name.txt",
+            "u UD N... 100644 100644 000000 100644 e69de29 e69de29 0000000 both.txt",
+            "1 .D N... 100644 100644 000000 e69de29 e69de29 gone.txt",
+            "? new.txt",
+            "? other.txt",
+            "",
+        ]
+    )
+    snap = gitstatus.GitSnapshot(".git", status)
+    assert (snap.head, snap.short_head, snap.ahead, snap.behind) == ("", "", 0, 0)
+    assert (snap.untracked, snap.changed, snap.deleted) == (2, 0, 2)
+    assert (snap.conflicts, snap.staged) == (1, 1)
+    assert snap.unstaged_paths == ["both.txt", "gone.txt"]
+
+
+@pytest.fixture
+def work_tree(tmp_path, monkeypatch):
+    """a repository with a tracked file, an ignored directory and a fake git"""
+    gitdir = tmp_path / ".git"
+    gitdir.mkdir()
+    (gitdir / "HEAD").write_text("ref: refs/heads/main\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.txt").write_text("")
+    (tmp_path / "build").mkdir()
+    calls = []
+
+    def output(xsh, *args):
+        calls.append(args)
+        if "ls-files" in args:
+            return "src/a.txt\0"
+        return take.status if "status" in args else ""
+
+    monkeypatch.setattr(gitstatus, "_get_sp_output", output)
+
+    def take():
+        return gitstatus.GitSnapshot.take(None, str(gitdir), str(tmp_path))
+
+    take.calls = calls
+    take.status = ""
+    yield take
+    if gitstatus.WorkTree._current is not None:
+        gitstatus.WorkTree._current.close()
+        gitstatus.WorkTree._current = None
+
+
+@pytest.mark.parametrize("inotify", [False, True])
+def test_snapshot_stale(work_tree, tmp_path, monkeypatch, inotify):
+    if inotify and not HAVE_INOTIFY:
+        pytest.skip("inotify is not available")
+    monkeypatch.setattr(gitstatus, "HAVE_INOTIFY", inotify)
+    snap = work_tree()
+    assert not snap.stale()
+    assert not snap.stale()
+
+    # the ignored directory isn't looked at
+    (tmp_path / "build" / "out.o").write_text("")
+    assert not snap.stale()
+
+    (tmp_path / "src" / "a.txt").write_text("edited")
+    assert snap.stale()
+
+    snap = work_tree()
+    (tmp_path / "src" / "b.txt").write_text("")
+    assert snap.stale()
+
+    snap = work_tree()
+    (tmp_path / ".git" / "MERGE_HEAD").write_text("")
+    assert snap.stale()
+
+    # the files were listed only once
+    assert sum("ls-files" in args for args in work_tree.calls) == 1
+
+
+def test_snapshot_stale_large_tree(work_tree, monkeypatch):
+    monkeypatch.setattr(gitstatus, "MAX_WATCHED_DIRS", 0)
+    monkeypatch.setattr(gitstatus, "MAX_STAT_PATHS", 0)
+    snap = work_tree()
+    assert snap.stale()
+
+
+def test_snapshot_same_as(work_tree, tmp_path):
+    work_tree.status = "1 .M N... 100644 100644 100644 e69de29 e69de29 src/a.txt\0"
+    snap = work_tree()
+    assert snap.git(None, "git", "describe") == snap.git(None, "git", "describe")
+    assert sum("describe" in args for args in work_tree.calls) == 1
+    assert work_tree().same_as(snap)
+
+    # an unstaged file is edited further, its line counts may differ
+    (tmp_path / "src" / "a.txt").write_text("more")
+    assert not work_tree().same_as(snap)
+
+    snap = work_tree()
+    (tmp_path / ".git" / "MERGE_HEAD").write_text("")
+    assert not work_tree().same_as(snap)
+
+    snap = work_tree()
+    work_tree.status = ""
+    assert not work_tree().same_as(snap)
+
+
 @pytest.mark.parametrize(
     "hidden, exp",
     [
@@ -45,13 +165,11 @@ def fake_proc(fake_process):
 def test_gitstatus_dirty(prompts, fake_proc, hidden, exp, xession):
     prompts["gitstatus"].hidden = hidden
     dirty = {
-        "git status --porcelain --branch": b"""\
-## gitstatus-opt...origin/gitstatus-opt [ahead 7, behind 2]
- M requirements/tests.txt
-AM tests/prompt/test_gitstatus.py
- M tests/prompt/test_vc.py""",
-        "git rev-parse --git-dir": b".git",
-        "git diff --numstat": b"""\
+        "git status --porcelain=v2 --branch -z": b"\0".join(DIRTY_STATUS),
+        "git rev-parse --git-dir --show-toplevel": b".git",
+        "git diff --numstat -- :(top,literal)requirements/tests.txt "
+        ":(top,literal)tests/prompt/test_gitstatus.py "
+        ":(top,literal)tests/prompt/test_vc.py": b"""\
 1       0       requirements/tests.txt
 26      0       tests/prompt/test_gitstatus.py
 22      26      tests/prompt/test_vc.py""",
@@ -64,9 +182,8 @@ AM tests/prompt/test_gitstatus.py
 
 def test_gitstatus_clean(prompts, fake_proc):
     clean = {
-        "git status --porcelain --branch": b"## gitstatus-opt...origin/gitstatus-opt [ahead 7, behind 2]",
-        "git rev-parse --git-dir": b".git",
-        "git diff --numstat": b"",
+        "git status --porcelain=v2 --branch -z": b"\0".join(DIRTY_STATUS[:4]),
+        "git rev-parse --git-dir --show-toplevel": b".git",
     }
     fake_proc(clean)
 
@@ -80,7 +197,9 @@ def test_no_git(prompts, fake_process, tmp_path):
     os.chdir(tmp_path)
     err = b"fatal: not a git repository (or any of the parent directories): .git"
     fake_process.register_subprocess(
-        command="git rev-parse --git-dir", stderr=err, returncode=128
+        command="git rev-parse --git-dir --show-toplevel",
+        stderr=err,
+        returncode=128,
     )
 
     # test that all gitstatus fields (gitstatus, gitstatus.branch,
@@ -0,0 +1,44 @@
+import pytest
+
+from xonsh.prompt import stats
+from xonsh.prompt.base import PromptFields
+
+
+@pytest.fixture(autouse=True)
+def clear_stats():
+    stats.clear()
+    yield
+    stats.clear()
+
+
+def test_percentiles():
+    for ms in range(1, 101):
+        stats.record("spam", ms / 1000)
+    assert stats.summary()["spam"] == {
+        "count": 100,
+        "p50": 0.05,
+        "p95": 0.095,
+        "max": 0.1,
+        "timeouts": 0,
+    }
+
+
+def test_computed_fields_are_timed(xession):
+    fields = PromptFields(xession, init=False)
+    fields.update({"spam": lambda: "spam", "eggs": "eggs"})
+    fields.pick("spam")
+    fields.pick("spam")
+    fields.pick("eggs")
+    assert {name: vals["count"] for name, vals in stats.summary().items()} == {
+        "spam": 1,
+        "eggs": 1,
+    }
+
+
+def test_slow_field_warning(xession, capsys):
+    xession.env["PROMPT_FIELD_WARN_TIME"] = 0.5
+    stats.record("fast", 0.1)
+    stats.record("slow", 1.0)
+    err = capsys.readouterr().err
+    assert "'slow' took 1.000s" in err
+    assert "fast" not in err
@@ -141,3 +141,20 @@ def test_git_dirty_working_directory_includes_untracked(
         )
 
     assert vc.git_dirty_working_directory() == include_untracked
+
+
+def test_git_branch_from_files(tmp_path, set_xenv):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    set_xenv(str(sub))
+    assert vc.get_git_branch() is None
+
+    gitdir = tmp_path / "repo.git"
+    gitdir.mkdir()
+    (gitdir / "HEAD").write_text("ref: refs/heads/feature/x\n")
+    (tmp_path / ".git").write_text("gitdir: repo.git\n")
+    assert vc.find_git_dir() == str(gitdir)
+    assert vc.get_git_branch() == "feature/x"
+
+    (gitdir / "HEAD").write_text("0123456789abcdef0123456789abcdef01234567\n")
+    assert vc.get_git_branch() == "0123456"
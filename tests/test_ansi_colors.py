@@ -185,3 +185,29 @@ def test_register_custom_ansi_style(name, styles, refrules):
     assert style is not None
     for key, value in refrules.items():
         assert style[key] == value
+
+
+def test_ansi_partial_color_format_follows_overrides(xession):
+    from xonsh.ansi_colors import ansi_partial_color_format
+
+    xession.env["XONSH_STYLE_OVERRIDES"] = {"Color.RED": "#ff0000"}
+    assert ansi_partial_color_format("{RED}x") == "\033[38;5;196mx"
+    xession.env["XONSH_STYLE_OVERRIDES"] = {}
+    assert ansi_partial_color_format("{RED}x") == "\033[31mx"
+
+
+@pytest.mark.parametrize(
+    "rgb, exp",
+    [
+        ("000000", ("16", "000000")),
+        ("2f2f2f", ("16", "000000")),
+        ("303030", ("59", "5f5f5f")),
+        ("#ff0000", ("196", "ff0000")),
+        ("abc", ("146", "afafd7")),
+        ("", ("0", "000000")),
+    ],
+)
+def test_rgb_to_256(rgb, exp):
+    from xonsh.color_tools import rgb_to_256
+
+    assert rgb_to_256(rgb) == exp
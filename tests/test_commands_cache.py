@@ -7,6 +7,7 @@ import pytest
 
 from xonsh.commands_cache import (
     SHELL_PREDICTOR_PARSER,
+    CommandIndex,
     CommandsCache,
     predict_false,
     predict_shell,
@@ -196,3 +197,40 @@ def test_bash_is_only_functional_alias(xession):
 def test_bash_and_is_alias_is_only_functional_alias(xession):
     xession.aliases["bash"] = lambda args: os.chdir(args[0])
     assert not xession.commands_cache.is_only_functional_alias("bash")
+
+
+def test_command_index_follows_updates():
+    index = CommandIndex()
+    cmds = {f"cmd{i:03}": (f"/bin/cmd{i:03}", False) for i in range(100)}
+    cmds["Cmd-upper"] = ("/bin/Cmd-upper", False)
+    index.update(cmds)
+    entries = index._entries
+
+    del cmds["cmd050"]
+    cmds["cmd050x"] = ("/bin/cmd050x", False)
+    index.update(cmds)
+    assert index._entries is not entries
+    assert index._entries == sorted(index._entries)
+    assert len(index) == len(cmds)
+
+    names = [name for name, _ in index.with_prefix("cmd05")]
+    assert names == ["cmd050x"] + [f"cmd05{i}" for i in range(1, 10)]
+    assert [n for n, _ in index.with_prefix("CMD-", case_sensitive=False)] == [
+        "Cmd-upper"
+    ]
+    assert list(index.with_prefix("CMD-")) == []
+
+
+def test_complete_prefix(xession, patch_commands_cache_bins):
+    cc = patch_commands_cache_bins(["bin1", "bin2", "other"])
+    assert [name for name, _ in cc.complete_prefix("bi")] == ["bin1", "bin2"]
+    assert [name for name, _ in cc.complete_prefix("")] == ["bin1", "bin2", "other"]
+
+
+def test_complete_fuzzy(xession, patch_commands_cache_bins):
+    cc = patch_commands_cache_bins(["git-checkout", "gcov", "logcheck", "other"])
+    assert [name for name, _ in cc.complete_fuzzy("gco")] == [
+        "gcov",
+        "git-checkout",
+    ]
+    assert [name for name, _ in cc.complete_fuzzy("gc", limit=1)] == ["gcov"]
@@ -1,12 +1,17 @@
 """Tests for the base completer's logic (xonsh/completer.py)"""
 
+import threading
+import time
+
 import pytest
 
-from xonsh.completer import Completer
+from xonsh import completer as completer_module
+from xonsh.completer import Completer, watch_cache_events
 from xonsh.completers.tools import (
     RichCompletion,
     contextual_command_completer,
     non_exclusive_completer,
+    uncached_completer,
 )
 from xonsh.parsers.completion_context import CommandContext
 
@@ -143,7 +148,11 @@ def test_append_space(completer, completers_mock):
         )
     ),
 )
-def test_non_exclusive(completer, completers_mock, middle_result, exp):
+@pytest.mark.parametrize("timeout", [0, 5000])
+def test_non_exclusive(
+    completer, completers_mock, middle_result, exp, timeout, xession
+):
+    xession.env["COMPLETION_TIMEOUT_MS"] = timeout
     completers_mock["a"] = non_exclusive_completer(lambda *a: {"a1", "a2"})
 
     def middle(*a):
@@ -155,3 +164,182 @@ def test_non_exclusive(completer, completers_mock, middle_result, exp):
     completers_mock["c"] = non_exclusive_completer(lambda *a: {"c1", "c2"})
 
     assert completer.complete("", "", 0, 0, {})[0] == exp
+
+
+def test_non_exclusive_run_concurrently(completer, completers_mock):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def comp(result):
+        def func(*a):
+            barrier.wait()  # breaks unless both run at the same time
+            return {result}
+
+        return non_exclusive_completer(func)
+
+    completers_mock["a"] = comp("a")
+    completers_mock["b"] = comp("b")
+
+    assert completer.complete("", "", 0, 0, {})[0] == ("a", "b")
+
+
+def test_completion_timeout(completer, completers_mock, xession, capsys):
+    xession.env["COMPLETION_TIMEOUT_MS"] = 50
+    xession.env["XONSH_TRACE_COMPLETIONS"] = True
+    event = threading.Event()
+
+    def slow(*a):
+        event.wait(5)
+        return {"slow"}
+
+    completers_mock["slow"] = non_exclusive_completer(slow)
+    completers_mock["fast"] = non_exclusive_completer(lambda *a: {"fast"})
+    completers_mock["after"] = lambda *a: {"after"}
+    try:
+        assert completer.complete("", "", 0, 0, {})[0] == ("fast",)
+    finally:
+        event.set()
+    assert "Dropped completers 'slow'" in capsys.readouterr().out
+
+
+def test_dropped_completer_not_run_again(completer, completers_mock, xession):
+    xession.env["COMPLETION_TIMEOUT_MS"] = 50
+    event = threading.Event()
+    calls = []
+
+    def slow(*a):
+        calls.append(1)
+        event.wait(5)
+        return {"slow"}
+
+    completers_mock["slow"] = non_exclusive_completer(slow)
+    completers_mock["fast"] = non_exclusive_completer(lambda *a: {"fast"})
+    try:
+        for _ in range(3):
+            dropped = []
+            gen = completer.generate_completions(
+                None, ("", "", 0, 0, {}), False, dropped=dropped
+            )
+            assert [comp for comp, _ in gen] == ["fast"]
+            assert dropped == ["slow"]
+    finally:
+        event.set()
+    assert calls == [1]
+
+
+@pytest.fixture
+def git_completer(completers_mock):
+    calls = []
+
+    @contextual_command_completer
+    def comp(context: CommandContext):
+        calls.append(context.prefix)
+        words = ("checkout", "cherry-pick", "clean", "src/")
+        return {w for w in words if w.startswith(context.prefix)}
+
+    comp.calls = calls
+    completers_mock["git"] = comp
+    return comp
+
+
+def _complete(completer, text):
+    return completer.complete(
+        "", "", 0, 0, {}, multiline_text=text, cursor_index=len(text)
+    )
+
+
+def test_extended_prefix_narrows_cached(completer, git_completer):
+    assert _complete(completer, "git ch") == (("checkout", "cherry-pick"), 2)
+    assert _complete(completer, "git che") == (("checkout", "cherry-pick"), 3)
+    comps, lprefix = _complete(completer, "git chec")
+    assert comps == ("checkout",) and comps[0].prefix_len == lprefix == 4
+    assert git_completer.calls == ["ch"]
+
+    # other arguments before the prefix
+    _complete(completer, "git x chec")
+    assert git_completer.calls == ["ch", "chec"]
+
+
+@pytest.mark.parametrize(
+    "second, calls",
+    [
+        ("git checkout", ["ch", "checkout"]),  # a complete word
+        ("git chx", ["ch", "chx"]),  # no cached completion left
+        ("git c", ["ch", "c"]),  # shorter prefix
+    ],
+)
+def test_cached_completions_not_reused(completer, git_completer, second, calls):
+    _complete(completer, "git ch")
+    _complete(completer, second)
+    assert git_completer.calls == calls
+
+
+def test_cached_completions_path_boundary(completer, git_completer):
+    _complete(completer, "git sr")
+    _complete(completer, "git src/")
+    assert git_completer.calls == ["sr", "src/"]
+
+
+def test_cached_completions_invalidated(completer, git_completer, xession):
+    # the events are renewed for every test
+    watch_cache_events()
+    _complete(completer, "git ch")
+    xession.env["SOME_VAR"] = "1"
+    _complete(completer, "git che")
+    assert git_completer.calls == ["ch", "che"]
+
+
+def test_uncached_completer(completer, git_completer):
+    uncached_completer(git_completer)
+    _complete(completer, "git ch")
+    _complete(completer, "git che")
+    assert git_completer.calls == ["ch", "che"]
+
+
+def test_partial_completions_not_cached(completer, completers_mock, xession):
+    xession.env["COMPLETION_TIMEOUT_MS"] = 50
+    event = threading.Event()
+    calls = []
+
+    @non_exclusive_completer
+    @contextual_command_completer
+    def slow(context: CommandContext):
+        calls.append(context.prefix)
+        event.wait(5)
+        return {"git-slow"}
+
+    @non_exclusive_completer
+    @contextual_command_completer
+    def fast(context: CommandContext):
+        return {"gitk"}
+
+    completers_mock["slow"] = slow
+    completers_mock["fast"] = fast
+    try:
+        assert _complete(completer, "gi")[0] == ("gitk",)
+    finally:
+        event.set()
+    while slow in completer_module._RUNNING:
+        time.sleep(0.01)
+    assert _complete(completer, "git")[0] == ("git-slow", "gitk")
+    assert calls == ["gi", "git"]
+
+
+def test_prefix_matches_first(completer, completers_mock):
+    @contextual_command_completer
+    def comp(context: CommandContext):
+        return {"aaa", "achecker", "checkout", "chxe"}, len(context.prefix)
+
+    completers_mock["a"] = comp
+    assert _complete(completer, "x che")[0] == ("checkout", "achecker", "chxe", "aaa")
+
+
+def test_fuzzy_matcher(completer, completers_mock, xession):
+    xession.env["XONSH_COMPLETION_MATCHER"] = "fuzzy"
+
+    @contextual_command_completer
+    def comp(context: CommandContext):
+        # not filtered by the completer
+        return {"git-checkout", "logconfig", "gcompris", "other"}, False
+
+    completers_mock["a"] = comp
+    assert _complete(completer, "x gco")[0] == ("gcompris", "logconfig", "git-checkout")
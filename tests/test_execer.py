@@ -1,4 +1,5 @@
 """Tests the xonsh lexer."""
+import ast
 import os
 
 import pytest
@@ -194,3 +195,40 @@ def test_exec_scope_reuse(xonsh_execer_exec):
     assert xonsh_execer_exec("x = 0")
     with pytest.raises(NameError):
         xonsh_execer_exec("print(x)")
+
+
+def _parse_with_xonsh_parser(execer, input, mode, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(execer, "_parse_fast", lambda input, mode: ("xonsh", None, input))
+        return execer.parse(input, ctx=set(), mode=mode)
+
+
+@pytest.mark.parametrize(
+    "inp, mode, path",
+    [
+        ("x = 1\n", "exec", "python"),
+        ("def f(a):\n    return a + 1\n", "exec", "python"),
+        ("ls -l\n", "single", "python"),
+        ("x = [i for i in range(3)]\n", "single", "python"),
+        ("print('$HOME')\n", "exec", "xonsh"),
+        ("x = 2>1\n", "exec", "xonsh"),
+        ("f(x)", "eval", "python"),
+        ("echo hi\n", "single", "subproc"),
+        ("git commit -am fix  \n", "exec", "subproc"),
+        ("ls ~/x a@b:c --opt=1.5 %y\n", "single", "subproc"),
+        ("echo hi and bye\n", "single", "xonsh"),
+        ("not x y\n", "single", "xonsh"),
+        ("echo *.py\n", "single", "xonsh"),
+        ("echo hi", "eval", "xonsh"),
+        ("# comment\n", "exec", "python"),
+    ],
+)
+def test_parse_fast_paths(inp, mode, path, xonsh_execer, monkeypatch):
+    xonsh_execer.parse_paths.clear()
+    tree = xonsh_execer.parse(inp, ctx=set(), mode=mode)
+    assert xonsh_execer.parse_paths == {path: 1}
+    expected = _parse_with_xonsh_parser(xonsh_execer, inp, mode, monkeypatch)
+    if expected is None:
+        assert tree is None
+    else:
+        assert ast.dump(tree) == ast.dump(expected)
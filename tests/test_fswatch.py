@@ -0,0 +1,40 @@
+import pytest
+
+from xonsh import fswatch
+
+
+def test_fingerprint(tmp_path):
+    path = tmp_path / "HEAD"
+    paths = [str(path)]
+    missing = fswatch.fingerprint(paths)
+    path.write_text("ref: refs/heads/main\n")
+    created = fswatch.fingerprint(paths)
+    assert missing == (None,)
+    assert created != missing
+    assert fswatch.fingerprint(paths) == created
+
+
+
+@pytest.mark.skipif(not fswatch.HAVE_INOTIFY, reason="inotify is not available")
+def test_dir_watcher(tmp_path):
+    sub = tmp_path / "sub"
+    (sub / "deeper").mkdir(parents=True)
+    (sub / "file").write_text("")
+    watcher = fswatch.DirWatcher([str(tmp_path), str(sub)])
+    assert not watcher.changed()
+
+    (sub / "file").write_text("edited")
+    assert watcher.changed()
+    assert not watcher.changed()
+
+    # subdirectories are not watched
+    (sub / "deeper" / "file").write_text("")
+    assert not watcher.changed()
+
+    (sub / "deeper").rename(tmp_path / "moved")
+    assert watcher.changed() and watcher.valid
+    (sub / "file").unlink()
+    sub.rmdir()
+    assert watcher.changed()
+    assert not watcher.valid
+    watcher.close()
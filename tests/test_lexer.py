@@ -8,7 +8,8 @@ from pprint import pformat
 
 import pytest
 
-from xonsh.lexer import Lexer
+from xonsh import lexer as lexer_module
+from xonsh.lexer import TOKEN_CACHE, Lexer, get_tokens, token_array
 from xonsh.ply.ply.lex import LexToken
 
 LEXER_ARGS = {"lextab": "lexer_test_table", "debug": 0}
@@ -476,3 +477,99 @@ def test_tolerant_lexer(s):
     lexer.input(s)
     error_tokens = list(tok for tok in lexer if tok.type == "ERRORTOKEN")
     assert all(tok.value in s for tok in error_tokens)  # no error messages
+
+
+def test_token_array_is_cached_and_lazy():
+    TOKEN_CACHE.clear()
+    s = "ls -l && echo hi\n"
+    arr = token_array(s)
+    assert token_array(s) is arr
+    assert next(iter(arr)).value == "ls"
+    assert list(arr) == [
+        (t.type, t.value, t.lineno, t.lexpos) for t in get_tokens(s, False)
+    ]
+
+
+def test_lexer_replays_cached_tokens():
+    TOKEN_CACHE.clear()
+    lexer = Lexer()
+    s = "x = $(ls -l)\n"
+    lexer.input(s)
+    first = list(lexer)
+    first[0].type = "MODIFIED"  # the parser owns the tokens it is given
+    lexer.input(s)
+    assert [t.type for t in lexer][0] == "NAME"
+
+
+@pytest.mark.parametrize(
+    "s",
+    [
+        "echo hi",
+        "Enabling this or",
+        "echo \\",
+        "ls (a",
+        "echo 'abc",
+        "x = $(ls -l) # c",
+        "ls | grep x && echo done ; pwd",
+        "x = f(a) + g(b)",
+        "echo $(ls -l",
+        "    indented = 1",
+        "print(await x)",
+        "ls)",
+    ],
+)
+def test_token_array_shares_parsed_line(s):
+    TOKEN_CACHE.clear()
+    lexer = Lexer()
+    lexer.input(s + "\n")
+    lexer.token()  # the parser stopped at the first token
+    assert list(token_array(s)) == [
+        (t.type, t.value, t.lineno, t.lexpos) for t in get_tokens(s, False)
+    ]
+
+
+def test_token_array_lexes_only_end_of_parsed_line(monkeypatch):
+    TOKEN_CACHE.clear()
+    s = "ls -l | grep x && echo done"
+    lexer = Lexer()
+    lexer.input(s + "\n")
+    list(lexer)
+    expected = [(t.type, t.value, t.lineno, t.lexpos) for t in get_tokens(s, False)]
+    lexed = []
+    monkeypatch.setattr(
+        lexer_module,
+        "get_tokens",
+        lambda src, *args: lexed.append(src) or get_tokens(src, *args),
+    )
+    assert list(token_array(s)) == expected
+    assert lexed == ["done"]
+
+
+def test_token_array_slice_cols():
+    arr = token_array("ls -l | grep x")
+    assert [t.value for t in arr.slice_cols(6, 8)] == ["|"]
+    assert [t.value for t in arr.slice_cols(8)] == ["grep", "x"]
+    assert arr.is_boundary(8)
+    assert not arr.is_boundary(10)
+
+
+@pytest.mark.parametrize("tolerant", [False, True])
+def test_token_array_relexes_appended_lines(tolerant):
+    TOKEN_CACHE.clear()
+    src = "def f(x):\n    y = (1,\n  2)\n    s = '''a\nb'''\n    if x:\n        ls -l\n"
+    buf = ""
+    for line in src.splitlines(keepends=True):
+        prev = TOKEN_CACHE.get(buf, tolerant)
+        buf += line
+        arr = token_array(buf, tolerant)
+        assert list(arr) == [
+            (t.type, t.value, t.lineno, t.lexpos) for t in get_tokens(buf, tolerant)
+        ]
+        if prev is not None:
+            assert arr[0] is prev[0]  # the first line was not lexed again
+
+
+def test_token_array_checkpoints_skip_open_brackets():
+    arr = token_array("x = [1,\n2]\ny = 3\n")
+    list(arr)
+    assert [cp.lineno for cp in arr.checkpoints] == [0, 2, 3]
@@ -1,5 +1,7 @@
+import json
 import os
 import subprocess
+import types
 
 import pytest  # noqa F401
 
@@ -105,3 +107,86 @@ def test_bsd_man_page_completions(xession, check_completer, cmd, exp):
     # BSD & Linux have different man page version
     completions = check_completer(cmd, complete_fn=complete_from_man, prefix="-")
     assert completions == exp
+
+
+FAKE_MAN_PAGE = b"""\
+NAME
+       fake - does things
+
+OPTIONS
+       -a, --all
+              do all the things
+
+       --version
+              print the version
+"""
+
+
+@pytest.fixture
+def fake_man(xession, tmp_path, monkeypatch):
+    """man pages of fake commands, with their modification times"""
+    from xonsh.completers import man
+
+    xession.env["XONSH_DATA_DIR"] = str(tmp_path)
+    man.get_man_completions_path.cache_clear()
+    man.man_page_options.cache_clear()
+    monkeypatch.setattr(man, "REFRESHER", man.Refresher())
+    mtimes = {"fake": 1, "other": 1}
+    pages = []
+
+    def get_man_page(cmd):
+        pages.append(cmd)
+        return FAKE_MAN_PAGE
+
+    monkeypatch.setattr(man, "_get_man_page", get_man_page)
+    monkeypatch.setattr(man, "_man_page_mtime", mtimes.get)
+    yield man, mtimes, pages
+    man.get_man_completions_path.cache_clear()
+    man.man_page_options.cache_clear()
+
+
+def test_man_options_stored(fake_man, check_completer, tmp_path):
+    man, _, pages = fake_man
+    exp = {"--all", "--version"}  # the last option of each line
+    assert check_completer("fake", complete_fn=complete_from_man, prefix="-") == exp
+    assert check_completer("fake", complete_fn=complete_from_man, prefix="-") == exp
+    man.REFRESHER.wait()
+    assert pages == ["fake"]
+
+    stored = json.loads((tmp_path / "generated_completions" / "man.json").read_text())
+    assert stored["fake"]["mtime"] == 1
+    assert stored["fake"]["options"]["print the version"] == ["--version"]
+
+
+def test_man_options_regenerated(fake_man, check_completer):
+    man, mtimes, pages = fake_man
+    check_completer("fake", complete_fn=complete_from_man, prefix="-")
+    mtimes["fake"] = 2
+    man.REFRESHER._seen.clear()  # a new session
+
+    check_completer("fake", complete_fn=complete_from_man, prefix="-")
+    man.REFRESHER.wait()
+
+    assert pages == ["fake", "fake"]
+    assert man.man_page_options().get("fake")["mtime"] == 2
+
+
+def test_man_options_pregenerated(fake_man, xession, monkeypatch):
+    man, _, pages = fake_man
+    history = [{"inp": inp} for inp in ("fake -a", "other", "fake", "nocmd", "")]
+    monkeypatch.setattr(
+        xession, "history", types.SimpleNamespace(all_items=lambda **_: history)
+    )
+    monkeypatch.setattr(
+        xession.commands_cache,
+        "lazy_locate_binary",
+        lambda cmd, **_: None if cmd == "nocmd" else f"/bin/{cmd}",
+    )
+
+    assert man.frequent_commands(5) == ["fake", "other"]
+    assert man.frequent_commands(1) == ["fake"]
+
+    man.pregenerate(5)
+    man.REFRESHER.wait()
+    assert sorted(pages) == ["fake", "other"]
+    assert man.man_page_options().get("other")["options"]
@@ -0,0 +1,62 @@
+"""Tests for the versioned, memory-mapped parser tables."""
+import os
+
+import pytest
+
+from xonsh.parsers.completion_context import CompletionContextParser
+from xonsh.parsers.tables import (
+    CompactLRParser,
+    TableError,
+    load_parser,
+    python_tag,
+    table_path,
+)
+
+
+def test_table_path_is_versioned(tmp_path):
+    path = table_path("xonsh.parser_table", str(tmp_path), version_info=(3, 10, 4))
+    assert path == os.path.join(str(tmp_path), "parser_table_py310.lrtab")
+    assert python_tag((3, 9, 0)) == "py39"
+
+
+def test_tables_roundtrip(tmp_path, capsys):
+    outputdir = str(tmp_path)
+    generated = CompletionContextParser(outputdir=outputdir)
+    assert "regenerated parser tables" in capsys.readouterr().err
+    assert os.path.isfile(table_path("xonsh.completion_parser_table", outputdir))
+
+    loaded = CompletionContextParser(outputdir=outputdir)
+    assert capsys.readouterr().err == ""
+    assert isinstance(loaded.parser, CompactLRParser)
+    assert loaded.parse("ls -l", 5) == generated.parse("ls -l", 5)
+    assert loaded.parse("echo @(x", 8) == generated.parse("echo @(x", 8)
+
+
+def test_stale_tables_regenerate(tmp_path, capsys):
+    outputdir = str(tmp_path)
+    path = table_path("xonsh.completion_parser_table", outputdir)
+    with open(path, "wb") as f:
+        f.write(b"not a table")
+    with pytest.raises(TableError):
+        load_parser(path, object())
+    CompletionContextParser(outputdir=outputdir)
+    err = capsys.readouterr().err
+    assert "regenerated parser tables" in err
+    assert "is not a xonsh parser table" in err
+    assert isinstance(CompletionContextParser(outputdir=outputdir).parser, CompactLRParser)
+
+
+def test_signature_mismatch(tmp_path):
+    outputdir = str(tmp_path)
+    parser = CompletionContextParser(outputdir=outputdir)
+    path = table_path("xonsh.completion_parser_table", outputdir)
+    assert load_parser(path, parser, check_signature=True)
+
+    class Changed(CompletionContextParser):
+        def p_extra(self, p):
+            """extra : ANY"""
+
+    changed = Changed.__new__(Changed)
+    changed.tokens = parser.tokens
+    with pytest.raises(TableError, match="does not match the grammar"):
+        load_parser(path, changed, check_signature=True)
@@ -0,0 +1,80 @@
+"""Tests for the async prompt executor"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from xonsh.prompt.base import ParsedTokens, _ParsedToken
+from xonsh.ptk_shell.updator import AsyncPrompt, Executor
+
+
+@pytest.fixture
+def executor(xession):
+    return Executor()
+
+
+@pytest.fixture
+def blocked():
+    """a field that runs until the event is set"""
+    event = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        event.wait(5)
+        return "done"
+
+    func.calls = calls
+    func.event = event
+    yield func
+    event.set()
+
+
+def test_running_field_is_not_submitted_again(executor, blocked):
+    fut1, *_ = executor.submit(blocked, "slow", inputs="/a")
+    fut2, *_ = executor.submit(blocked, "slow", inputs="/a")
+    assert fut1 is fut2
+
+    fut3, *_ = executor.submit(blocked, "slow", inputs="/b")
+    assert fut3 is not fut1
+
+    blocked.event.set()
+    assert fut1.result() == fut3.result() == "done"
+    assert len(blocked.calls) == 2
+
+
+def _async_prompt(executor):
+    prompt = AsyncPrompt("message", Mock(), executor)
+    prompt.tokens = ParsedTokens([_ParsedToken("$ "), _ParsedToken("", "slow")], "")
+    prompt.invalidate = Mock()
+    return prompt
+
+
+def test_slow_field_keeps_last_value(executor, blocked):
+    executor.thread_results["slow"] = "old"
+    prompt = _async_prompt(executor)
+    value = prompt.submit_section(blocked, "slow", idx=1, timeout=0.01)
+    on_complete = Mock()
+
+    prompt.start_update(on_complete)
+
+    assert value == "old"
+    on_complete.assert_called_once_with("message")
+    prompt.invalidate.assert_not_called()
+
+
+def test_stopped_prompt_discards_results(executor, blocked):
+    prompt = _async_prompt(executor)
+    prompt.submit_section(blocked, "slow", idx=1)
+    on_complete = Mock()
+    thread = threading.Thread(target=prompt.start_update, args=(on_complete,))
+    thread.start()
+
+    prompt.stop()
+    blocked.event.set()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    on_complete.assert_not_called()
+    prompt.invalidate.assert_not_called()
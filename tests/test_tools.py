@@ -68,6 +68,7 @@ from xonsh.tools import (
     pathsep_to_seq,
     pathsep_to_set,
     pathsep_to_upper_seq,
+    plain_subproc_words,
     register_custom_style,
     replace_logical_line,
     seq_to_pathsep,
@@ -2036,3 +2037,21 @@ from xonsh.style_tools import Token
 )
 def test_is_tok_color_dict(val, exp):
     assert is_tok_color_dict(val) == exp
+
+
+@pytest.mark.parametrize(
+    "cmd, exp",
+    [
+        ("echo hi", [(0, "echo"), (5, "hi")]),
+        ("git  push -f origin", [(0, "git"), (5, "push"), (10, "-f"), (13, "origin")]),
+        ("echo *.py", None),
+        ("echo 'hi'", None),
+        ("echo a > b", None),
+        ("echo a and b", None),
+        ("if x y", None),
+        ("@x y", None),
+        ("echo x:", None),
+    ],
+)
+def test_plain_subproc_words(cmd, exp):
+    assert plain_subproc_words(cmd) == exp
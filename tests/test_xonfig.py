@@ -29,6 +29,7 @@ def test_xonfg_help(capsys, xession):
         "wizard",
         "web",
         "colors",
+        "prompt-stats",
         "tutorial",
     }
 
@@ -110,3 +111,14 @@ def test_xonfig_info(args, xession):
     pat = re.compile(r".*history backend\s+\|\s+", re.MULTILINE | re.IGNORECASE)
     m = pat.search(capout)
     assert m
+
+
+def test_xonfig_prompt_stats(xession, capsys):
+    from xonsh.prompt import stats
+
+    stats.clear()
+    stats.record("spam", 0.002)
+    xonfig_main(["prompt-stats", "--reset"])
+    out = capsys.readouterr().out
+    assert out.splitlines()[1].split() == ["spam", "1", "2.00", "2.00", "2.00", "0"]
+    assert stats.summary() == {}
@@ -1,27 +1,94 @@
+import os
+import sys
+
 import pytest
 
+from xonsh.completer import invalidate_cache
+from xonsh.pytest.tools import skip_if_on_windows
+
+# answers the requests of the worker like fish would for "git chec"
+FAKE_FISH = """\
+#!{python}
+import re, sys, time
+
+while True:
+    request = b""
+    while not request.endswith(b"\\0"):
+        char = sys.stdin.buffer.read(1)
+        if not char:
+            sys.exit()
+        request += char
+    request = request[:-1].decode()
+    line = re.search(r"complete -C '(.*)'", request).group(1)
+    marker = re.search(r"echo (\\S+)", request).group(1)
+    if "sleep" in line:
+        time.sleep(10)
+    if line == "git chec":
+        print("cherry-pick\\tApply the change introduced by an existing commit")
+        print("checkout\\tCheckout and switch to a branch")
+    print(marker, flush=True)
+"""
+
 
 @pytest.fixture
-def fish_completer(tmpdir, xession, load_xontrib, fake_process):
-    """vox Alias function"""
+def fish_completer(tmp_path, xession, load_xontrib, monkeypatch):
     load_xontrib("fish_completer")
     xession.env.update(
         dict(
-            XONSH_DATA_DIR=str(tmpdir),
+            XONSH_DATA_DIR=str(tmp_path),
             XONSH_SHOW_TRACEBACK=True,
         )
     )
-
-    fake_process.register_subprocess(
-        command=["fish", fake_process.any()],
-        # completion for "git chec"
-        stdout=b"""\
-cherry-pick	Apply the change introduced by an existing commit
-checkout	Checkout and switch to a branch""",
+    fish = tmp_path / "bin" / "fish"
+    fish.parent.mkdir()
+    fish.write_text(FAKE_FISH.format(python=sys.executable))
+    fish.chmod(0o755)
+    monkeypatch.setitem(
+        xession.env, "PATH", [str(fish.parent)] + list(xession.env["PATH"])
     )
+    import xontrib.fish_completer as mod
 
-    return fake_process
+    yield mod
+    mod.close_worker()
 
 
+@skip_if_on_windows
 def test_fish_completer(fish_completer, check_completer):
     assert check_completer("git", prefix="chec") == {"checkout"}
+
+
+def _worker_pid(mod):
+    return mod._WORKER.proc.pid
+
+
+@skip_if_on_windows
+def test_fish_worker_is_reused(fish_completer, check_completer, xession):
+    check_completer("git", prefix="chec")
+    pid = _worker_pid(fish_completer)
+    xession.env["PWD"] = os.path.dirname(os.getcwd())
+    xession.env["LAST_RETURN_CODE"] = 1
+    assert check_completer("git", prefix="chec") == {"checkout"}
+    assert _worker_pid(fish_completer) == pid
+
+    xession.env["FISH_TEST_VAR"] = "1"
+    assert check_completer("git", prefix="chec") == {"checkout"}
+    assert _worker_pid(fish_completer) != pid
+
+
+@skip_if_on_windows
+def test_fish_worker_timeout(fish_completer, check_completer, xession):
+    xession.env["FISH_COMPLETER_TIMEOUT"] = 0.2
+    check_completer("git", prefix="chec")
+    pid = _worker_pid(fish_completer)
+
+    assert check_completer("git", prefix="sleep") == set()
+    assert fish_completer._WORKER is None
+    invalidate_cache()  # the completions of "chec" are cached
+    assert check_completer("git", prefix="chec") == {"checkout"}
+    assert _worker_pid(fish_completer) != pid
+
+
+def test_fish_quote():
+    from xontrib.fish_completer import fish_quote
+
+    assert fish_quote("it's a \\ ") == "'it\\'s a \\\\ '"
@@ -1,4 +1,5 @@
 """Tools for helping with ANSI color codes."""
+import functools
 import re
 import sys
 import warnings
@@ -160,9 +161,10 @@ def ansi_partial_color_format(template, style="default", cmap=None, hide=False):
 
 
 def _ansi_partial_color_format_main(template, style="default", cmap=None, hide=False):
-    cmap = _ensure_color_map(style=style, cmap=cmap)
     overrides = XSH.env["XONSH_STYLE_OVERRIDES"]
-    if overrides:
+    if cmap is None:
+        cmap = _resolved_color_map(style, overrides)
+    elif overrides:
         cmap.update(_style_dict_to_ansi(overrides))
     esc = ("\001" if hide else "") + "\033["
     m = "m" + ("\002" if hide else "")
@@ -194,6 +196,28 @@ def _ansi_partial_color_format_main(template, style="default", cmap=None, hide=F
     return "".join(toks)
 
 
+_RESOLVED_COLOR_MAPS: "dict[tuple, dict[str, str]]" = {}
+"""(style, overrides) -> copy of the color map of the style with the overrides
+applied. The escape codes of the color names are added to it as they are used."""
+
+
+def _resolved_color_map(style, overrides):
+    try:
+        key = (style, tuple(overrides.items()) if overrides else ())
+        cmap = _RESOLVED_COLOR_MAPS.get(key)
+    except TypeError:  # unhashable overrides
+        key = cmap = None
+    if cmap is None:
+        cmap = _ensure_color_map(style=style).copy()
+        if overrides:
+            cmap.update(_style_dict_to_ansi(overrides))
+        if key is not None:
+            if len(_RESOLVED_COLOR_MAPS) >= 16:
+                _RESOLVED_COLOR_MAPS.clear()
+            _RESOLVED_COLOR_MAPS[key] = cmap
+    return cmap
+
+
 def ansi_color_style_names():
     """Returns an iterable of all ANSI color style names."""
     return ANSI_STYLES.keys()
@@ -273,13 +297,18 @@ def ANSI_COLOR_NAME_SET_SHORT_RE():
 
 
 def _color_name_from_ints(ints, background=False, prefix=None):
-    name = find_closest_color(ints, BASE_XONSH_COLORS)
+    name = _closest_base_color(tuple(ints))
     if background:
         name = "BACKGROUND_" + name
     name = name if prefix is None else prefix + name
     return name
 
 
+@functools.lru_cache(maxsize=256)
+def _closest_base_color(ints):
+    return find_closest_color(ints, BASE_XONSH_COLORS)
+
+
 def ansi_color_escape_code_to_name(escape_code, style, reversed_style=None):
     """Converts an ANSI color code escape sequence to a tuple of color names
     in the provided style ('default' should almost be the style). For example,
@@ -1140,6 +1169,7 @@ def register_custom_ansi_style(name, styles, base="default"):
     base_style.update(_style_dict_to_ansi(styles))
 
     ANSI_STYLES[name] = base_style
+    _RESOLVED_COLOR_MAPS.clear()
 
 
 def ansi_style_by_name(name):
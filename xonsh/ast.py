@@ -119,7 +119,12 @@ from ast import (
 
 from xonsh.built_ins import XSH
 from xonsh.platform import PYTHON_VERSION_INFO
-from xonsh.tools import find_next_break, get_logical_line, subproc_toks
+from xonsh.tools import (
+    find_next_break,
+    get_logical_line,
+    plain_subproc_words,
+    subproc_toks,
+)
 
 if PYTHON_VERSION_INFO > (3, 8):
     from ast import NamedExpr  # type:ignore
@@ -296,6 +301,25 @@ def xonsh_call(name, args, lineno=None, col=None):
     )
 
 
+def plain_subproc(words, lineno=1, col=0):
+    """Creates the AST node that the parser produces for ``![words]`` when the
+    arguments are plain words, without globbing, quoting or redirection.
+    Each word is an ``(offset, string)`` pair, where offset is relative to the
+    start of the words, and ``col`` is the column of ``![``.
+    """
+    args = []
+    end = 0
+    for offset, word in words:
+        c = col + 2 + offset
+        s = Constant(value=word, lineno=lineno, col_offset=c)
+        args.append(xonsh_call("__xonsh__.expand_path", [s], lineno=lineno, col=c))
+        end = offset + len(word)
+    cliargs = List(elts=args, ctx=Load(), lineno=lineno, col_offset=col + 2 + end)
+    return xonsh_call(
+        "__xonsh__.subproc_captured_hiddenobject", [cliargs], lineno=lineno, col=col
+    )
+
+
 def isdescendable(node):
     """Determines whether or not a node is worth visiting. Currently only
     UnaryOp and BoolOp nodes are visited.
@@ -401,6 +425,14 @@ class CtxAwareTransformer(NodeTransformer):
             maxcol = None
         else:
             mincol = max(min_col(node) - 1, 0)
+            if (
+                nlogical == 1
+                and isinstance(node, Expr)
+                and not hasattr(node, "max_col")
+            ):
+                # parsed by CPython rather than by the xonsh parser
+                node.max_lineno = node.end_lineno
+                node.max_col = self._lookahead_col(node, line)
             maxcol = max_col(node)
             if mincol == maxcol:
                 maxcol = find_next_break(line, mincol=mincol, lexer=self.parser.lexer)
@@ -429,14 +461,17 @@ class CtxAwareTransformer(NodeTransformer):
             )
         if spline is None:
             return node
+        words = plain_subproc_words(spline[2:-1])
         try:
-            newnode = self.parser.parse(
-                spline,
-                mode=self.mode,
-                filename=self.filename,
-                debug_level=(self.debug_level >= 2),
-            )
-            newnode = newnode.body
+            if words is None:
+                newnode = self.parser.parse(
+                    spline,
+                    mode=self.mode,
+                    filename=self.filename,
+                    debug_level=(self.debug_level >= 2),
+                ).body
+            else:
+                newnode = plain_subproc(words)
             if not isinstance(newnode, AST):
                 # take the first (and only) Expr
                 newnode = newnode[0]
@@ -453,6 +488,20 @@ class CtxAwareTransformer(NodeTransformer):
             newnode = newnode.value
         return newnode
 
+    def _lookahead_col(self, node, line):
+        """The ``max_col`` the xonsh parser sets on an expression statement:
+        the column of the token following it, or of its last token when it
+        ends the line.
+        """
+        last = None
+        for tok in self.parser.lexer.token_array(line):
+            if tok.lineno != 1 or tok.type in ("NEWLINE", "DEDENT", "ENDMARKER"):
+                break
+            if tok.lexpos >= node.end_col_offset:
+                return tok.lexpos
+            last = tok
+        return None if last is None else last.lexpos
+
     def is_in_scope(self, node):
         """Determines whether or not the current node is in scope."""
         names, store = gather_load_store_names(node)
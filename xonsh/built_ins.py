@@ -580,6 +580,7 @@ class XonshSession:
             Context to start xonsh session with.
         """
         from xonsh.commands_cache import CommandsCache
+        from xonsh.completers.imports import ModulesCache
         from xonsh.completers.init import default_completers
         from xonsh.environ import Env, default_env
 
@@ -602,7 +603,7 @@ class XonshSession:
             if "commands_cache" in kwargs
             else CommandsCache()
         )
-        self.modules_cache = {}
+        self.modules_cache = ModulesCache()
         self.all_jobs = {}
 
         self.completers = default_completers(self.commands_cache)
@@ -5,6 +5,7 @@ color codes. Parts of this file were originally forked from Micah Elliott
 http://MicahElliott.com Copyright (C) 2011 Micah Elliott. All rights reserved.
 WTFPL http://sam.zoy.org/wtfpl/
 """
+import functools
 import math
 import re
 
@@ -404,6 +405,21 @@ def short2rgb(short):
     return SHORT_TO_RGB[short]
 
 
+@lazyobject
+def CUBE_LEVELS():
+    """The closest level of the 6x6x6 color cube of xterm for every value of
+    an RGB component, from 0 to 255"""
+    incs = (0x00, 0x5F, 0x87, 0xAF, 0xD7, 0xFF)
+    levels = []
+    for part in range(256):
+        for s, b in zip(incs, incs[1:]):  # smaller, bigger
+            if s <= part <= b:
+                levels.append(s if abs(s - part) < abs(b - part) else b)
+                break
+    return tuple(levels)
+
+
+@functools.lru_cache(maxsize=256)
 def rgb_to_256(rgb):
     """Find the closest ANSI 256 approximation to the given RGB value.
 
@@ -426,25 +442,9 @@ def rgb_to_256(rgb):
     rgb = rgb.lstrip("#")
     if len(rgb) == 0:
         return "0", "000000"
-    incs = (0x00, 0x5F, 0x87, 0xAF, 0xD7, 0xFF)
     # Break 6-char RGB code into 3 integer vals.
     parts = rgb_to_ints(rgb)
-    res = []
-    for part in parts:
-        i = 0
-        while i < len(incs) - 1:
-            s, b = incs[i], incs[i + 1]  # smaller, bigger
-            if s <= part <= b:
-                s1 = abs(s - part)
-                b1 = abs(b - part)
-                if s1 < b1:
-                    closest = s
-                else:
-                    closest = b
-                res.append(closest)
-                break
-            i += 1
-    res = "".join([("%02.x" % i) for i in res])
+    res = "".join(["%02x" % CUBE_LEVELS[part] for part in parts])
     equiv = RGB_TO_SHORT[res]
     return equiv, res
 
@@ -479,9 +479,16 @@ def color_dist(x, y) -> float:
 
 
 def find_closest_color(x, palette):
-    return min(
-        sorted(palette.keys(), reverse=True), key=lambda k: color_dist(x, palette[k])
-    )
+    """Name of the color of the palette closest to ``x``, the greatest name
+    among equally close ones."""
+    best = best_dist = None
+    for name, color in palette.items():
+        dist = (x[0] - color[0]) ** 2 + (x[1] - color[1]) ** 2 + (x[2] - color[2]) ** 2
+        if best is None or dist < best_dist or (dist == best_dist and name > best):
+            best, best_dist = name, dist
+    if best is None:
+        raise ValueError("empty palette")
+    return best
 
 
 def make_palette(strings):
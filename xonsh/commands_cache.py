@@ -6,8 +6,10 @@ and returns whether or not the process can be run in the background (returns
 True) or must be run the foreground (returns False).
 """
 import argparse
+import bisect
 import collections.abc as cabc
 import functools
+import operator
 import os
 import pickle
 import sys
@@ -17,11 +19,79 @@ import typing as tp
 from pathlib import Path
 
 from xonsh.built_ins import XSH
+from xonsh.completers import matcher
 from xonsh.lazyasd import lazyobject
 from xonsh.platform import ON_POSIX, ON_WINDOWS, pathbasename
 from xonsh.tools import executables_in
 
 
+class CommandIndex:
+    """The command names sorted by their case-folded form, so that the names
+    starting with a prefix are found by bisection.
+
+    It follows a commands mapping through :meth:`update`, which only inserts
+    and removes the entries that changed. The sorted list is replaced rather
+    than modified, so that it can be read while another thread updates it.
+    """
+
+    def __init__(self):
+        self._entries: tp.List[tp.Tuple[str, str, str]] = []
+        self._by_key: tp.Dict[str, tp.Tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry(key, value):
+        name = key
+        path = value[0]
+        if ON_WINDOWS and path is not None:
+            # keys are uppercase on Windows, show the original name instead
+            name = pathbasename(path)
+        return name.casefold(), name, key
+
+    def update(self, cmds: tp.Mapping[str, tp.Any]):
+        """Updates the index to the keys of the commands mapping."""
+        new = {key: self._entry(key, value) for key, value in cmds.items()}
+        with self._lock:
+            old = self._by_key
+            removed = [e for key, e in old.items() if new.get(key) != e]
+            added = [e for key, e in new.items() if old.get(key) != e]
+            self._by_key = new
+            if not (removed or added):
+                return
+            if len(removed) + len(added) > len(new) // 8:
+                self._entries = sorted(new.values())
+                return
+            entries = list(self._entries)
+            for entry in removed:
+                del entries[bisect.bisect_left(entries, entry)]
+            for entry in added:
+                bisect.insort(entries, entry)
+            self._entries = entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def with_prefix(self, prefix: str, case_sensitive=True):
+        """Yields the names starting with ``prefix`` and their keys in the
+        commands mapping, sorted case-insensitively."""
+        entries = self._entries
+        folded = prefix.casefold()
+        lo = bisect.bisect_left(entries, (folded,))
+        hi = bisect.bisect_left(entries, (folded + "\U0010ffff",), lo)
+        for _, name, key in entries[lo:hi]:
+            if not case_sensitive or name.startswith(prefix):
+                yield name, key
+
+    def matching(self, query: str, case_sensitive=True, limit=0):
+        """The names that contain the characters of ``query`` in order and
+        their keys, best matches first, see :func:`~xonsh.completers.matcher.rank`.
+        """
+        entries = matcher.rank(
+            query, self._entries, case_sensitive, limit, key=operator.itemgetter(1)
+        )
+        return [(name, key) for _, name, key in entries]
+
+
 class CommandsCache(cabc.Mapping):
     """A lazy cache representing the commands available on the file system.
     The keys are the command names and the values a tuple of (loc, has_alias)
@@ -39,6 +109,8 @@ class CommandsCache(cabc.Mapping):
         self._path_mtime = -1
         self.threadable_predictors = default_threadable_predictors()
         self._loaded_pickled = False
+        self._index = CommandIndex()
+        self._indexed: tp.Optional[tp.Dict[str, tp.Any]] = None
 
         # force it to load from env by setting it to None
         self._cache_file = None
@@ -79,6 +151,38 @@ class CommandsCache(cabc.Mapping):
     def __len__(self):
         return len(self.all_commands)
 
+    @property
+    def index(self) -> CommandIndex:
+        """The prefix index of the commands, see :meth:`complete_prefix`."""
+        if self._indexed is not self._cmds_cache:
+            self._reindex()
+        return self._index
+
+    def _reindex(self):
+        self._index.update(self._cmds_cache)
+        self._indexed = self._cmds_cache
+
+    def complete_prefix(self, prefix: str, case_sensitive=True):
+        """Yields the commands starting with ``prefix`` as ``(name, (path,
+        is_alias))`` pairs, like :meth:`iter_commands`. This costs a bisection
+        of the index rather than a scan of all the commands."""
+        self.update_cache()
+        cmds = self._cmds_cache
+        for name, key in self.index.with_prefix(prefix, case_sensitive):
+            value = cmds.get(key)
+            if value is not None:
+                yield name, value
+
+    def complete_fuzzy(self, query: str, case_sensitive=True, limit=0):
+        """Yields the best ``limit`` commands that match ``query`` fuzzily, as
+        ``(name, (path, is_alias))`` pairs like :meth:`complete_prefix`."""
+        self.update_cache()
+        cmds = self._cmds_cache
+        for name, key in self.index.matching(query, case_sensitive, limit):
+            value = cmds.get(key)
+            if value is not None:
+                yield name, value
+
     def __getitem__(self, key) -> "tuple[str, bool]":
         self.update_cache()
         return self.lazyget(key)
@@ -159,6 +263,7 @@ class CommandsCache(cabc.Mapping):
             if not self._loaded_pickled:
                 # first time load the commands from cache-file
                 self._cmds_cache = self.get_cached_commands()
+                self._reindex()
                 self._loaded_pickled = True
             # also start a thread that updates the cache in the bg
             worker = threading.Thread(
@@ -227,6 +332,7 @@ class CommandsCache(cabc.Mapping):
         if self.cache_file:
             self.cache_file.write_bytes(pickle.dumps(allcmds))
         self._cmds_cache = allcmds
+        self._reindex()
         return allcmds
 
     def cached_name(self, name):
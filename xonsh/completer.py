@@ -1,26 +1,145 @@
 """A (tab-)completer for xonsh."""
+import collections
 import collections.abc as cabc
+import concurrent.futures
+import os
 import sys
+import threading
+import time
 import typing as tp
 
 from xonsh.built_ins import XSH
+from xonsh.completers import matcher
 from xonsh.completers.tools import (
     Completion,
     RichCompletion,
     apply_lprefix,
     get_filter_function,
+    is_cached_completer,
     is_contextual_completer,
     is_exclusive_completer,
 )
+from xonsh.events import events
 from xonsh.parsers.completion_context import CompletionContext, CompletionContextParser
 from xonsh.tools import print_exception
 
+_POOL: "concurrent.futures.ThreadPoolExecutor|None" = None
+_POOL_LOCK = threading.Lock()
+
+
+def completer_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """The threads running the completers concurrently"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="xonsh-completer"
+            )
+        return _POOL
+
+
+_RUNNING: "dict[tp.Callable, concurrent.futures.Future]" = {}
+"""The completers running in the pool"""
+_RUNNING_LOCK = threading.Lock()
+
+
+def _call_completer(func, completion_context, old_completer_args, materialize=False):
+    """Calls the completer if it takes the given kind of arguments.
+
+    With ``materialize``, the completions are collected before returning, so
+    that a completer returning a generator does its work in the calling thread.
+    """
+    if is_contextual_completer(func):
+        if completion_context is None:
+            return None
+        out = func(completion_context)
+    else:
+        if old_completer_args is None:
+            return None
+        out = func(*old_completer_args)
+    if materialize:
+        if isinstance(out, cabc.Sequence):
+            res, lprefix = out
+            if res is not None:
+                out = (iter(list(res)), lprefix)
+        elif out is not None:
+            out = iter(list(out))
+    return out
+
+
+_CACHE_SIZE = 16
+_generation = 0
+
+
+def invalidate_cache(**_):
+    """Forgets the completions cached by the completers, which happens whenever
+    the directory or the environment change and before running a command."""
+    global _generation
+    _generation += 1
+
+
+def cache_generation() -> int:
+    """The number of times the cached completions were invalidated."""
+    return _generation
+
+
+def watch_cache_events():
+    """Subscribes :func:`invalidate_cache` to the events after which the
+    cached completions are stale."""
+    for event in (
+        events.on_chdir,
+        events.on_envvar_new,
+        events.on_envvar_change,
+        events.on_precommand,
+    ):
+        event(invalidate_cache)
+
+
+watch_cache_events()
+
+
+_QUOTES = "'\""
+
+
+def _typed_text(completion_context, old_completer_args) -> str:
+    """The text before the cursor, which the completions replace the end of."""
+    if completion_context is not None:
+        if completion_context.command is not None:
+            return completion_context.command.raw_prefix
+        if completion_context.python is not None:
+            return completion_context.python.prefix
+    if old_completer_args is not None:
+        _, line, _, endidx, _ = old_completer_args
+        return line[:endidx]
+    return ""
+
+
+def _cache_key(completion_context):
+    """What the completions depend on besides the prefix, or None when they
+    can't be cached."""
+    if completion_context is None or completion_context.command is None:
+        return None
+    command = completion_context.command
+    python = completion_context.python
+    if python is not None:
+        code, cursor = python.multiline_code, python.cursor_index
+        if not code[:cursor].endswith(command.prefix):
+            return None
+        before = code[: cursor - len(command.prefix)]
+        python = (before, code[cursor:], python.is_sub_expression)
+    completers = tuple(XSH.completers.items())
+    return command._replace(prefix=""), python, completers
+
 
 class Completer:
     """This provides a list of optional completions for the xonsh shell."""
 
     def __init__(self):
         self.context_parser = CompletionContextParser()
+        # cache key -> (generation, prefix, completions)
+        self._cache: "collections.OrderedDict[tp.Any, tp.Tuple[int, str, tuple]]" = (
+            collections.OrderedDict()
+        )
 
     def parse(
         self, text: str, cursor_index: "None|int" = None, ctx=None
@@ -101,7 +220,7 @@ class Completer:
         Returns
         -------
         rtn : list of str
-            Possible completions of prefix, sorted alphabetically.
+            Possible completions of prefix, the best matches first.
         lprefix : int
             Length of the prefix to be replaced in the completion.
         """
@@ -168,34 +287,141 @@ class Completer:
 
         return completion, lprefix
 
+    @staticmethod
+    def _report_error(func, completion_context, old_completer_args, e):
+        name = func.__name__ if hasattr(func, "__name__") else str(func)
+        print_exception(
+            f"Completer {name} raises exception when gets "
+            f"old_args={old_completer_args[:-1]} / completion_context={completion_context!r}:\n"
+            f"{type(e)} - {e}"
+        )
+
+    @staticmethod
+    def run_completers(
+        completion_context, old_completer_args, trace: bool, dropped=None
+    ) -> tp.Iterator[tp.Tuple[str, tp.Callable, tp.Any]]:
+        """Calls the completers and yields their names, functions and outputs
+        in their order.
+
+        Consecutive non-exclusive completers run concurrently in a thread
+        pool. When ``$COMPLETION_TIMEOUT_MS`` is set, every completer runs in
+        the pool and the iteration ends at that deadline. The results of the
+        concurrent completers that finished by then are still yielded, and
+        the names of the others are appended to the ``dropped`` list.
+
+        A dropped completer keeps running in its pool thread, since a thread
+        can't be interrupted. Until it returns, it is dropped at once
+        instead of being started again, so that a stuck completer doesn't
+        take up every thread of the pool.
+        """
+        timeout = XSH.env.get("COMPLETION_TIMEOUT_MS")
+        deadline = time.monotonic() + timeout / 1000 if timeout else None
+        args = (completion_context, old_completer_args)
+        completers = list(XSH.completers.items())
+        idx = 0
+        while idx < len(completers):
+            group = [completers[idx]]
+            idx += 1
+            if not is_exclusive_completer(group[0][1]):
+                while idx < len(completers) and not is_exclusive_completer(
+                    completers[idx][1]
+                ):
+                    group.append(completers[idx])
+                    idx += 1
+
+            if deadline is None and len(group) == 1:
+                name, func = group[0]
+                try:
+                    out = _call_completer(func, *args)
+                except StopIteration:
+                    # completer requested to stop collecting completions
+                    return
+                except Exception as e:
+                    Completer._report_error(func, *args, e)
+                    continue
+                yield name, func, out
+                continue
+
+            futures = [Completer._submit(func, args, deadline) for _, func in group]
+            for pos, ((name, func), fut) in enumerate(zip(group, futures)):
+                if fut is None:
+                    Completer._drop([name], trace, dropped, "still running")
+                    continue
+                try:
+                    if deadline is None:
+                        out = fut.result()
+                    else:
+                        out = fut.result(max(deadline - time.monotonic(), 0))
+                except concurrent.futures.TimeoutError:
+                    yield from Completer._finish_late(
+                        group[pos:], futures[pos:], timeout, trace, dropped
+                    )
+                    return
+                except StopIteration:
+                    return
+                except Exception as e:
+                    Completer._report_error(func, *args, e)
+                    continue
+                yield name, func, out
+
+    @staticmethod
+    def _submit(func, args, deadline):
+        """Runs the completer in the pool, or returns None when there is a
+        deadline and it is still running since it was dropped."""
+        with _RUNNING_LOCK:
+            if deadline is not None and func in _RUNNING:
+                return None
+            fut = completer_pool().submit(
+                _call_completer, func, *args, materialize=True
+            )
+            _RUNNING[func] = fut
+        fut.add_done_callback(lambda _: Completer._finished(func))
+        return fut
+
+    @staticmethod
+    def _finished(func):
+        with _RUNNING_LOCK:
+            _RUNNING.pop(func, None)
+
+    @staticmethod
+    def _drop(names, trace, dropped, reason):
+        if dropped is not None:
+            dropped.extend(names)
+        if trace and names:
+            print(
+                f"TRACE COMPLETIONS: Dropped completers {', '.join(map(repr, names))}"
+                f" {reason}"
+            )
+
+    @staticmethod
+    def _finish_late(group, futures, timeout, trace, dropped=None):
+        """Yields the results that are ready after the deadline passed and
+        drops the others."""
+        late = []
+        for (name, func), fut in zip(group, futures):
+            if fut is None:
+                late.append(name)
+            elif not fut.done():
+                fut.cancel()
+                late.append(name)
+            elif not (fut.cancelled() or fut.exception()):
+                yield name, func, fut.result()
+        Completer._drop(
+            late, trace, dropped, f"after $COMPLETION_TIMEOUT_MS={timeout}"
+        )
+
     @staticmethod
     def generate_completions(
-        completion_context, old_completer_args, trace: bool
+        completion_context, old_completer_args, trace: bool, used=None, dropped=None
     ) -> tp.Iterator[tp.Tuple[Completion, int]]:
+        """Yields the formatted completions and their lprefix. The completers
+        that gave completions are appended to the ``used`` list, and the
+        names of the ones dropped at the deadline to the ``dropped`` list."""
         filter_func = get_filter_function()
 
-        for name, func in XSH.completers.items():
-            try:
-                if is_contextual_completer(func):
-                    if completion_context is None:
-                        continue
-                    out = func(completion_context)
-                else:
-                    if old_completer_args is None:
-                        continue
-                    out = func(*old_completer_args)
-            except StopIteration:
-                # completer requested to stop collecting completions
-                break
-            except Exception as e:
-                name = func.__name__ if hasattr(func, "__name__") else str(func)
-                print_exception(
-                    f"Completer {name} raises exception when gets "
-                    f"old_args={old_completer_args[:-1]} / completion_context={completion_context!r}:\n"
-                    f"{type(e)} - {e}"
-                )
-                continue
-
+        for name, func, out in Completer.run_completers(
+            completion_context, old_completer_args, trace, dropped
+        ):
             completing_contextual_command = (
                 is_contextual_completer(func)
                 and completion_context is not None
@@ -245,6 +471,8 @@ class Completer:
 
             if not items:  # empty completion
                 continue
+            if used is not None:
+                used.append(func)
 
             if trace:
                 print(
@@ -257,22 +485,109 @@ class Completer:
                 # we got completions for an exclusive completer
                 break
 
+    def _narrow_cached(self, key, prefix: str, trace: bool):
+        """The cached completions of a shorter prefix that still match, if
+        they can stand for the completions of ``prefix``."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        generation, old_prefix, completions = entry
+        if generation != _generation or not prefix.startswith(old_prefix):
+            return None
+        extension = prefix[len(old_prefix) :]
+        if os.sep in extension or (os.altsep and os.altsep in extension):
+            # e.g. "dir/" was completed as a whole for "di"
+            return None
+        self._cache.move_to_end(key)
+        filter_func = get_filter_function()
+        narrowed = []
+        for comp in completions:
+            if not filter_func(comp, prefix):
+                continue
+            if comp.rstrip() == prefix:
+                # a complete word may have completions of its own
+                return None
+            if isinstance(comp, RichCompletion) and comp.prefix_len == len(old_prefix):
+                comp = comp.replace(prefix_len=len(prefix))
+            narrowed.append(comp)
+        if not narrowed:
+            return None
+        if trace:
+            print(
+                f"TRACE COMPLETIONS: Narrowed {len(completions)} cached completions "
+                f"of {old_prefix!r} to {len(narrowed)}"
+            )
+        return tuple(narrowed), len(prefix)
+
+    def _store_cached(self, key, prefix: str, completions, lprefix: int, used):
+        """Caches the completions if they are all plain matches of ``prefix``."""
+        if lprefix != len(prefix) or not all(map(is_cached_completer, used)):
+            return
+        filter_func = get_filter_function()
+        for comp in completions:
+            if not filter_func(comp, prefix):
+                return
+            if isinstance(comp, RichCompletion) and comp.prefix_len != lprefix:
+                return
+        self._cache[key] = (_generation, prefix, completions)
+        self._cache.move_to_end(key)
+        if len(self._cache) > _CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _ranked(completions, typed: str, lprefix: int):
+        """Sorts the completions by how well they match the text they replace:
+        prefix matches first, then substring and other matches. The fuzzy
+        matcher ranks the matches by score too, otherwise they are sorted
+        alphabetically."""
+        env = XSH.env
+        csc = env.get("CASE_SENSITIVE_COMPLETIONS")
+        fuzzy = env.get("XONSH_COMPLETION_MATCHER") == "fuzzy"
+
+        def sortkey(comp):
+            plen = lprefix
+            if isinstance(comp, RichCompletion) and comp.prefix_len is not None:
+                plen = comp.prefix_len
+            query = typed[max(len(typed) - plen, 0) :] if plen else ""
+            query, text = query.strip(_QUOTES), comp.strip(_QUOTES)
+            if fuzzy:
+                return matcher.sort_key(query, text, csc)
+            tier = matcher.match_tier(query, text, csc)
+            return tier, text.lower()
+
+        return tuple(sorted(completions, key=sortkey))
+
     def complete_from_context(self, completion_context, old_completer_args=None):
         trace = XSH.env.get("XONSH_TRACE_COMPLETIONS")
         if trace:
             print("\nTRACE COMPLETIONS: Getting completions with context:")
             sys.displayhook(completion_context)
+
+        key = _cache_key(completion_context)
+        if key is not None:
+            prefix = completion_context.command.prefix
+            cached = self._narrow_cached(key, prefix, trace)
+            if cached is not None:
+                narrowed, lprefix = cached
+                typed = _typed_text(completion_context, old_completer_args)
+                return self._ranked(narrowed, typed, lprefix), lprefix
+
         lprefix = 0
 
         # using dict to keep order py3.6+
         completions = {}
 
         query_limit = XSH.env.get("COMPLETION_QUERY_LIMIT")
+        used: tp.List[tp.Callable] = []
+        dropped: tp.List[str] = []
+        truncated = False
 
         for comp in self.generate_completions(
             completion_context,
             old_completer_args,
             trace,
+            used,
+            dropped,
         ):
             completion, lprefix = comp
             completions[completion] = None
@@ -281,11 +596,15 @@ class Completer:
                     print(
                         "TRACE COMPLETIONS: Stopped after $COMPLETION_QUERY_LIMIT reached."
                     )
+                truncated = True
                 break
 
-        def sortkey(s):
-            # todo: should sort with prefix > substring > fuzzy
-            return s.lstrip(''''"''').lower()
+        result = self._ranked(
+            completions, _typed_text(completion_context, old_completer_args), lprefix
+        )
+        # the completions of the dropped completers are missing
+        if key is not None and result and not (truncated or dropped):
+            self._store_cached(key, prefix, result, lprefix, used)
 
         # the last completer's lprefix is returned. other lprefix values are inside the RichCompletions.
-        return tuple(sorted(completions, key=sortkey)), lprefix
+        return result, lprefix
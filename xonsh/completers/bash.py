@@ -44,6 +44,8 @@ def complete_from_bash(context: CommandContext):
         opening_quote=opening_quote,
         closing_quote=closing_quote,
         arg_index=context.arg_index,
+        worker=XSH.env.get("BASH_COMPLETIONS_WORKER"),  # type: ignore
+        timeout=XSH.env.get("BASH_COMPLETIONS_TIMEOUT"),  # type: ignore
     )
 
     def enrich_comps(comp: str):
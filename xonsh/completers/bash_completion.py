@@ -10,10 +10,13 @@ import os
 import pathlib
 import platform
 import re
+import select
 import shlex
 import shutil
 import subprocess
 import sys
+import threading
+import time
 import typing as tp
 
 __version__ = "0.2.7"
@@ -204,7 +207,7 @@ def _bash_quote_paths(paths, start, end):
     return out, need_quotes
 
 
-BASH_COMPLETE_SCRIPT = r"""
+BASH_COMPLETE_FUNCS = r"""
 {source}
 
 # Override some functions in bash-completion, do not quote for readline
@@ -227,7 +230,7 @@ _quote_readline_by_ref()
 
 
 function _get_complete_statement {{
-    complete -p {cmd} 2> /dev/null || echo "-F _minimal"
+    complete -p "$1" 2> /dev/null || echo "-F _minimal"
 }}
 
 function getarg {{
@@ -241,14 +244,18 @@ function getarg {{
         prev=$i
     done
 }}
+"""
 
-_complete_stmt=$(_get_complete_statement)
+BASH_LOAD_COMPLETION = r"""
+_complete_stmt=$(_get_complete_statement {cmd})
 if echo "$_complete_stmt" | grep --quiet -e "_minimal"
 then
     declare -f _completion_loader > /dev/null && _completion_loader {cmd}
-    _complete_stmt=$(_get_complete_statement)
+    _complete_stmt=$(_get_complete_statement {cmd})
 fi
+"""
 
+BASH_COMPLETE_BODY = r"""
 # Is -C (subshell) or -F (function) completion used?
 if [[ $_complete_stmt =~ "-C" ]] ; then
     _func=$(eval getarg "-C" $_complete_stmt)
@@ -279,6 +286,145 @@ do
 done
 """
 
+BASH_COMPLETE_SCRIPT = BASH_COMPLETE_FUNCS + BASH_LOAD_COMPLETION + BASH_COMPLETE_BODY
+
+# The worker reads NUL-terminated requests from stdin. Completion modules are
+# loaded in the worker itself, so that they are kept for the next requests,
+# while the completion function runs in a subshell started in the current
+# directory. Each reply is the output, a NUL, the exit status and a NUL.
+BASH_WORKER_SCRIPT = (
+    BASH_COMPLETE_FUNCS
+    + r"""
+while IFS= read -r -d '' _xonsh_request; do
+    eval "$_xonsh_request"
+    printf '\0%d\0' "$?"
+done
+"""
+)
+
+BASH_WORKER_REQUEST = (
+    BASH_LOAD_COMPLETION
+    + "(\ncd {cwd} || exit 1\n"
+    + BASH_COMPLETE_BODY
+    + ") < /dev/null\n"
+)
+
+
+class _BashWorker:
+    """A bash process that sources the completion scripts once and then
+    answers the requests of ``bash_completions``.
+    """
+
+    def __init__(self, command, source, env):
+        self.key = _bash_worker_key(command, source, env)
+        script = BASH_WORKER_SCRIPT.format(source=source)
+        self.proc = subprocess.Popen(
+            [command, "-c", script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def run(self, request, timeout):
+        """Runs the request and returns its exit status and output.
+
+        Raises ``TimeoutError`` when there is no reply within ``timeout``
+        seconds, and ``OSError`` or ``EOFError`` when the worker died
+        meanwhile.
+        """
+        self.proc.stdin.write(os.fsencode(request) + b"\0")
+        self.proc.stdin.flush()
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        data = b""
+        while data.count(b"\0") < 2:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError(f"bash did not complete in {timeout}s")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("bash completion worker exited")
+            data += chunk
+        out, status, _ = data.split(b"\0", 2)
+        return int(status), os.fsdecode(out)
+
+    def close(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+
+
+VOLATILE_ENV_VARS = frozenset({"PWD", "OLDPWD", "LAST_RETURN_CODE"})
+"""Environment variables the shell changes by itself between completions,
+which don't require restarting a completion worker. The working directory
+is sent along with every request instead."""
+
+
+def stable_env(env):
+    """The environment without the ``VOLATILE_ENV_VARS``, for telling
+    whether a completion worker was started with the same environment."""
+    return {k: v for k, v in env.items() if k not in VOLATILE_ENV_VARS}
+
+
+def _bash_worker_key(command, source, env):
+    env = os.environ if env is None else env
+    return command, source, frozenset(stable_env(env).items())
+
+
+_BASH_WORKER: tp.Optional[_BashWorker] = None
+_BASH_WORKER_LOCK = threading.Lock()
+
+
+def _bash_worker_output(command, source, env, request, timeout):
+    """Runs the request in the bash worker, which is (re)started when it is
+    not running or was started with another command, source or environment.
+    The worker is stopped when it doesn't reply within ``timeout`` seconds.
+
+    Returns None when the worker could not answer, and an empty string when
+    it timed out.
+    """
+    global _BASH_WORKER
+    if "\0" in request:
+        return None
+    with _BASH_WORKER_LOCK:
+        worker = _BASH_WORKER
+        if worker is not None and (
+            not worker.alive() or worker.key != _bash_worker_key(command, source, env)
+        ):
+            worker.close()
+            worker = _BASH_WORKER = None
+        try:
+            if worker is None:
+                worker = _BASH_WORKER = _BashWorker(command, source, env)
+            status, out = worker.run(request, timeout)
+        except BaseException as e:
+            # when interrupted while waiting, the reply can't be matched anymore
+            if worker is not None:
+                worker.close()
+            _BASH_WORKER = None
+            if isinstance(e, TimeoutError):
+                # the completion function hangs, don't run it once more
+                return ""
+            if isinstance(e, (OSError, EOFError, ValueError)):
+                return None
+            raise
+    return out if status == 0 else ""
+
+
+def close_bash_worker():
+    """Stops the bash completion worker, if there is one."""
+    global _BASH_WORKER
+    with _BASH_WORKER_LOCK:
+        if _BASH_WORKER is not None:
+            _BASH_WORKER.close()
+            _BASH_WORKER = None
+
 
 def bash_completions(
     prefix,
@@ -293,6 +439,8 @@ def bash_completions(
     opening_quote="",
     closing_quote="",
     arg_index=None,
+    worker=False,
+    timeout=10.0,
     **kwargs,
 ):
     """Completes based on results from BASH completion.
@@ -334,6 +482,14 @@ def bash_completions(
         The closing quote that **should** be used. This is also passed to the `quote_paths` function.
     arg_index : int, optional
         The current prefix's index in the args.
+    worker : bool, optional
+        Whether to ask a long-lived bash process, which sources the
+        ``bash_completion`` script only once, instead of starting a new one.
+        The process is restarted when it dies or when ``command``, ``paths``
+        or ``env`` change.
+    timeout : float, optional
+        The number of seconds to wait for the worker. When it takes longer,
+        the worker is restarted and nothing is completed.
 
     Returns
     -------
@@ -371,8 +527,7 @@ def bash_completions(
 
     prefix_quoted = shlex.quote(prefix)
 
-    script = BASH_COMPLETE_SCRIPT.format(
-        source=source,
+    fmt = dict(
         line=" ".join(shlex.quote(p) for p in splt if p),
         comp_line=shlex.quote(line),
         n=n,
@@ -384,20 +539,30 @@ def bash_completions(
 
     if command is None:
         command = _bash_command(env=env)
-    try:
-        out = subprocess.check_output(
-            [command, "-c", script],
-            text=True,
-            stderr=subprocess.PIPE,
-            env=env,
-        )
-        if not out:
-            raise ValueError
-    except (
-        subprocess.CalledProcessError,
-        FileNotFoundError,
-        ValueError,
-    ):
+    out = None
+    if worker and platform.system() != "Windows":
+        try:
+            cwd = shlex.quote(os.getcwd())
+        except OSError:
+            pass
+        else:
+            request = BASH_WORKER_REQUEST.format(cwd=cwd, **fmt)
+            out = _bash_worker_output(command, source, env, request, timeout)
+    if out is None:
+        script = BASH_COMPLETE_SCRIPT.format(source=source, **fmt)
+        try:
+            out = subprocess.check_output(
+                [command, "-c", script],
+                text=True,
+                stderr=subprocess.PIPE,
+                env=env,
+            )
+        except (
+            subprocess.CalledProcessError,
+            FileNotFoundError,
+        ):
+            return set(), 0
+    if not out:
         return set(), 0
 
     out = out.splitlines()
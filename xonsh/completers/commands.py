@@ -10,7 +10,6 @@ from xonsh.completer import Completer
 from xonsh.completers.tools import (
     RichCompletion,
     contextual_command_completer,
-    get_filter_function,
     non_exclusive_completer,
 )
 from xonsh.lib.modules import ModuleFinder
@@ -23,17 +22,23 @@ END_PROC_KEYWORDS = {"and", "or"}
 
 def complete_command(command: CommandContext):
     """
-    Returns a list of valid commands starting with the first argument
+    Returns a list of valid commands matching the first argument
     """
 
     cmd = command.prefix
-    show_desc = (XSH.env or {}).get("CMD_COMPLETIONS_SHOW_DESC", False)
-    for s, (path, is_alias) in XSH.commands_cache.iter_commands():
-        if get_filter_function()(s, cmd):
-            kwargs = {}
-            if show_desc:
-                kwargs["description"] = "Alias" if is_alias else path
-            yield RichCompletion(s, append_space=True, **kwargs)
+    env = XSH.env or {}
+    show_desc = env.get("CMD_COMPLETIONS_SHOW_DESC", False)
+    case_sensitive = env.get("CASE_SENSITIVE_COMPLETIONS", True)
+    if env.get("XONSH_COMPLETION_MATCHER") == "fuzzy":
+        limit = env.get("COMPLETION_QUERY_LIMIT", 0)
+        found = XSH.commands_cache.complete_fuzzy(cmd, case_sensitive, limit)
+    else:
+        found = XSH.commands_cache.complete_prefix(cmd, case_sensitive)
+    for s, (path, is_alias) in found:
+        kwargs = {}
+        if show_desc:
+            kwargs["description"] = "Alias" if is_alias else path
+        yield RichCompletion(s, append_space=True, **kwargs)
     if xp.ON_WINDOWS:
         for i in xt.executables_in("."):
             if i.startswith(cmd):
@@ -7,12 +7,15 @@ Contains modified code from the IPython project (at core/completerlib.py).
 """
 
 import inspect
+import json
 import os
 import re
 import sys
+import threading
 import typing as tp
 from importlib import import_module
 from importlib.machinery import all_suffixes
+from pathlib import Path
 from time import time
 from zipimport import zipimporter
 
@@ -22,6 +25,7 @@ from xonsh.completers.tools import (
     contextual_completer,
     get_filter_function,
 )
+from xonsh.events import events
 from xonsh.lazyasd import lazyobject
 from xonsh.parsers.completion_context import CompletionContext
 
@@ -81,31 +85,143 @@ def module_list(path):
     return list(set(modules))
 
 
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _root_modules_in(path):
+    modules = module_list(path)
+    try:
+        modules.remove("__init__")
+    except ValueError:
+        pass
+    return modules
+
+
+class ModulesCache:
+    """The names of the modules in the folders of ``sys.path``, along with
+    the modification time of each folder, so that a folder is listed again
+    only after a package was added or removed.
+
+    The cache is saved in ``$XONSH_DATA_DIR`` and shared by the sessions.
+    Relative folders, like the current directory, are always listed.
+    """
+
+    CACHE_FILE = "modules-cache.json"
+
+    def __init__(self):
+        self._entries: "dict[str, tuple[int | None, list[str]]]" = {}
+        self._loaded = False
+        self._dirty = False
+        self._populating = False
+        self._lock = threading.RLock()
+
+    @property
+    def cache_file(self) -> "Path | None":
+        env = XSH.env or {}
+        if "XONSH_DATA_DIR" not in env:
+            return None
+        return Path(env["XONSH_DATA_DIR"]) / self.CACHE_FILE
+
+    def _read(self) -> "dict[str, list]":
+        path = self.cache_file
+        if path is None:
+            return {}
+        try:
+            stored = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
+
+    def modules(self, path: str, list_changed=True) -> "list[str] | None":
+        """The modules in the folder, which is listed if it changed since it
+        was cached. Returns None instead if ``list_changed`` is False."""
+        if not os.path.isabs(path):
+            return _root_modules_in(path)
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                for key, (mtime, modules) in self._read().items():
+                    self._entries.setdefault(key, (mtime, modules))
+            entry = self._entries.get(path)
+        mtime = _mtime(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        if not list_changed:
+            return None
+        modules = _root_modules_in(path)
+        with self._lock:
+            self._entries[path] = (mtime, modules)
+            self._dirty = True
+        return modules
+
+    def save(self):
+        """Writes the folders that were listed, keeping the ones of other
+        environments that still exist."""
+        path = self.cache_file
+        with self._lock:
+            if not self._dirty or path is None:
+                return
+            stored = {
+                key: entry for key, entry in self._read().items() if os.path.exists(key)
+            }
+            stored.update(
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry[0] is not None
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(stored))
+            os.replace(tmp, path)
+            self._dirty = False
+
+    def populate(self, paths: "tp.Iterable[str] | None" = None):
+        """Lists the folders of ``sys.path`` that changed and saves them."""
+        try:
+            for path in sys.path if paths is None else paths:
+                self.modules(path)
+            self.save()
+        finally:
+            self._populating = False
+
+    def populate_in_background(self):
+        with self._lock:
+            if self._populating:
+                return
+            self._populating = True
+        threading.Thread(
+            target=self.populate, name="xonsh-modules-cache", daemon=True
+        ).start()
+
+
+@events.on_post_init
+def _populate_modules_cache(**_):
+    if XSH.env.get("XONSH_INTERACTIVE") and XSH.modules_cache is not None:
+        XSH.modules_cache.populate_in_background()
+
+
 def get_root_modules():
     """
     Returns a list containing the names of all the modules available in the
     folders of the pythonpath.
     """
-    rootmodules_cache = XSH.modules_cache
-    rootmodules = list(sys.builtin_module_names)
+    cache = XSH.modules_cache
+    rootmodules = set(sys.builtin_module_names)
     start_time = time()
     for path in sys.path:
-        try:
-            modules = rootmodules_cache[path]
-        except KeyError:
-            modules = module_list(path)
-            try:
-                modules.remove("__init__")
-            except ValueError:
-                pass
-            if path not in ("", "."):  # cwd modules should not be cached
-                rootmodules_cache[path] = modules
-            if time() - start_time > TIMEOUT_GIVEUP:
-                print("\nwarning: Getting root modules is taking too long, we give up")
-                return []
-        rootmodules.extend(modules)
-    rootmodules = list(set(rootmodules))
-    return rootmodules
+        in_time = time() - start_time < TIMEOUT_GIVEUP
+        modules = cache.modules(path, list_changed=in_time)
+        if modules is None:
+            # don't keep the user waiting, the rest is listed for next time
+            cache.populate_in_background()
+            continue
+        rootmodules.update(modules)
+    cache.save()
+    return list(rootmodules)
 
 
 def is_importable(module, attr, only_modules):
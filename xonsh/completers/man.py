@@ -1,14 +1,27 @@
+import collections
 import functools
+import itertools
 import json
+import os
+import queue
 import re
 import shutil
 import subprocess
 import textwrap
+import threading
 from pathlib import Path
 
 from xonsh.built_ins import XSH
 from xonsh.completers.tools import RichCompletion, contextual_command_completer
+from xonsh.events import events
 from xonsh.parsers.completion_context import CommandContext
+from xonsh.platform import ON_WINDOWS
+
+MAX_WORKERS = 2
+"""number of man pages that are parsed at the same time in the background"""
+
+HISTORY_ITEMS = 1000
+"""number of the latest history items the most used commands are taken from"""
 
 
 @functools.lru_cache(maxsize=None)
@@ -32,6 +45,20 @@ def _get_man_page(cmd: str):
     return subprocess.check_output(["col", "-b"], stdin=manpage.stdout, env=env)
 
 
+def _man_page_mtime(cmd: str) -> "int | None":
+    """The modification time of the man page of the command, if it has one."""
+    try:
+        out = subprocess.run(
+            ["man", "-w", cmd],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=XSH.env.detype(),
+        ).stdout
+        return os.stat(out.decode().splitlines()[0].strip()).st_mtime_ns
+    except (OSError, IndexError, UnicodeDecodeError):
+        return None
+
+
 @functools.lru_cache(maxsize=None)
 def _man_option_string_regex():
     return re.compile(
@@ -112,14 +139,166 @@ def generate_options_of(cmd: str):
     yield from get_options(get_option_section())
 
 
-@functools.lru_cache(maxsize=10)
+class ManPageOptions:
+    """The options of the man pages, stored in a single JSON file that maps
+    each command to the modification time of its man page and its options.
+
+    The file is read again when another session changed it, and written
+    atomically, so that the sessions can share it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: "dict[str, dict]" = {}
+        self._stamp: "int | None" = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            stamp = self.path.stat().st_mtime_ns
+        except OSError:
+            stamp = None
+        if stamp != self._stamp:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                self._entries = {}
+            self._stamp = stamp
+        return self._entries
+
+    def get(self, cmd: str) -> "dict | None":
+        """The stored entry of the command, with its ``mtime`` and
+        ``options``."""
+        with self._lock:
+            return self._load().get(cmd)
+
+    def update(self, cmd: str, mtime: "int | None", options):
+        with self._lock:
+            entries = dict(self._load())
+            entries[cmd] = {"mtime": mtime, "options": options}
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entries))
+            os.replace(tmp, self.path)
+            self._entries = entries
+            self._stamp = self.path.stat().st_mtime_ns
+
+
+@functools.lru_cache(maxsize=None)
+def man_page_options() -> ManPageOptions:
+    return ManPageOptions(get_man_completions_path().with_suffix(".json"))
+
+
+def generate_entry(cmd: str, stored: "dict | None" = None):
+    """Parses the man page of the command and stores its options, unless
+    the stored entry is from the same version of the man page."""
+    mtime = _man_page_mtime(cmd)
+    if stored is not None and stored["mtime"] == mtime:
+        return stored
+    options = dict(generate_options_of(cmd)) if mtime is not None else {}
+    man_page_options().update(cmd, mtime, options)
+    return {"mtime": mtime, "options": options}
+
+
+class Refresher:
+    """Daemon threads that regenerate the stored options of the queued
+    commands whose man page changed, ``MAX_WORKERS`` commands at a time.
+    Every command is looked at once per session.
+    """
+
+    def __init__(self, workers=MAX_WORKERS):
+        self.workers = workers
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._seen: "set[str]" = set()
+        self._threads: "list[threading.Thread]" = []
+        self._lock = threading.Lock()
+
+    def checked(self, cmd: str) -> bool:
+        """Whether the command was looked at this session, marks it if not."""
+        with self._lock:
+            seen = cmd in self._seen
+            self._seen.add(cmd)
+            return seen
+
+    def submit(self, cmd: str):
+        if self.checked(cmd):
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name="xonsh-man-options", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        self._queue.put(cmd)
+
+    def _work(self):
+        while True:
+            cmd = self._queue.get()
+            try:
+                generate_entry(cmd, man_page_options().get(cmd))
+            except Exception:
+                pass  # a broken man page shouldn't stop the others
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Blocks until the queued commands are done."""
+        self._queue.join()
+
+
+REFRESHER = Refresher()
+
+
+def frequent_commands(limit: int) -> "list[str]":
+    """The commands run most often in the latest history items."""
+    hist = XSH.history
+    if hist is None or not limit:
+        return []
+    counts = collections.Counter()
+    for item in itertools.islice(hist.all_items(newest_first=True), HISTORY_ITEMS):
+        words = item.get("inp", "").split(None, 1)
+        if words:
+            counts[words[0]] += 1
+    cmds = []
+    for cmd, _ in counts.most_common():
+        if XSH.commands_cache.lazy_locate_binary(cmd, ignore_alias=True):
+            cmds.append(cmd)
+            if len(cmds) == limit:
+                break
+    return cmds
+
+
+def pregenerate(limit: "int | None" = None):
+    """Queues the most used commands to have their options generated."""
+    if limit is None:
+        limit = XSH.env.get("MAN_COMPLETIONS_PREGENERATE")
+    for cmd in frequent_commands(limit):
+        REFRESHER.submit(cmd)
+
+
+_pregenerated = False
+
+
+@events.on_pre_prompt
+def _pregenerate_when_idle(**_):
+    global _pregenerated
+    if _pregenerated or ON_WINDOWS:
+        return
+    _pregenerated = True
+    if XSH.env.get("MAN_COMPLETIONS_PREGENERATE"):
+        # reading the history may take a while
+        threading.Thread(target=pregenerate, daemon=True).start()
+
+
 def _parse_man_page_options(cmd: str) -> "dict[str, tuple[str, ...]]":
-    path = get_man_completions_path() / f"{cmd}.json"
-    if path.exists():
-        return json.loads(path.read_text())
-    options = dict(generate_options_of(cmd))
-    path.write_text(json.dumps(options))
-    return options
+    stored = man_page_options().get(cmd)
+    if stored is None:
+        REFRESHER.checked(cmd)
+        stored = generate_entry(cmd)
+    else:
+        # the man page may have changed since
+        REFRESHER.submit(cmd)
+    return stored["options"]
 
 
 @contextual_command_completer
@@ -0,0 +1,185 @@
+"""Matching and ranking of completions against the typed text.
+
+The fuzzy matcher works like the one of fzf: the typed characters have to
+appear in order, and the matches are scored with bonuses for characters at
+the start of words or camelCase humps and for consecutive characters, and
+with penalties for the gaps between them.
+"""
+
+import functools
+import heapq
+import itertools
+import operator
+import re
+import typing as tp
+
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = 8
+BONUS_CAMEL = 7
+BONUS_CONSECUTIVE = 4
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+BONUS_CASE = 1
+
+PREFIX, SUBSTRING, SUBSEQUENCE, MISMATCH = range(4)
+"""The tiers of the matches, every match of a tier ranks above the next one"""
+
+_DELIMITERS = frozenset(" /\\_-.:,;=@+")
+
+
+@functools.lru_cache(maxsize=64)
+def _pattern(query: str, case_sensitive=True):
+    flags = 0 if case_sensitive else re.IGNORECASE
+    # "a[^b]*b" finds the same texts as "a.*?b" with less backtracking
+    parts = [re.escape(query[0])] if query else []
+    parts += [f"[^{re.escape(c)}]*{re.escape(c)}" for c in query[1:]]
+    return re.compile("".join(parts), flags)
+
+
+@functools.lru_cache(maxsize=64)
+def _groups(query: str):
+    return re.compile(".*?".join(f"({re.escape(c)})" for c in query), re.DOTALL)
+
+
+def is_match(text: str, query: str, case_sensitive=True) -> bool:
+    """Whether the characters of ``query`` appear in order in ``text``."""
+    return _pattern(query, case_sensitive).search(text) is not None
+
+
+def match_tier(query: str, text: str, case_sensitive=True) -> int:
+    """Whether ``text`` starts with ``query`` (:data:`PREFIX`), contains it
+    (:data:`SUBSTRING`), contains its characters in order
+    (:data:`SUBSEQUENCE`) or doesn't match (:data:`MISMATCH`)."""
+    if not case_sensitive:
+        query, text = query.lower(), text.lower()
+    if text.startswith(query):
+        return PREFIX
+    if query in text:
+        return SUBSTRING
+    if is_match(text, query):
+        return SUBSEQUENCE
+    return MISMATCH
+
+
+def _positions(folded: str, query: str):
+    """The indices of the shortest match ending at the first possible end."""
+    m = _groups(query).search(folded)
+    end = m.start(len(query))
+    positions = [end]
+    for char in reversed(query[:-1]):
+        end = folded.rfind(char, 0, end)
+        positions.append(end)
+    positions.reverse()
+    return positions
+
+
+def _bonus(text: str, i: int) -> int:
+    if i == 0 or text[i - 1] in _DELIMITERS:
+        return BONUS_BOUNDARY
+    before, char = text[i - 1], text[i]
+    if (before.islower() and char.isupper()) or (
+        char.isdigit() and not before.isdigit()
+    ):
+        return BONUS_CAMEL
+    return 0
+
+
+def score(text: str, query: str, positions: tp.Sequence[int]) -> int:
+    """The score of a match of ``query`` at the given positions of ``text``."""
+    result = 0
+    prev = -1
+    for n, (char, i) in enumerate(zip(query, positions)):
+        bonus = _bonus(text, i)
+        if n == 0:
+            bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+        elif i == prev + 1:
+            bonus = max(bonus, BONUS_CONSECUTIVE)
+        else:
+            result += SCORE_GAP_START + SCORE_GAP_EXTENSION * (i - prev - 2)
+        result += SCORE_MATCH + bonus
+        if text[i] == char:
+            result += BONUS_CASE
+        prev = i
+    return result
+
+
+def _rank_key(text, folded, typed, query):
+    if len(text) != len(folded):
+        # lowercasing changed the length, the positions are off
+        text = folded
+    return -score(text, typed, _positions(folded, query)), len(text), folded
+
+
+def sort_key(query: str, text: str, case_sensitive=True):
+    """The key that sorts texts like :func:`rank`, with the texts that don't
+    match ``query`` last, in alphabetical order."""
+    folded, folded_query = (
+        (text, query) if case_sensitive else (text.lower(), query.lower())
+    )
+    tier = match_tier(folded_query, folded)
+    if tier == MISMATCH or not query:
+        return tier, 0, 0, folded.lower()
+    return (tier,) + _rank_key(text, folded, query, folded_query)
+
+
+_ZEROS = itertools.repeat(0)
+
+
+def _subsequences(query, folded, found):
+    """The indices of the texts that contain the query only as a subsequence."""
+    missing = map(operator.lt, found, _ZEROS)
+    rest = list(itertools.compress(range(len(folded)), missing))
+    mask = map(_pattern(query).search, [folded[i] for i in rest])
+    return itertools.compress(rest, mask)
+
+
+def rank(
+    query: str,
+    candidates: tp.Sequence[tp.Any],
+    case_sensitive=True,
+    limit=0,
+    key: "tp.Callable[[tp.Any], str] | None" = None,
+) -> tp.List[tp.Any]:
+    """The candidates that match ``query``, best first.
+
+    Prefix matches come before substring matches, which come before the
+    other subsequence matches. Within a tier, the candidates are ordered by
+    score, then length and name. The candidates are tested a tier at a time
+    over the whole list, and with a ``limit`` the lower tiers are skipped
+    once there are enough matches.
+    """
+    texts = list(map(key, candidates)) if key else list(candidates)
+    typed = query
+    if case_sensitive:
+        folded = texts
+    else:
+        query = query.lower()
+        folded = list(map(str.lower, texts))
+    if not query:
+        ranked = sorted(range(len(texts)), key=lambda i: (folded[i], texts[i]))
+        return [candidates[i] for i in ranked[: limit or None]]
+
+    def sort_key(i):
+        return _rank_key(texts[i], folded[i], typed, query)
+
+    indices = range(len(texts))
+    found = list(map(str.find, folded, itertools.repeat(query)))
+    tiers = [
+        lambda: itertools.compress(indices, map(operator.not_, found)),
+        lambda: itertools.compress(indices, map(operator.gt, found, _ZEROS)),
+        lambda: _subsequences(query, folded, found),
+    ]
+    ranked: tp.List[int] = []
+    for tier in tiers:
+        matched = list(tier())
+        if limit and len(ranked) + len(matched) >= limit:
+            ranked.extend(heapq.nsmallest(limit - len(ranked), matched, key=sort_key))
+            break
+        ranked.extend(sorted(matched, key=sort_key))
+    return [candidates[i] for i in ranked]
+
+
+def filter_matches(query: str, texts: tp.Iterable[str], case_sensitive=True):
+    """The texts that contain the characters of ``query`` in order."""
+    return filter(_pattern(query, case_sensitive).search, texts)
@@ -1,7 +1,10 @@
 import ast
+import collections
 import glob
 import os
 import re
+import threading
+import time
 
 import xonsh.lazyasd as xl
 import xonsh.platform as xp
@@ -20,6 +23,120 @@ def PATTERN_NEED_QUOTES():
     return re.compile(pattern)
 
 
+RACY_NS = 2_000_000_000
+"""Listings taken this close to the modification of a directory are not
+reused, since a later change may not move the modification time on
+filesystems with a coarse timestamp resolution."""
+
+
+def _scan(path):
+    entries = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                # the type comes with the listing on most systems, the
+                # target of a symlink is looked up when it's needed
+                is_dir = None if entry.is_symlink() else entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries[entry.name] = is_dir
+    return entries
+
+
+class DirCache:
+    """Listings of the directories that were completed recently.
+
+    A listing maps the names of the entries to whether they are directories
+    (``None`` for symlinks) and is reused as long as the modification time
+    of the directory is unchanged.
+    """
+
+    def __init__(self, size=128):
+        self.size = size
+        self._listings = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def listdir(self, path):
+        """The entries of the directory. Raises ``OSError`` if it can't be
+        listed."""
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        stamp = (st.st_mtime_ns, st.st_ino, st.st_dev)
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._listings.move_to_end(key)
+                return cached[1]
+        entries = _scan(key)
+        if time.time_ns() - st.st_mtime_ns > RACY_NS:
+            with self._lock:
+                self._listings[key] = (stamp, entries)
+                self._listings.move_to_end(key)
+                while len(self._listings) > self.size:
+                    self._listings.popitem(last=False)
+        return entries
+
+    def view(self):
+        return DirView(self)
+
+    def clear(self):
+        with self._lock:
+            self._listings.clear()
+
+
+class DirView:
+    """Looks at every directory at most once, for the duration of a
+    completion."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._seen = {}
+
+    def listdir(self, path):
+        """The entries of the directory, or ``None`` if it can't be listed."""
+        key = os.path.abspath(path)
+        if key not in self._seen:
+            try:
+                self._seen[key] = self.cache.listdir(key)
+            except OSError:
+                self._seen[key] = None
+        return self._seen[key]
+
+    def isdir(self, path):
+        """Like ``os.path.isdir``, answered from the listing of the parent."""
+        parent, name = os.path.split(os.path.abspath(path))
+        entries = self.listdir(parent) if name else None
+        is_dir = None if entries is None else entries.get(name)
+        if is_dir is None:
+            return os.path.isdir(path)
+        return is_dir
+
+    def startswith(self, prefix, csc=True, include_dotfiles=False):
+        """The paths that start with the literal ``prefix``, like globbing
+        ``prefix*`` does."""
+        path = XSH.expand_path(prefix)
+        dirname, base = os.path.split(path)
+        entries = self.listdir(dirname or os.curdir)
+        if entries is None:
+            if csc:
+                return []
+            # the case of the directories may differ too
+            return list(xt.iglobpath(glob.escape(prefix) + "*", ignore_case=True))
+        if not csc:
+            base = base.casefold()
+        hidden = not (include_dotfiles or base.startswith("."))
+        return [
+            os.path.join(dirname, name)
+            for name in entries
+            if (name if csc else name.casefold()).startswith(base)
+            and not (hidden and name.startswith("."))
+        ]
+
+
+DIR_CACHE = DirCache()
+"""Listings shared by the path completions"""
+
+
 def cd_in_command(line):
     """Returns True if "cd" is a token in the line, False otherwise."""
     lexer = XSH.execer.parser.lexer
@@ -131,17 +248,15 @@ def _dots(prefix):
         return ()
 
 
-def _add_cdpaths(paths, prefix):
+def _add_cdpaths(paths, prefix, view=None):
     """Completes current prefix using CDPATH"""
     env = XSH.env
     csc = env.get("CASE_SENSITIVE_COMPLETIONS")
-    glob_sorted = env.get("GLOB_SORTED")
+    dotglob = env.get("DOTGLOB")
+    view = view or DIR_CACHE.view()
     for cdp in env.get("CDPATH"):
-        test_glob = os.path.join(cdp, prefix) + "*"
-        for s in xt.iglobpath(
-            test_glob, ignore_case=(not csc), sort_result=glob_sorted
-        ):
-            if os.path.isdir(s):
+        for s in view.startswith(os.path.join(cdp, prefix), csc, dotglob):
+            if view.isdir(s):
                 paths.add(os.path.relpath(s, cdp))
 
 
@@ -154,15 +269,17 @@ def _quote_to_use(x):
         return single
 
 
-def _is_directory_in_cdpath(path):
+def _is_directory_in_cdpath(path, isdir=os.path.isdir):
     env = XSH.env
     for cdp in env.get("CDPATH"):
-        if os.path.isdir(os.path.join(cdp, path)):
+        if isdir(os.path.join(cdp, path)):
             return True
     return False
 
 
-def _quote_paths(paths, start, end, append_end=True, cdpath=False):
+def _quote_paths(
+    paths, start, end, append_end=True, cdpath=False, isdir=os.path.isdir
+):
     expand_path = XSH.expand_path
     out = set()
     space = " "
@@ -183,7 +300,7 @@ def _quote_paths(paths, start, end, append_end=True, cdpath=False):
         if start == "" and need_quotes:
             start = end = _quote_to_use(s)
         expanded = expand_path(s)
-        if os.path.isdir(expanded) or (cdpath and _is_directory_in_cdpath(expanded)):
+        if isdir(expanded) or (cdpath and _is_directory_in_cdpath(expanded, isdir)):
             _tail = slash
         elif end == "":
             _tail = space
@@ -268,19 +385,23 @@ def _subsequence_match_iter(ref, typed):
         return _subsequence_match_iter(ref[1:], typed)
 
 
-def _expand_one(sofar, nextone, csc):
+def _expand_one(sofar, nextone, csc, view=None):
     out = set()
-    glob_sorted = XSH.env.get("GLOB_SORTED")
+    dotglob = XSH.env.get("DOTGLOB")
+    view = view or DIR_CACHE.view()
     for i in sofar:
-        _glob = os.path.join(_joinpath(i), "*") if i is not None else "*"
-        for j in xt.iglobpath(_glob, sort_result=glob_sorted):
-            j = os.path.basename(j)
+        path = XSH.expand_path(_joinpath(i)) if i is not None else os.curdir
+        for j in view.listdir(path) or ():
+            if j.startswith(".") and not dotglob:
+                continue
             if subsequence_match(j, nextone, csc):
                 out.add((i or ()) + (j,))
     return out
 
 
-def _complete_path_raw(prefix, line, start, end, ctx, cdpath=True, filtfunc=None):
+def _complete_path_raw(
+    prefix, line, start, end, ctx, cdpath=True, filtfunc=None, dirs_only=False
+):
     # string stuff for automatic quoting
     path_str_start = ""
     path_str_end = ""
@@ -302,10 +423,9 @@ def _complete_path_raw(prefix, line, start, end, ctx, cdpath=True, filtfunc=None
     paths = set()
     env = XSH.env
     csc = env.get("CASE_SENSITIVE_COMPLETIONS")
-    glob_sorted = env.get("GLOB_SORTED")
-    prefix = glob.escape(prefix)
-    for s in xt.iglobpath(prefix + "*", ignore_case=(not csc), sort_result=glob_sorted):
-        paths.add(s)
+    dotglob = env.get("DOTGLOB")
+    view = DIR_CACHE.view()
+    paths.update(view.startswith(prefix, csc, dotglob))
     if len(paths) == 0 and env.get("SUBSEQUENCE_PATH_COMPLETION"):
         # this block implements 'subsequence' matching, similar to fish and zsh.
         # matches are based on subsequences, not substrings.
@@ -325,25 +445,28 @@ def _complete_path_raw(prefix, line, start, end, ctx, cdpath=True, filtfunc=None
                 basedir = None
             matches_so_far = {basedir}
             for i in p:
-                matches_so_far = _expand_one(matches_so_far, i, csc)
+                matches_so_far = _expand_one(matches_so_far, i, csc, view)
             paths |= {_joinpath(i) for i in matches_so_far}
     if len(paths) == 0 and env.get("FUZZY_PATH_COMPLETION"):
         threshold = env.get("SUGGEST_THRESHOLD")
-        for s in xt.iglobpath(
-            os.path.dirname(prefix) + "*",
-            ignore_case=(not csc),
-            sort_result=glob_sorted,
-        ):
+        for s in view.startswith(os.path.dirname(prefix), csc, dotglob):
             if xt.levenshtein(prefix, s, threshold) < threshold:
                 paths.add(s)
     if cdpath and cd_in_command(line):
-        _add_cdpaths(paths, prefix)
+        _add_cdpaths(paths, prefix, view)
+    if dirs_only:
+        paths = set(filter(view.isdir, paths))
     paths = set(filter(filtfunc, paths))
     if tilde in prefix:
         home = os.path.expanduser(tilde)
         paths = {s.replace(home, tilde) for s in paths}
     paths, _ = _quote_paths(
-        {_normpath(s) for s in paths}, path_str_start, path_str_end, append_end, cdpath
+        {_normpath(s) for s in paths},
+        path_str_start,
+        path_str_end,
+        append_end,
+        cdpath,
+        view.isdir,
     )
     paths.update(filter(filtfunc, _dots(prefix)))
     return paths, lprefix
@@ -362,7 +485,9 @@ def complete_path(context):
     return set(), 0
 
 
-def contextual_complete_path(command: CommandContext, cdpath=True, filtfunc=None):
+def contextual_complete_path(
+    command: CommandContext, cdpath=True, filtfunc=None, dirs_only=False
+):
     # ``_complete_path_raw`` may add opening quotes:
     prefix = command.raw_prefix
 
@@ -374,6 +499,7 @@ def contextual_complete_path(command: CommandContext, cdpath=True, filtfunc=None
         ctx={},
         cdpath=cdpath,
         filtfunc=filtfunc,
+        dirs_only=dirs_only,
     )
 
     # ``_complete_path_raw`` may have added closing quotes:
@@ -385,4 +511,4 @@ def contextual_complete_path(command: CommandContext, cdpath=True, filtfunc=None
 
 
 def complete_dir(command: CommandContext):
-    return contextual_complete_path(command, filtfunc=os.path.isdir)
+    return contextual_complete_path(command, dirs_only=True)
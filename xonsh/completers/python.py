@@ -3,11 +3,14 @@ import builtins
 import collections.abc as cabc
 import inspect
 import re
+import types
 import warnings
+import weakref
 
 import xonsh.lazyasd as xl
 import xonsh.tools as xt
 from xonsh.built_ins import XSH
+from xonsh.completer import cache_generation
 from xonsh.completers.tools import (
     CompleterResult,
     RichCompletion,
@@ -22,6 +25,11 @@ def RE_ATTR():
     return re.compile(r"([^\s\(\)]+(\.[^\s\(\)]+)*)\.(\w*)$")
 
 
+@xl.lazyobject
+def RE_NAME_CHAIN():
+    return re.compile(r"([^\W\d]\w*)(\.[^\W\d]\w*)*$")
+
+
 @xl.lazyobject
 def XONSH_EXPR_TOKENS():
     return {
@@ -203,6 +211,10 @@ def _safe_eval(expr, ctx):
     """Safely tries to evaluate an expression. If this fails, it will return
     a (None, None) tuple.
     """
+    if ctx is not None and RE_NAME_CHAIN.match(expr):
+        result = _eval_chain(expr, ctx)
+        if result is not None:
+            return result
     _ctx = None
     xonsh_safe_eval = XSH.execer.eval
     try:
@@ -217,6 +229,114 @@ def _safe_eval(expr, ctx):
     return val, _ctx
 
 
+_chains: "dict[str, tuple]" = {}
+_chains_generation = -1
+_MISSING = object()
+
+
+def _eval_chain(expr, ctx):
+    """Evaluates a chain of names like ``os.path.sep`` with ``getattr``, or
+    returns None if its first name isn't defined.
+
+    The results are reused while the same line is edited, until the cached
+    completions are invalidated, unless the first name was bound to another
+    object.
+    """
+    global _chains, _chains_generation
+    name, *attrs = expr.split(".")
+    root = ctx.get(name, _MISSING)
+    if root is _MISSING:
+        root = builtins.__dict__.get(name, _MISSING)
+        if root is _MISSING:
+            return None
+    generation = cache_generation()
+    if generation != _chains_generation:
+        _chains, _chains_generation = {}, generation
+    cached = _chains.get(expr)
+    if cached is not None and cached[0] is ctx and cached[1] is root:
+        return cached[2]
+    val = root
+    try:
+        for attr in attrs:
+            val = getattr(val, attr)
+        result = val, ctx
+    except Exception:
+        result = None, None
+    _chains[expr] = (ctx, root, result)
+    return result
+
+
+class IdentityCache:
+    """Values computed from objects, keyed by the identity of the objects
+    and dropped along with them. A value is computed again when the version
+    of its object changed. Objects that can't be weakly referenced aren't
+    cached.
+    """
+
+    def __init__(self):
+        self._entries: "dict[int, tuple]" = {}
+
+    def get(self, obj, version, compute):
+        key = id(obj)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is obj and entry[1] == version:
+            return entry[2]
+        value = compute(obj)
+
+        def forget(ref):
+            if self._entries.get(key, (None,))[0] is ref:
+                del self._entries[key]
+
+        try:
+            ref = weakref.ref(obj, forget)
+        except TypeError:
+            return value
+        self._entries[key] = (ref, version, value)
+        return value
+
+
+_DIRS = IdentityCache()
+_SIGNATURES = IdentityCache()
+_BOUND_SIGNATURES = IdentityCache()
+_DEFAULT_DIRS = (object.__dir__, types.ModuleType.__dir__, type.__dir__)
+
+
+def _dir_version(obj):
+    """Changes when the result of ``dir(obj)`` may have: whenever the cached
+    completions are invalidated, and in between when the object, its class
+    or one of their bases gained or lost attributes. Objects with their own
+    ``__dir__`` may change at any time, they're only looked at again after an
+    invalidation, like attributes replaced by others without changing the
+    sizes of the dicts."""
+    generation = cache_generation()
+    cls = type(obj)
+    try:
+        attrs = object.__getattribute__(obj, "__dict__")
+    except (AttributeError, TypeError):
+        attrs = {}
+    if cls.__dir__ not in _DEFAULT_DIRS or "__dir__" in attrs:
+        return generation
+    sizes = tuple(len(c.__dict__) for c in cls.__mro__)
+    return generation, id(cls), len(attrs), sizes
+
+
+def _dir(obj):
+    """``dir(obj)``, cached"""
+    return _DIRS.get(obj, _dir_version(obj), dir)
+
+
+def _signature(obj):
+    """``inspect.signature(obj)``, cached until the cached completions are
+    invalidated."""
+    if isinstance(obj, types.MethodType):
+        # a new bound method is created on every access, and its signature
+        # lacks the first parameter of the function
+        return _BOUND_SIGNATURES.get(
+            obj.__func__, cache_generation(), lambda _: inspect.signature(obj)
+        )
+    return _SIGNATURES.get(obj, cache_generation(), inspect.signature)
+
+
 @_turn_off_warning
 def attr_complete(prefix, ctx, filter_func):
     """Complete attributes of an object."""
@@ -232,9 +352,9 @@ def attr_complete(prefix, ctx, filter_func):
     if val is None and _ctx is None:
         return attrs
     if len(attr) == 0:
-        opts = [o for o in dir(val) if not o.startswith("_")]
+        opts = [o for o in _dir(val) if not o.startswith("_")]
     else:
-        opts = [o for o in dir(val) if filter_func(o, attr)]
+        opts = [o for o in _dir(val) if filter_func(o, attr)]
     prelen = len(prefix)
     for opt in opts:
         # check whether these options actually work (e.g., disallow 7.imag)
@@ -242,7 +362,7 @@ def attr_complete(prefix, ctx, filter_func):
         _val_, _ctx_ = _safe_eval(_expr, _ctx)
         if _val_ is None and _ctx_ is None:
             continue
-        a = getattr(val, opt)
+        a = _val_
         if XSH.env["COMPLETIONS_BRACKETS"]:
             if callable(a):
                 rpl = opt + "("
@@ -272,7 +392,7 @@ def python_signature_complete(prefix, line, end, ctx, filter_func):
     if val is None:
         return set()
     try:
-        sig = inspect.signature(val)
+        sig = _signature(val)
     except (ValueError, TypeError):
         return set()
     args = {p + "=" for p in sig.parameters if filter_func(p, prefix)}
@@ -9,6 +9,7 @@ from functools import wraps
 
 import xonsh.tools as xt
 from xonsh.built_ins import XSH
+from xonsh.completers import matcher
 from xonsh.lazyasd import lazyobject
 from xonsh.parsers.completion_context import CommandContext, CompletionContext
 
@@ -29,12 +30,23 @@ def _filter_ignorecase(text, prefix):
     return _filter_with_func(text, prefix, func)
 
 
+def _filter_fuzzy(text, prefix):
+    return _filter_with_func(text, prefix, matcher.is_match)
+
+
+def _filter_fuzzy_ignorecase(text, prefix):
+    func = lambda txt, pre: matcher.is_match(txt, pre, case_sensitive=False)
+    return _filter_with_func(text, prefix, func)
+
+
 def get_filter_function():
     """
     Return an appropriate filtering function for completions, given the valid
-    of $CASE_SENSITIVE_COMPLETIONS
+    of $CASE_SENSITIVE_COMPLETIONS and $XONSH_COMPLETION_MATCHER
     """
     csc = XSH.env.get("CASE_SENSITIVE_COMPLETIONS")
+    if XSH.env.get("XONSH_COMPLETION_MATCHER") == "fuzzy":
+        return _filter_fuzzy if csc else _filter_fuzzy_ignorecase
     if csc:
         return _filter_normal
     else:
@@ -200,6 +212,20 @@ def is_exclusive_completer(func):
     return not getattr(func, "non_exclusive", False)
 
 
+def uncached_completer(func):
+    """Decorator for a completer whose results can't be reused for a longer prefix
+
+    By default, when the prefix is extended, the completions found for the
+    shorter prefix are filtered instead of asking the completers again.
+    """
+    func.uncached = True  # type: ignore
+    return func
+
+
+def is_cached_completer(func):
+    return not getattr(func, "uncached", False)
+
+
 def apply_lprefix(comps, lprefix):
     if lprefix is None:
         return comps
@@ -260,10 +286,16 @@ def sub_proc_get_output(*args, **env_vars: str) -> "tuple[bytes, bool]":
 
 
 def complete_from_sub_proc(*args: str, sep=None, filter_prefix=None, **env_vars: str):
+    stdout, _ = sub_proc_get_output(*args, **env_vars)
+    yield from complete_from_output(stdout, sep=sep, filter_prefix=filter_prefix)
+
+
+def complete_from_output(stdout: bytes, sep=None, filter_prefix=None):
+    """Completions from the output of a completion command, one per line by
+    default, with an optional tab-separated description."""
     if sep is None:
         sep = str.splitlines
     filter_func = get_filter_function()
-    stdout, _ = sub_proc_get_output(*args, **env_vars)
 
     if stdout:
         output = stdout.decode().strip()
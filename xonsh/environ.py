@@ -1388,6 +1388,25 @@ class PromptSetting(Xettings):
         "http://xon.sh/tutorial.html#customizing-the-prompt",
         is_configurable=False,
     )
+    PROMPT_FIELDS_DEBUG = Var.with_default(
+        False,
+        "Print the names of the prompt fields that were computed for each "
+        "prompt to stderr. The other fields were reused from an earlier prompt "
+        "because their declared dependencies did not change.",
+    )
+    PROMPT_FIELD_WARN_TIME = Var.with_default(
+        0.0,
+        "Print a warning to stderr when computing a prompt field takes more than "
+        "this number of seconds. 0 disables the warning. See "
+        "``xonfig prompt-stats`` for the timings of all the fields.",
+    )
+    PROMPT_PREFETCH = Var.with_default(
+        True,
+        "Compute the prompt fields with declared dependencies in the background "
+        "as soon as one of them changes, e.g. when changing directory, so that "
+        "they are ready when the command returns. The values are only used if "
+        "the dependencies are still the same when the prompt is shown.",
+    )
     PROMPT_REFRESH_INTERVAL = Var.with_default(
         0.0,  # keep as float
         "Interval (in seconds) to evaluate and update ``$PROMPT``, ``$RIGHT_PROMPT`` "
@@ -1673,6 +1692,13 @@ class AsyncPromptSetting(PTKSetting):
         "Define the number of workers used by the ASYNC_PROMPT's pool. "
         "By default it is the same as defined by Python's concurrent.futures.ThreadPoolExecutor class.",
     )
+    ASYNC_PROMPT_FIELD_TIMEOUT = Var.with_default(
+        10.0,
+        "When ENABLE_ASYNC_PROMPT is True, the number of seconds the prompt waits "
+        "for a field before giving up and keeping its last value. The field keeps "
+        "running in the background and is not started again by the next prompts "
+        "until it is done. Set it to 0 to wait as long as the field runs.",
+    )
     ENABLE_ASYNC_PROMPT = Var.with_default(
         False,
         "When enabled the prompt is rendered using threads. "
@@ -1727,6 +1753,20 @@ This is to reduce the noise in generated completions.""",
         ),
         type_str="env_path",
     )
+    BASH_COMPLETIONS_WORKER = Var.with_default(
+        True,
+        "Whether the bash completions are computed by a bash process that is "
+        "kept running between completions, so that the ``bash_completion`` "
+        "script is sourced only once. The process is restarted when it dies "
+        "or when the environment changes. If False, a new bash process is "
+        "started for every completion.",
+    )
+    BASH_COMPLETIONS_TIMEOUT = Var.with_default(
+        10.0,
+        "The number of seconds the bash completion worker has to reply. When "
+        "it takes longer, the worker is restarted and nothing is completed, so "
+        "that a hanging completion function doesn't block the next completions.",
+    )
     CASE_SENSITIVE_COMPLETIONS = Var.with_default(
         ON_LINUX,
         "Sets whether completions should be case sensitive or case " "insensitive.",
@@ -1743,6 +1783,24 @@ This is to reduce the noise in generated completions.""",
         "The number of completions to display before the user is asked "
         "for confirmation.",
     )
+    COMPLETION_TIMEOUT_MS = Var.with_default(
+        0,
+        "Milliseconds the completers have to produce their completions. "
+        "The completers that didn't finish in time are dropped and the "
+        "completions found so far are shown. With ``$XONSH_TRACE_COMPLETIONS``, "
+        "the dropped completers are listed. "
+        "A dropped completer keeps running in the background and is skipped "
+        "until it finishes. "
+        "If 0, every completer is waited for.",
+    )
+    MAN_COMPLETIONS_PREGENERATE = Var.with_default(
+        20,
+        "The number of commands whose options are parsed from their man pages "
+        "in the background after the first prompt, taken from the most used "
+        "commands in the history. Options that were parsed before are parsed "
+        "again when the man page changed. If 0, the man pages are only parsed "
+        "when their options are completed.",
+    )
     FUZZY_PATH_COMPLETION = Var.with_default(
         True,
         "Toggles 'fuzzy' matching of paths for tab completion, which is only "
@@ -1755,6 +1813,17 @@ This is to reduce the noise in generated completions.""",
         "Toggles subsequence matching of paths for tab completion. "
         "If ``True``, then, e.g., ``~/u/ro`` can match ``~/lou/carcolh``.",
     )
+    XONSH_COMPLETION_MATCHER = Var.with_default(
+        "prefix",
+        "How completions are matched against the typed text.\n\n"
+        "- ``prefix``: the completions start with the typed text.\n"
+        "- ``fuzzy``: the typed characters appear in order in the completions, "
+        "like in fzf. E.g. ``gco`` matches ``git-checkout``.\n\n"
+        "In both modes, the completions that start with the typed text are "
+        "listed first, then those that contain it, then the other matches. "
+        "In ``fuzzy`` mode, the matches are ranked by a score that favors "
+        "characters at the start of words and consecutive characters.",
+    )
 
 
 class PTKCompletionSetting(AutoCompletionSetting):
@@ -2110,7 +2179,7 @@ class Env(cabc.MutableMapping):
         else:
             e = "Unknown environment variable: ${}"
             raise KeyError(e.format(key))
-        if isinstance(
+        if type(val) not in _IMMUTABLE_TYPES and isinstance(
             val, (cabc.MutableSet, cabc.MutableSequence, cabc.MutableMapping)
         ):
             self._detyped = None
@@ -2309,6 +2378,9 @@ class Env(cabc.MutableMapping):
         return self._vars[name].is_configurable
 
 
+_IMMUTABLE_TYPES = frozenset((str, int, float, bool, tuple, type(None)))
+
+
 class InternalEnvironDict(ChainMap):
     """A dictionary which supports thread-local overrides.
     There are two reasons we can't use ChainMap directly:
@@ -2337,6 +2409,16 @@ class InternalEnvironDict(ChainMap):
         # This is here for ChainMap.__init__.
         pass
 
+    # lookups are done for every env-var access, avoid building ``maps``
+    def __getitem__(self, key):
+        local = self._local
+        if key in local:
+            return local[key]
+        return self._global[key]
+
+    def __contains__(self, key):
+        return key in self._local or key in self._global
+
     def __setitem__(self, key, value):
         # If the value is overridden locally, set it locally.
         local = self._local
@@ -1,23 +1,45 @@
 """Implements the xonsh executer."""
+import ast
 import builtins
+import collections
 import collections.abc as cabc
 import inspect
+import re
 import sys
 import types
 
-from xonsh.ast import CtxAwareTransformer
+from xonsh.ast import CtxAwareTransformer, Expr, Interactive, Module, plain_subproc
+from xonsh.lazyasd import lazyobject
 from xonsh.parser import Parser
 from xonsh.tools import (
     balanced_parens,
     ends_with_colon_token,
     find_next_break,
     get_logical_line,
+    plain_subproc_words,
     replace_logical_line,
     starting_whitespace,
     subproc_toks,
 )
 
 
+@lazyobject
+def RE_XONSH_SYNTAX():
+    """Matches what may be read differently by the xonsh parser than by
+    Python's, i.e. environment variables, subprocess and Python-evaluation
+    operators, regex globs, help, macros, redirections and non-ASCII text
+    (for which CPython's column offsets are not character offsets).
+    """
+    return re.compile(
+        r"[$`?]|!(?!=)|@[($]|&&|\|\||(?<!\w)(?:out|all|err|[eao12&])>|[^\x00-\x7f]"
+    )
+
+
+@lazyobject
+def RE_PLAIN_SUBPROC_LINE():
+    return re.compile(r"(\S[^\n]*?)([ \t]*\n)")
+
+
 class Execer:
     """Executes xonsh code in a context."""
 
@@ -52,6 +74,10 @@ class Execer:
         self.scriptcache = scriptcache
         self.cacheall = cacheall
         self.ctxtransformer = CtxAwareTransformer(self.parser)
+        self.parse_paths = collections.Counter()
+        """How many inputs were parsed by CPython's parser ("python"), were
+        plain subprocess commands ("subproc") or needed the xonsh parser
+        ("xonsh")."""
 
     def parse(self, input, ctx, mode="exec", filename=None, transform=True):
         """Parses xonsh code in a context-aware fashion. For context-free
@@ -61,10 +87,20 @@ class Execer:
         if filename is None:
             filename = self.filename
         if not transform:
+            self.parse_paths["xonsh"] += 1
             return self.parser.parse(
                 input, filename=filename, mode=mode, debug_level=(self.debug_level >= 2)
             )
 
+        # [Phase 0]
+        # Most input is either plain Python, which CPython's own parser reads
+        # much faster than ours, or a plain command, whose subprocess AST is
+        # easily built by hand.  Both still need the context-aware phase.
+        path, tree, input = self._parse_fast(input, mode=mode)
+        self.parse_paths[path] += 1
+        if path != "xonsh":
+            return self._ctxvisit(tree, input, ctx, mode=mode)
+
         # [Phase 1]
         # Parsing actually happens in a couple of phases. The first is a
         # shortcut for a context-free parser. Normally, all subprocess
@@ -84,6 +120,9 @@ class Execer:
         # nodes, and some subproc-as-Python nodes. We now need a context-
         # aware phase to disambiguate the two.
         tree, input = self._parse_ctx_free(input, mode=mode, filename=filename)
+        return self._ctxvisit(tree, input, ctx, mode=mode)
+
+    def _ctxvisit(self, tree, input, ctx, mode="exec"):
         if tree is None:
             return None
 
@@ -206,6 +245,38 @@ class Execer:
                 return None  # handles comment only input
         return exec(code, glbs, locs)
 
+    def _parse_fast(self, input, mode="exec"):
+        """Parses the input without the xonsh parser if it is plain Python or a
+        plain command, on a single line.  Returns a ``(path, tree, input)``
+        tuple, where ``path`` is ``"xonsh"`` if the xonsh parser is needed.
+        The input is returned with a plain command wrapped in ``![]``.
+        """
+        # the xonsh parser picks the start symbol by the trailing newline
+        if input.endswith("\n") == (mode == "eval"):
+            return "xonsh", None, input
+        if RE_XONSH_SYNTAX.search(input) is None:
+            try:
+                tree = ast.parse(input, mode=mode)
+            except (SyntaxError, ValueError):
+                pass
+            else:
+                if mode != "eval" and not tree.body:
+                    tree = None  # comment only input
+                return "python", tree, input
+        m = RE_PLAIN_SUBPROC_LINE.fullmatch(input)
+        words = None if m is None else plain_subproc_words(m.group(1))
+        if words is None:
+            return "xonsh", None, input
+        cmd, end = m.groups()
+        expr = Expr(value=plain_subproc(words), lineno=1, col_offset=0)
+        expr.max_lineno = 1
+        expr.max_col = len(cmd) + 2
+        if mode == "single":
+            tree = Interactive(body=[expr])
+        else:
+            tree = Module(body=[expr], type_ignores=[])
+        return "subproc", tree, f"![{cmd}]{end}"
+
     def _print_debug_wrapping(
         self, line, sbpline, last_error_line, last_error_col, maxcol=None
     ):
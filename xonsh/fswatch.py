@@ -0,0 +1,131 @@
+"""Cheap checks for changes on the filesystem between two prompts.
+
+:func:`fingerprint` covers a few known files by their ``stat`` results, so
+that the results of expensive commands can be kept as long as the files
+they were computed from are unchanged. A :class:`DirWatcher` watches the
+entries of a given list of directories with inotify on Linux, without
+descending into their subdirectories.
+"""
+
+import os
+import struct
+
+import xonsh.platform as xp
+from xonsh.lazyasd import lazyobject
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@lazyobject
+def HAVE_INOTIFY():
+    """Whether the inotify API of Linux can be used through libc."""
+    if not xp.ON_LINUX:
+        return False
+    libc = xp.LIBC
+    return libc is not None and hasattr(libc, "inotify_init1")
+
+
+def fingerprint(paths):
+    """The modification times, sizes and inodes of the given paths.
+
+    Missing paths are part of the fingerprint too, so that creating or
+    removing one of them changes it.
+    """
+    result = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            result.append(None)
+        else:
+            result.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(result)
+
+
+class DirWatcher:
+    """Watches the entries of the given directories with inotify.
+
+    Only the directories themselves are watched, their subdirectories are
+    not walked. Each of them takes one of the ``fs.inotify.max_user_watches``
+    of the user, until :meth:`close` is called.
+
+    Raises ``OSError`` if inotify or one of the watches can't be set up.
+    """
+
+    _LOST = IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED
+
+    def __init__(self, dirs):
+        self.valid = True
+        """False once one of the directories was removed or moved away, its
+        path isn't watched anymore"""
+        self._fd = xp.LIBC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError("could not initialize inotify")
+        try:
+            for path in dirs:
+                wd = xp.LIBC.inotify_add_watch(
+                    self._fd, os.fsencode(path), WATCH_MASK
+                )
+                if wd < 0:
+                    raise OSError(f"could not watch {path}")
+        except OSError:
+            self.close()
+            raise
+
+    def changed(self) -> bool:
+        """Whether something changed in the directories since the watcher was
+        created or this method was last called."""
+        if self._fd < 0:
+            return True
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            # any event is a change, including a queue overflow
+            changed = True
+            pos = 0
+            while pos < len(data):
+                _, mask, _, size = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size + size
+                if mask & self._LOST:
+                    self.valid = False
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
@@ -2,11 +2,14 @@
 
 Written using a hybrid of ``tokenize`` and PLY.
 """
+import collections
 import io
+import itertools
 
 # 'keyword' interferes with ast.keyword
 import keyword as kwmod
 import re
+import threading
 import typing as tp
 
 from xonsh.lazyasd import lazyobject
@@ -363,22 +366,65 @@ def handle_token(state, token):
         yield _new_token("ERRORTOKEN", m, token.start)
 
 
-def get_tokens(s, tolerant):
+class LexerCheckpoint(tp.NamedTuple):
+    """The state of ``get_tokens()`` before it lexes line ``lineno + 1``."""
+
+    lineno: int
+    ntoks: int
+    """How many PLY tokens the preceding lines were lexed into."""
+    last: tp.Any
+    tokenizer: tuple
+
+
+def _line_offset(s, lineno):
+    """The index in ``s`` at which line ``lineno + 1`` starts."""
+    pos = 0
+    for _ in range(lineno):
+        pos = s.index("\n", pos) + 1
+    return pos
+
+
+def get_tokens(s, tolerant, checkpoints=None, resume=None):
     """
     Given a string containing xonsh code, generates a stream of relevant PLY
     tokens using ``handle_token``.
+
+    If a ``checkpoints`` list is given, a ``LexerCheckpoint`` is appended to
+    it before each line that starts a new top-level statement.  Passing one
+    of them as ``resume`` lexes only the lines of ``s`` that follow it, for a
+    string ``s`` which starts with the same lines as the one it was taken
+    from.
     """
+    if resume is None:
+        src, ntoks, last, tokstate = s, 0, None, None
+    else:
+        src = s[_line_offset(s, resume.lineno) :]
+        ntoks, last, tokstate = resume.ntoks, resume.last, resume.tokenizer
     state = {
         "indents": [0],
-        "last": None,
+        "last": last,
         "pymode": [(True, "", "", (0, 0))],
-        "stream": tokenize(io.BytesIO(s.encode("utf-8")).readline, tolerant),
         "tolerant": tolerant,
+        "ntoks": ntoks,
     }
+    def record(tokstate):
+        if len(state["pymode"]) == 1:
+            cp = LexerCheckpoint(tokstate[1], state["ntoks"], state["last"], tokstate)
+            checkpoints.append(cp)
+
+    checkpoint = None if checkpoints is None else record
+    state["stream"] = tokenize(
+        io.BytesIO(src.encode("utf-8")).readline,
+        tolerant,
+        checkpoint=checkpoint,
+        resume=tokstate,
+    )
     while True:
         try:
             token = next(state["stream"])
-            yield from handle_token(state, token)
+            for tok in handle_token(state, token):
+                state["ntoks"] += 1
+                yield tok
         except StopIteration:
             if len(state["pymode"]) > 1 and not tolerant:
                 pm, o, m, p = state["pymode"][-1]
@@ -406,6 +452,323 @@ def _new_token(type, value, pos):
     return o
 
 
+class Token(tp.NamedTuple):
+    """An immutable token, with the same attributes as a PLY ``LexToken``."""
+
+    type: str
+    value: tp.Any
+    lineno: int
+    lexpos: int
+
+
+_new_tuple = tuple.__new__
+LEX_AHEAD = 16
+"""How many tokens a ``TokenArray`` lexes at a time."""
+
+
+class TokenArray:
+    """The token stream of an input string, as a sequence of immutable
+    tokens.  Tokens are produced on demand and memoized, so that the parser
+    may stop at the first syntax error and the helpers wrapping subprocess
+    lines later pick up where it left off rather than lexing the input
+    again.  Tokens may also be sliced by column.
+
+    Lexer checkpoints are recorded at the start of the top-level lines, so
+    that an input made of the same lines followed by new ones only needs the
+    new lines to be lexed, see ``token_array()``.
+    """
+
+    def __init__(
+        self,
+        source,
+        tolerant=False,
+        tokens=None,
+        stream=None,
+        checkpoints=None,
+        resume=None,
+    ):
+        self.source = source
+        self.tolerant = tolerant
+        self.checkpoints = [] if checkpoints is None else list(checkpoints)
+        self._lock = threading.Lock()
+        self._toks = [] if tokens is None else list(tokens)
+        if stream is not None:
+            self._stream = stream
+        elif tokens is None or resume is not None:
+            self._stream = get_tokens(source, tolerant, self.checkpoints, resume)
+        else:
+            self._stream = None
+
+    def _lex(self, n):
+        """Lexes up to ``n`` more tokens.  Returns their index and the tokens
+        as produced by the lexer, while their immutable copies are memoized.
+        """
+        with self._lock:
+            start = len(self._toks)
+            if self._stream is None:
+                return start, []
+            fresh = list(itertools.islice(self._stream, n))
+            if len(fresh) < n:
+                self._stream = None
+            self._toks.extend(
+                [
+                    _new_tuple(Token, (t.type, t.value, t.lineno, t.lexpos))
+                    for t in fresh
+                ]
+            )
+            return start, fresh
+
+    def _fill(self, n=None):
+        """Lexes until there are more than ``n`` tokens, or to the end."""
+        while self._stream is not None and (n is None or len(self._toks) <= n):
+            self._lex(64)
+
+    @property
+    def tokens(self):
+        """All the tokens, as a list that must not be modified."""
+        if self._stream is not None:
+            self._fill()
+        return self._toks
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __iter__(self):
+        i = 0
+        toks = self._toks
+        while True:
+            if i >= len(toks):
+                if self._stream is None:
+                    return
+                # lex a little ahead, to keep the locking overhead low
+                self._fill(i + LEX_AHEAD)
+                if i >= len(toks):
+                    return
+            yield toks[i]
+            i += 1
+
+    def __getitem__(self, index):
+        return self.tokens[index]
+
+    def slice_cols(self, mincol=0, maxcol=None):
+        """Iterates over the tokens starting in columns ``[mincol, maxcol)``
+        of the first line.  Without ``maxcol``, the tokens from the following
+        lines (such as a trailing ``DEDENT``) are included as well.  Only as
+        much of the input as is iterated over gets lexed.
+        """
+        for t in self:
+            if t.lineno == 1:
+                if t.lexpos < mincol:
+                    continue
+                if maxcol is not None and t.lexpos >= maxcol:
+                    return
+            elif maxcol is not None:
+                return
+            yield t
+
+    def is_boundary(self, col):
+        """Whether no token of the first line spans across column ``col``,
+        and the input lexed cleanly up to there.
+        """
+        if col <= 0:
+            return True
+        prev = None
+        for t in self:
+            if t.lineno != 1 or t.type == "ERRORTOKEN":
+                return False
+            if t.lexpos >= col:
+                break
+            prev = t
+        if prev is None:
+            return True
+        return isinstance(prev.value, str) and prev.lexpos + len(prev.value) <= col
+
+
+class _TokenCache:
+    """A small, thread-safe LRU cache of ``TokenArray`` objects, keyed by the
+    input string and the lexer's tolerance.
+    """
+
+    maxsize = 128
+    maxlen = 1 << 16
+    """Longer inputs, i.e. whole scripts, are not cached."""
+
+    def __init__(self):
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, s, tolerant):
+        with self._lock:
+            arr = self._data.get((s, tolerant))
+            if arr is not None:
+                self._data.move_to_end((s, tolerant))
+            return arr
+
+    def put(self, arr):
+        if len(arr.source) > self.maxlen:
+            return
+        with self._lock:
+            self._data[(arr.source, arr.tolerant)] = arr
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+TOKEN_CACHE = _TokenCache()
+
+
+_OPENERS = frozenset(
+    {
+        "LPAREN",
+        "LBRACKET",
+        "LBRACE",
+        "DOLLAR_LPAREN",
+        "DOLLAR_LBRACKET",
+        "DOLLAR_LBRACE",
+        "BANG_LPAREN",
+        "BANG_LBRACKET",
+        "AT_LPAREN",
+        "ATDOLLAR_LPAREN",
+    }
+)
+_CLOSERS = frozenset({"RPAREN", "RBRACKET", "RBRACE"})
+
+
+def _lex_tail(s, pos, tolerant):
+    """The tokens of ``s`` from column ``pos`` on, lexed without the part
+    before it.  Returns None when they could differ from those of ``s``,
+    e.g. when they contain an error message with a column in it.
+    """
+    tail = []
+    for t in get_tokens(s[pos:], tolerant):
+        if t.type == "ERRORTOKEN" or t.lineno != 1:
+            return None
+        tail.append(_new_tuple(Token, (t.type, t.value, t.lineno, t.lexpos + pos)))
+    return tail
+
+
+def _shared_stream(full, s, tolerant):
+    """Tokens of the single line ``s``, taken from the tokens of ``s + "\n"``
+    for as long as they cannot differ.  Only the end of the line, where
+    newlines, line continuations and unterminated brackets are handled, is
+    sensitive to the trailing newline.  When that end is outside of any
+    brackets, the lexer has no pending state there, and only the end is
+    lexed; otherwise ``s`` is lexed itself.
+    """
+    end = len(s.rstrip()) - 1
+    n = depth = 0
+    prev = None
+    pos = -1
+    for t in full:
+        if (
+            t.lineno != 1
+            or t.type in ("NEWLINE", "DEDENT", "ERRORTOKEN")
+            or not isinstance(t.value, str)
+            or t.lexpos + len(t.value) >= end
+        ):
+            pos = t.lexpos if t.lineno == 1 else -1
+            break
+        yield t
+        n += 1
+        if t.type in _OPENERS:
+            depth += 1
+        elif t.type in _CLOSERS:
+            depth -= 1
+        prev = t
+    tail = None
+    if (
+        0 < pos < len(s)
+        and depth == 0
+        and not s[0].isspace()  # no INDENT and DEDENT around the line
+        and prev.value not in ("async", "await")  # held back by tokenize
+    ):
+        tail = _lex_tail(s, pos, tolerant)
+    if tail is None:
+        yield from itertools.islice(get_tokens(s, tolerant), n, None)
+    else:
+        yield from tail
+
+
+RELEX_LOOKBACK = 8
+"""How many lines may have been appended to a cached input for its tokens
+to be reused by ``token_array()``."""
+
+
+def _relexed_array(s, tolerant):
+    """A ``TokenArray`` of ``s`` that reuses the cached tokens of its first
+    lines, such as a multi-line buffer before its last line was entered, and
+    lexes only the lines after the last checkpoint in them.  Returns None if
+    there are no such tokens.
+    """
+    end = len(s) - 1
+    for _ in range(RELEX_LOOKBACK):
+        end = s.rfind("\n", 0, end)
+        if end < 0:
+            return None
+        prefix = TOKEN_CACHE.get(s[: end + 1], tolerant)
+        if prefix is not None:
+            break
+    else:
+        return None
+    with prefix._lock:
+        if not prefix.checkpoints:
+            return None
+        *checkpoints, resume = prefix.checkpoints
+        tokens = prefix._toks[: resume.ntoks]
+    return TokenArray(
+        s, tolerant, tokens=tokens, checkpoints=checkpoints, resume=resume
+    )
+
+
+def token_array(s, tolerant=False):
+    """Returns the cached ``TokenArray`` of the xonsh code ``s``, creating it
+    if needed.  A single line without its trailing newline shares the tokens
+    of the same line as the parser saw it, and the lines of a multi-line input
+    that were already lexed as part of a shorter input are not lexed again.
+    """
+    arr = TOKEN_CACHE.get(s, tolerant)
+    if arr is not None:
+        return arr
+    full = None
+    if s and "\n" not in s:
+        full = TOKEN_CACHE.get(s + "\n", tolerant)
+    if full is not None:
+        arr = TokenArray(s, tolerant, stream=_shared_stream(full, s, tolerant))
+    elif "\n" in s[:-1]:
+        arr = _relexed_array(s, tolerant)
+    if arr is None:
+        arr = TokenArray(s, tolerant)
+    TOKEN_CACHE.put(arr)
+    return arr
+
+
+def _parser_tokens(arr):
+    """PLY tokens for the parser, which may modify them.  Tokens lexed on the
+    way are handed out as they are, memoized ones are copied.
+    """
+    i = 0
+    toks = arr._toks
+    while True:
+        if i < len(toks):
+            t = toks[i]
+            yield _new_token(t.type, t.value, (t.lineno, t.lexpos))
+            i += 1
+            continue
+        start, fresh = arr._lex(LEX_AHEAD)
+        if start != i:
+            continue  # lexed by someone else in the meantime
+        if not fresh:
+            return
+        for t in fresh:
+            if isinstance(t, Token):
+                t = _new_token(t.type, t.value, (t.lineno, t.lexpos))
+            yield t
+        i += len(fresh)
+
+
 class Lexer:
     """Implements a lexer for the xonsh language."""
 
@@ -447,7 +810,13 @@ class Lexer:
 
     def input(self, s):
         """Calls the lexer on the string s."""
-        self._token_stream = get_tokens(s, self._tolerant)
+        self._token_stream = _parser_tokens(token_array(s, self._tolerant))
+
+    def token_array(self, s):
+        """Returns the immutable, cached ``TokenArray`` of the string s,
+        without changing the state of the lexer.
+        """
+        return token_array(s, self._tolerant)
 
     def token(self):
         """Retrieves the next token."""
@@ -14,6 +14,7 @@ from xonsh.lazyasd import LazyObject
 from xonsh.lexer import Lexer, LexToken
 from xonsh.parsers.context_check import check_contexts
 from xonsh.parsers.fstring_adaptor import FStringAdaptor
+from xonsh.parsers.tables import build_parser
 from xonsh.platform import PYTHON_VERSION_INFO
 from xonsh.ply.ply import yacc
 from xonsh.tokenize import SearchPath, StringPrefix
@@ -231,7 +232,7 @@ class YaccLoader(Thread):
         self.start()
 
     def run(self):
-        self.parser.parser = yacc.yacc(**self.yacc_kwargs)
+        self.parser.parser = build_parser(**self.yacc_kwargs)
 
 
 class BaseParser:
@@ -249,7 +250,8 @@ class BaseParser:
         yacc_optimize : bool, optional
             Set to false when unstable and true when parser is stable.
         yacc_table : str, optional
-            Parser module used when optimized.
+            Name of the parser tables; the Python version tag and extension
+            are appended to form the table file name.
         yacc_debug : debug, optional
             Dumps extra debug info.
         outputdir : str or None, optional
@@ -464,7 +466,7 @@ class BaseParser:
         yacc_kwargs["outputdir"] = outputdir
         if yacc_debug:
             # create parser on main thread
-            self.parser = yacc.yacc(**yacc_kwargs)
+            self.parser = build_parser(**yacc_kwargs)
         else:
             self.parser = None
             YaccLoader(self, yacc_kwargs)
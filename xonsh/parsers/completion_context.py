@@ -22,6 +22,7 @@ from typing import (
 from xonsh.lazyasd import lazyobject
 from xonsh.lexer import Lexer
 from xonsh.parsers.base import Location, raise_parse_error
+from xonsh.parsers.tables import build_parser
 from xonsh.ply.ply import yacc
 from xonsh.tools import check_for_partial_string, get_line_continuation
 
@@ -370,7 +371,7 @@ class CompletionContextParser:
         yacc_kwargs["outputdir"] = outputdir
 
         # create parser on main thread, it's small and should be fast
-        self.parser = yacc.yacc(**yacc_kwargs)
+        self.parser = build_parser(**yacc_kwargs)
 
     def parse(
         self,
@@ -0,0 +1,286 @@
+"""Compact, versioned storage for the LALR tables of the xonsh parsers.
+
+PLY normally persists its tables as a Python module full of dict literals,
+which is slow to import and is shared between Python versions even though
+the grammar is not.  Here the tables are written to a binary file per
+Python minor version, holding a small JSON header followed by flat
+``int32`` arrays.  The file is memory-mapped on load and the per-state
+action and goto rows are only materialized when the parser first visits
+them, so a parser is usable a few milliseconds after start up.
+"""
+import array
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+
+from xonsh.platform import PYTHON_VERSION_INFO
+from xonsh.ply.ply import yacc
+
+MAGIC = b"XLRT"
+FORMAT_VERSION = 1
+TABLE_EXT = ".lrtab"
+ACCEPT_NONE = -(2**31)
+"""Sentinel stored for PLY's ``None`` (non-associative) actions."""
+ARRAYS = (
+    "action_index",
+    "action_syms",
+    "action_vals",
+    "goto_index",
+    "goto_syms",
+    "goto_vals",
+)
+
+
+class TableError(Exception):
+    """Raised when a table file is missing, stale, or malformed."""
+
+
+def python_tag(version_info=None):
+    """The tag that versions the tables, e.g. ``py311``."""
+    version_info = PYTHON_VERSION_INFO if version_info is None else version_info
+    return f"py{version_info[0]}{version_info[1]}"
+
+
+def table_path(tabmodule, outputdir, version_info=None):
+    """Path of the table file for a PLY-style ``tabmodule`` name, such as
+    ``xonsh.parser_table``, stored in ``outputdir``.
+    """
+    basename = tabmodule.rsplit(".", 1)[-1]
+    return os.path.join(outputdir, f"{basename}_{python_tag(version_info)}{TABLE_EXT}")
+
+
+def _signature_hash(signature):
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
+def _flatten(rows, symbol_ids):
+    """Flattens ``{state: {symbol: value}}`` into CSR-style arrays."""
+    index = array.array("i", [0])
+    syms = array.array("i")
+    vals = array.array("i")
+    for state in range(len(rows)):
+        row = rows.get(state, {})
+        for sym, val in row.items():
+            syms.append(symbol_ids[sym])
+            vals.append(ACCEPT_NONE if val is None else val)
+        index.append(len(syms))
+    return index, syms, vals
+
+
+def write_tables(path, parser, signature):
+    """Writes the tables of a PLY ``LRParser`` to ``path``."""
+    symbols = sorted(
+        {s for row in parser.action.values() for s in row}
+        | {s for row in parser.goto.values() for s in row}
+    )
+    symbol_ids = {s: i for i, s in enumerate(symbols)}
+    nstates = max(parser.action) + 1
+    arrays = _flatten(parser.action, symbol_ids) + _flatten(parser.goto, symbol_ids)
+    productions = []
+    for p in parser.productions:
+        if p.func:
+            productions.append(
+                (p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line)
+            )
+        else:
+            productions.append((str(p), p.name, p.len, None, None, None))
+    header = {
+        "tabversion": yacc.__tabversion__,
+        "method": "LALR",
+        "python": python_tag(),
+        "byteorder": sys.byteorder,
+        "signature": _signature_hash(signature),
+        "nstates": nstates,
+        "symbols": symbols,
+        "productions": productions,
+        "defaulted": sorted(parser.defaulted_states.items()),
+        "arrays": [len(a) for a in arrays],
+    }
+    raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-len(raw) % 4)  # keep the int32 arrays aligned
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(array.array("i", [FORMAT_VERSION, len(raw)]).tobytes())
+        f.write(raw)
+        for a in arrays:
+            a.tofile(f)
+    os.replace(tmp, path)
+
+
+class _LazyRows:
+    """Sequence of per-state ``{symbol: value}`` dicts, built on first access
+    from the flat arrays of a table file.
+    """
+
+    __slots__ = ("_symbols", "_index", "_syms", "_vals", "_rows")
+
+    def __init__(self, symbols, index, syms, vals):
+        self._symbols = symbols
+        self._index = index
+        self._syms = syms
+        self._vals = vals
+        self._rows = [None] * (len(index) - 1)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, state):
+        row = self._rows[state]
+        if row is None:
+            start, stop = self._index[state], self._index[state + 1]
+            symbols = self._symbols
+            row = {
+                symbols[s]: (None if v == ACCEPT_NONE else v)
+                for s, v in zip(self._syms[start:stop], self._vals[start:stop])
+            }
+            self._rows[state] = row
+        return row
+
+    def items(self):
+        for state in range(len(self._rows)):
+            yield state, self[state]
+
+    def values(self):
+        for state in range(len(self._rows)):
+            yield self[state]
+
+
+class CompactLRTable(yacc.LRTable):
+    """An ``LRTable`` backed by a memory-mapped table file."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                buf = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # empty files and some filesystems cannot be mapped
+                with os.fdopen(fd, "rb", closefd=False) as f:
+                    buf = f.read()
+            finally:
+                os.close(fd)
+        except OSError as e:
+            raise TableError(f"cannot read {path!r}: {e.strerror}") from None
+        view = memoryview(buf)
+        if bytes(view[:4]) != MAGIC:
+            raise TableError(f"{path!r} is not a xonsh parser table")
+        fmt, hlen = view[4:12].cast("i")
+        if fmt != FORMAT_VERSION:
+            raise TableError(f"{path!r} has table format {fmt}")
+        header = json.loads(bytes(view[12 : 12 + hlen]))
+        if header["tabversion"] != yacc.__tabversion__:
+            raise TableError(f"{path!r} was written by another PLY version")
+        if header["python"] != python_tag() or header["byteorder"] != sys.byteorder:
+            raise TableError(f"{path!r} was written for another platform")
+        ints = view[12 + hlen :].cast("i")
+        sections = []
+        start = 0
+        for size in header["arrays"]:
+            sections.append(ints[start : start + size])
+            start += size
+        symbols = header["symbols"]
+        self.signature_hash = header["signature"]
+        self.lr_method = header["method"]
+        self.lr_action = _LazyRows(symbols, *sections[:3])
+        self.lr_goto = _LazyRows(symbols, *sections[3:])
+        self.lr_productions = [yacc.MiniProduction(*p) for p in header["productions"]]
+        self.defaulted_states = dict(header["defaulted"])
+
+    def bind_callables(self, module):
+        """Binds the production functions to the methods of ``module``."""
+        for p in self.lr_productions:
+            if p.func:
+                try:
+                    p.callable = getattr(module, p.func)
+                except AttributeError:
+                    raise TableError(f"{p.func}() is missing, table is stale") from None
+
+
+class CompactLRParser(yacc.LRParser):
+    """LR parser that takes its defaulted states from a table file rather
+    than scanning every row of the action table.
+    """
+
+    def set_defaulted_states(self):
+        self.defaulted_states = dict(self._table_defaulted_states)
+
+    def __init__(self, lrtab, errorf):
+        self._table_defaulted_states = lrtab.defaulted_states
+        super().__init__(lrtab, errorf)
+
+
+def _grammar_signature(module, start):
+    pdict = {k: getattr(module, k) for k in dir(module)}
+    if start is not None:
+        pdict["start"] = start
+    pinfo = yacc.ParserReflect(pdict, log=yacc.NullLogger())
+    pinfo.get_all()
+    return pinfo.signature()
+
+
+def load_parser(path, module, start=None, check_signature=False):
+    """Loads a parser for ``module`` from the table file at ``path``. Raises
+    ``TableError`` if it is missing or stale.  Checking the grammar
+    signature requires reflecting over the whole grammar, so it is only done
+    when ``check_signature`` is true.
+    """
+    lr = CompactLRTable(path)
+    if check_signature:
+        signature = _grammar_signature(module, start)
+        if _signature_hash(signature) != lr.signature_hash:
+            raise TableError(f"{path!r} does not match the grammar")
+    lr.bind_callables(module)
+    return CompactLRParser(lr, getattr(module, "p_error", None))
+
+
+def build_parser(
+    module,
+    tabmodule,
+    outputdir,
+    optimize=True,
+    debug=False,
+    start=None,
+    errorlog=None,
+):
+    """Returns a PLY parser for ``module``, loading its tables from the
+    versioned table file for ``tabmodule`` in ``outputdir``.  When the file
+    is missing or stale the tables are regenerated, which takes a few
+    seconds and is reported on stderr, and written back for the next run.
+    """
+    path = table_path(tabmodule, outputdir)
+    try:
+        return load_parser(path, module, start=start, check_signature=not optimize)
+    except TableError as e:
+        reason = str(e)
+    t0 = time.perf_counter()
+    # the versioned tabmodule name is never importable, so that PLY always
+    # builds the tables here rather than reading a legacy table module
+    parser = yacc.yacc(
+        module=module,
+        debug=debug,
+        start=start,
+        optimize=False,
+        write_tables=False,
+        tabmodule=os.path.basename(path).replace(".", "_"),
+        outputdir=outputdir,
+        errorlog=errorlog,
+    )
+    signature = _grammar_signature(module, start)
+    try:
+        write_tables(path, parser, signature)
+        saved = "saved"
+    except OSError as e:
+        saved = f"could not be saved ({e.strerror})"
+    if not debug:
+        print(
+            f"xonsh: regenerated parser tables in {time.perf_counter() - t0:.1f}s, "
+            f"{reason}; the new tables {saved}",
+            file=sys.stderr,
+        )
+    return parser
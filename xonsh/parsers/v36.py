@@ -19,7 +19,8 @@ class Parser(BaseParser):
         yacc_optimize : bool, optional
             Set to false when unstable and true when parser is stable.
         yacc_table : str, optional
-            Parser module used when optimized.
+            Name of the parser tables; the Python version tag and extension
+            are appended to form the table file name.
         yacc_debug : debug, optional
             Dumps extra debug info.
         outputdir : str or None, optional
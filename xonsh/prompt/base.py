@@ -1,15 +1,21 @@
 """Base prompt, provides PROMPT_FIELDS and prompt related functions"""
 
+import concurrent.futures
+import functools
 import itertools
-import os
 import re
 import socket
 import sys
+import threading
+import time
 import typing as tp
 
 import xonsh.platform as xp
 import xonsh.tools as xt
 from xonsh.built_ins import XSH
+from xonsh.events import events
+from xonsh.prompt import stats
+from xonsh.style_tools import partial_color_tokenize, partial_color_tokenize_parts
 
 if tp.TYPE_CHECKING:
     from xonsh.built_ins import XonshSession
@@ -40,6 +46,17 @@ class ParsedTokens(tp.NamedTuple):
         )
         return processor(self)
 
+    def color_tokens(self) -> tp.List[tp.Tuple[tp.Any, str]]:
+        """The final prompt split by color, as ``partial_color_tokenize`` does.
+        With the default formatter, only the tokens that changed since an
+        earlier prompt are parsed for colors again."""
+        processor = XSH.env.get(  # type: ignore
+            "PROMPT_TOKENS_FORMATTER", prompt_tokens_formatter_default
+        )
+        if processor is prompt_tokens_formatter_default:
+            return partial_color_tokenize_parts([tok.value for tok in self.tokens])
+        return partial_color_tokenize(processor(self))
+
     def update(
         self,
         idx: int,
@@ -53,6 +70,13 @@ class ParsedTokens(tp.NamedTuple):
             self.tokens[idx] = _ParsedToken(_format_value(val, spec, conv), tok.field)
 
 
+@functools.lru_cache(maxsize=64)
+def compile_template(template: str):
+    """Parse a prompt template into its ``(literal, field, spec, conversion)``
+    parts, once per template string."""
+    return tuple(xt.FORMATTER.parse(template))
+
+
 def prompt_tokens_formatter_default(container: ParsedTokens) -> str:
     """
         Join the tokens
@@ -77,7 +101,24 @@ class PromptFormatter:
 
     def __call__(self, template=DEFAULT_PROMPT, fields=None, **kwargs) -> str:
         """Formats a xonsh prompt template string."""
+        prompt = self._render(template, fields, ParsedTokens.process, **kwargs)
+        if prompt is None:
+            return _failover_template_format(template)
+        return prompt
 
+    def color_tokens(self, template=DEFAULT_PROMPT, fields=None, **kwargs):
+        """Formats a xonsh prompt template string and splits it by color.
+        Same as ``partial_color_tokenize(formatter(template))``, but the
+        color parsing of the parts of the prompt that did not change is reused.
+        """
+        toks = self._render(template, fields, ParsedTokens.color_tokens, **kwargs)
+        if toks is None:
+            return partial_color_tokenize(_failover_template_format(template))
+        return toks
+
+    def _render(self, template, fields, finish, **kwargs):
+        """Format the template and pass the tokens to ``finish``.
+        Returns None when the prompt could not be formatted."""
         if fields is None:
             self.fields = XSH.env["PROMPT_FIELDS"]  # type: ignore
         else:
@@ -91,7 +132,7 @@ class PromptFormatter:
 
         try:
             toks = self._format_prompt(template=template, **kwargs)
-            prompt = toks.process()
+            return finish(toks)
         except Exception as ex:
             # make it obvious why it has failed
             import logging
@@ -100,13 +141,12 @@ class PromptFormatter:
             xt.print_exception(
                 f"Failed to format prompt `{template}`-> {type(ex)}:{ex}"
             )
-            return _failover_template_format(template)
-        return prompt
+            return None
 
     def _format_prompt(self, template=DEFAULT_PROMPT, **kwargs) -> ParsedTokens:
         tmpl = template() if callable(template) else template
         toks = []
-        for literal, field, spec, conv in xt.FORMATTER.parse(tmpl):
+        for literal, field, spec, conv in compile_template(tmpl):
             if literal:
                 toks.append(_ParsedToken(literal))
             entry = self._format_field(field, spec, conv, idx=len(toks), **kwargs)
@@ -263,6 +303,81 @@ def _format_value(val, spec, conv) -> str:
     return val
 
 
+def field_deps(*deps):
+    """Decorator declaring the inputs of a prompt-field callable.
+
+    The value of the field is kept across prompts as long as these inputs
+    are unchanged. Each of ``deps`` can be
+
+    * ``"$NAME"``, the value of an environment variable, e.g. ``"$PWD"``
+      for the current directory or ``"$LAST_RETURN_CODE"``.
+    * ``"name"``, the value of another prompt-field.
+    * a callable returning the current value of some other input.
+
+    With no ``deps`` the value is computed only once. Fields without
+    declared dependencies are computed for every prompt.
+    ``BasePromptField`` instances declare them through their ``deps``
+    attribute instead.
+    """
+
+    def wrapper(func):
+        func.deps = deps
+        return func
+
+    return wrapper
+
+
+def _deps_of(field) -> "tuple | None":
+    deps = getattr(field, "deps", None)
+    return deps if isinstance(deps, tuple) else None
+
+
+def _prefetchable(field) -> bool:
+    """Plain callables whose inputs are environment variables or callables"""
+    deps = _deps_of(field)
+    if deps is None or isinstance(field, BasePromptField) or not callable(field):
+        return False
+    return all(callable(dep) or dep.startswith("$") for dep in deps)
+
+
+_THREAD_POOL: "concurrent.futures.ThreadPoolExecutor|None" = None
+_PREFETCH_POOL: "concurrent.futures.ThreadPoolExecutor|None" = None
+_PREFETCH_THREAD = threading.local()
+
+
+def prompt_thread_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """The threads used by the async prompt and to prefetch prompt fields"""
+    global _THREAD_POOL
+    if _THREAD_POOL is None:
+        _THREAD_POOL = concurrent.futures.ThreadPoolExecutor(
+            max_workers=XSH.env.get("ASYNC_PROMPT_THREAD_WORKERS"),
+            thread_name_prefix="xonsh-prompt",
+        )
+    return _THREAD_POOL
+
+
+def prefetch_thread_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """The threads computing the prefetched prompt fields.
+
+    They are apart from :func:`prompt_thread_pool`, whose jobs wait for the
+    prefetched fields they need, and would otherwise wait for jobs queued
+    behind themselves.
+    """
+    global _PREFETCH_POOL
+    if _PREFETCH_POOL is None:
+        _PREFETCH_POOL = concurrent.futures.ThreadPoolExecutor(
+            thread_name_prefix="xonsh-prefetch"
+        )
+    return _PREFETCH_POOL
+
+
+def _dep_value(val):
+    """Copy of a dependency value that won't change in place"""
+    if val is None or isinstance(val, (str, int, float, tuple)):
+        return val
+    return repr(val)
+
+
 class PromptFields(tp.MutableMapping[str, "FieldType"]):
     """Mapping of functions available for prompt-display."""
 
@@ -272,6 +387,22 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
         self._cache: "dict[str, str|FieldType]" = {}
         """for callbacks this will catch the value and should be cleared between prompts"""
 
+        self._memo: "dict[str, tuple[tp.Any, tuple, tp.Any]]" = {}
+        """values kept across prompts: name -> (field, inputs, value)"""
+
+        self.recomputed: "list[str]" = []
+        """names of the fields computed since the last reset"""
+
+        self._inputs: "dict[tp.Any, tp.Any]" = {}
+        """values of the dependencies for the current prompt"""
+
+        self._prefetching: "dict[str, concurrent.futures.Future]" = {}
+        """fields being computed in the background by :meth:`prefetch`"""
+        self._prefetch_lock = threading.Lock()
+
+        self._env_deps: "set[str] | None" = None
+        """environment variables the prefetchable fields depend on"""
+
         self.xsh = xsh
         if init:
             self.load_initial()
@@ -296,6 +427,8 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
 
     def __delitem__(self, key):
         del self._items[key]
+        self._memo.pop(key, None)
+        self._env_deps = None
 
     def __iter__(self):
         yield from self._items
@@ -305,6 +438,8 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
 
     def __setitem__(self, key, value):
         self._items[key] = value
+        self._memo.pop(key, None)
+        self._env_deps = None
 
     def get_fields(self, module):
         """Find and load all instances of PromptField from the given module.
@@ -327,8 +462,9 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
         from xonsh.prompt import gitstatus
         from xonsh.prompt.cwd import (
             _collapsed_pwd,
+            _cwd_base,
+            _cwd_dir,
             _dynamically_collapsed_pwd,
-            _replace_home_cwd,
         )
         from xonsh.prompt.env import env_name, vte_new_tab_cwd
         from xonsh.prompt.job import CurrentJobField
@@ -343,8 +479,8 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
                 prompt_end="#" if xt.is_superuser() else "$",
                 hostname=socket.gethostname().split(".", 1)[0],
                 cwd=_dynamically_collapsed_pwd,
-                cwd_dir=lambda: os.path.join(os.path.dirname(_replace_home_cwd()), ""),
-                cwd_base=lambda: os.path.basename(_replace_home_cwd()),
+                cwd_dir=_cwd_dir,
+                cwd_base=_cwd_base,
                 short_cwd=_collapsed_pwd,
                 curr_branch=current_branch,
                 branch_color=branch_color,
@@ -356,9 +492,12 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
                 vte_new_tab_cwd=vte_new_tab_cwd,
                 time_format="%H:%M:%S",
                 localtime=_localtime,
-                last_return_code=lambda: XSH.env.get("LAST_RETURN_CODE", 0),
-                last_return_code_if_nonzero=lambda: XSH.env.get("LAST_RETURN_CODE", 0)
-                or None,
+                last_return_code=field_deps("$LAST_RETURN_CODE")(
+                    lambda: XSH.env.get("LAST_RETURN_CODE", 0)
+                ),
+                last_return_code_if_nonzero=field_deps("$LAST_RETURN_CODE")(
+                    lambda: XSH.env.get("LAST_RETURN_CODE", 0) or None
+                ),
             )
         )
         for val in self.get_fields(gitstatus):
@@ -376,16 +515,115 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
         if name not in self._items:
             return None
         value = self._items[name]
-        if name not in self._cache:
+        pending = self._prefetching.get(name)
+        if pending is not None and not getattr(_PREFETCH_THREAD, "active", False):
+            # it is being computed in the background already, it is computed
+            # here too if that takes longer than the field may take
+            timeout = getattr(value, "timeout", None)
+            if not isinstance(timeout, (int, float)):
+                timeout = self.xsh.env.get("ASYNC_PROMPT_FIELD_TIMEOUT") or None
+            concurrent.futures.wait([pending], timeout=timeout)
+        if name not in self._cache and not self._from_memo(name, value):
+            deps = _deps_of(value)
+            inputs = None if deps is None else self._dep_values(deps)
+            field = value
+            start = time.perf_counter()
             if isinstance(value, BasePromptField):
                 value.update(self)
             elif callable(value):
                 value = value()
+            stats.record(name, time.perf_counter() - start)
+            self.recomputed.append(name)
+            if inputs is not None:
+                self._memo[name] = (field, inputs, value)
 
             # store in cache
             self._cache[name] = value
         return self._cache[name]
 
+    def _dep_values(self, deps, inputs=None) -> tuple:
+        if inputs is None:
+            inputs = self._inputs
+        values = []
+        for dep in deps:
+            if dep not in inputs:
+                if callable(dep):
+                    val = dep()
+                elif dep.startswith("$"):
+                    val = self.xsh.env.get(dep[1:])
+                else:
+                    val = self.pick_val(dep)
+                inputs[dep] = _dep_value(val)
+            values.append(inputs[dep])
+        return tuple(values)
+
+    def _from_memo(self, name, field) -> bool:
+        """Use the value from an earlier prompt if its inputs are unchanged"""
+        memo = self._memo.get(name)
+        if memo is None or memo[0] is not field:
+            return False
+        if self._dep_values(_deps_of(field)) != memo[1]:
+            return False
+        self._cache[name] = memo[2]
+        return True
+
+    def prefetch(self, names: "tp.Iterable[str]"):
+        """Compute fields in the background, ahead of the next prompt.
+
+        Only the fields that are plain callables with declared inputs
+        (see :func:`field_deps`), all of them environment variables or
+        callables, are computed. The next prompt uses their values if the
+        inputs are still the same then.
+        """
+        with self._prefetch_lock:
+            for name in names:
+                if name in self._prefetching or not _prefetchable(
+                    self._items.get(name)
+                ):
+                    continue
+                # one future per field, so that the prompt waits only for the
+                # fields it shows next
+                self._prefetching[name] = prefetch_thread_pool().submit(
+                    self._prefetch, name
+                )
+
+    def _prefetch(self, name):
+        _PREFETCH_THREAD.active = True
+        try:
+            field = self._items.get(name)
+            if not _prefetchable(field):
+                return
+            values = self._dep_values(_deps_of(field), {})
+            memo = self._memo.get(name)
+            if memo is not None and memo[0] is field and memo[1] == values:
+                return
+            start = time.perf_counter()
+            value = field()
+            stats.record(name, time.perf_counter() - start)
+            self._memo[name] = (field, values, value)
+        finally:
+            _PREFETCH_THREAD.active = False
+            with self._prefetch_lock:
+                self._prefetching.pop(name, None)
+
+    def env_deps(self) -> "set[str]":
+        """Names of the environment variables the prefetchable fields depend on"""
+        if self._env_deps is None:
+            self._env_deps = {
+                dep[1:]
+                for field in self._items.values()
+                if _prefetchable(field)
+                for dep in _deps_of(field)
+                if isinstance(dep, str)
+            }
+        return self._env_deps
+
+    def inputs_of(self, name) -> "tuple | None":
+        """Values of the declared inputs of a field for the current prompt,
+        ``None`` if it doesn't declare any"""
+        deps = _deps_of(self._items.get(name))
+        return None if deps is None else self._dep_values(deps)
+
     def pick_val(self, key):
         """wrap .pick() method to get .value attribute in case of PromptField"""
         val = self.pick(key)
@@ -397,15 +635,71 @@ class PromptFields(tp.MutableMapping[str, "FieldType"]):
             return False
 
         value = self[name]
+        if self._from_memo(name, value):
+            return False
         return isinstance(value, BasePromptField) or callable(value)
 
     def reset(self):
-        """the results are cached and need to be reset between prompts"""
+        """the results are cached and need to be reset between prompts.
+
+        Values of fields with declared dependencies are kept, and will be
+        reused if their inputs are unchanged.
+        """
+        if self.recomputed and self.xsh.env.get("PROMPT_FIELDS_DEBUG"):
+            print(
+                "prompt: computed fields: " + ", ".join(self.recomputed),
+                file=sys.stderr,
+            )
         self._cache.clear()
+        self._inputs.clear()
+        self.recomputed = []
 
     def reset_key(self, key):
         """remove a single key from the cache (if it exists)"""
         self._cache.pop(key, None)
+        self._memo.pop(key, None)
+        self._inputs.pop(key, None)
+
+
+def _template_fields() -> "set[str]":
+    """Names of the fields used by the prompt templates"""
+    names = set()
+    for var in ("PROMPT", "RIGHT_PROMPT", "BOTTOM_TOOLBAR", "TITLE"):
+        template = XSH.env.get(var)  # type: ignore
+        if not isinstance(template, str):
+            continue
+        try:
+            parts = compile_template(template)
+        except ValueError:
+            continue
+        names.update(field for _, field, _, _ in parts if field)
+    return names
+
+
+def prefetch_prompt_fields():
+    """Start computing the fields of the prompt templates in the background,
+    when ``$PROMPT_PREFETCH`` is set in an interactive shell"""
+    env = XSH.env
+    if env is None or XSH.shell is None or not env.get("PROMPT_PREFETCH"):
+        return
+    fields = env.get("PROMPT_FIELDS")
+    if isinstance(fields, PromptFields):
+        fields.prefetch(_template_fields())
+
+
+@events.on_chdir
+def _prefetch_on_chdir(**_):
+    prefetch_prompt_fields()
+
+
+@events.on_envvar_new
+@events.on_envvar_change
+def _prefetch_on_envvar(name, **_):
+    if XSH.shell is None or XSH.env is None:
+        return
+    fields = XSH.env.get("PROMPT_FIELDS")
+    if isinstance(fields, PromptFields) and name in fields.env_deps():
+        prefetch_prompt_fields()
 
 
 class BasePromptField:
@@ -416,6 +710,13 @@ class BasePromptField:
     updator: "tp.Callable[[FieldType, PromptFields], None] | None" = None
     """this is a callable that needs to update the value or any of the attribute of the field"""
 
+    deps: "tuple[str | tp.Callable[[], tp.Any], ...] | None" = None
+    """inputs of the field, see :func:`field_deps`. ``None`` updates it for every prompt"""
+
+    timeout: "float|None" = None
+    """seconds the async prompt waits for the field.
+    ``None`` uses ``$ASYNC_PROMPT_FIELD_TIMEOUT``"""
+
     def __init__(
         self,
         **kwargs,
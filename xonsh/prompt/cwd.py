@@ -1,22 +1,28 @@
 """CWD related prompt formatter"""
 
+import functools
 import os
 import shutil
 
 import xonsh.platform as xp
 import xonsh.tools as xt
 from xonsh.built_ins import XSH
+from xonsh.prompt.base import field_deps
+
+_CWD_DEPS = ("$PWD", "$HOME", "$FORCE_POSIX_PATHS")
 
 
 def _replace_home(x: str):
-    home = os.path.expanduser("~")
-    if x.startswith(home):
-        x = x.replace(home, "~", 1)
+    posix = bool(xp.ON_WINDOWS and XSH.env.get("FORCE_POSIX_PATHS") and os.altsep)
+    return _home_replaced(x, os.path.expanduser("~"), posix)
 
-    if xp.ON_WINDOWS:
-        if XSH.env.get("FORCE_POSIX_PATHS") and os.altsep:
-            x = x.replace(os.sep, os.altsep)
 
+@functools.lru_cache(maxsize=64)
+def _home_replaced(x: str, home: str, posix: bool):
+    if x.startswith(home):
+        x = x.replace(home, "~", 1)
+    if posix:
+        x = x.replace(os.sep, os.altsep)
     return x
 
 
@@ -25,9 +31,30 @@ def _replace_home_cwd():
     return _replace_home(pwd)
 
 
+def _cwd_columns():
+    """Width of the terminal, if the cwd is shortened to a part of it"""
+    if XSH.env["DYNAMIC_CWD_WIDTH"][1] == "%":
+        return shutil.get_terminal_size().columns
+
+
+@field_deps(*_CWD_DEPS)
+def _cwd_dir():
+    return os.path.join(os.path.dirname(_replace_home_cwd()), "")
+
+
+@field_deps(*_CWD_DEPS)
+def _cwd_base():
+    return os.path.basename(_replace_home_cwd())
+
+
+@field_deps(*_CWD_DEPS)
 def _collapsed_pwd():
-    sep = xt.get_sep()
-    pwd = _replace_home_cwd().split(sep)
+    return _collapse_path(_replace_home_cwd(), xt.get_sep())
+
+
+@functools.lru_cache(maxsize=64)
+def _collapse_path(path: str, sep: str):
+    pwd = path.split(sep)
     size = len(pwd)
     leader = sep if size > 0 and len(pwd[0]) == 0 else ""
     base = [
@@ -38,6 +65,12 @@ def _collapsed_pwd():
     return leader + sep.join(base)
 
 
+@field_deps(
+    *_CWD_DEPS,
+    "$DYNAMIC_CWD_WIDTH",
+    "$DYNAMIC_CWD_ELISION_CHAR",
+    _cwd_columns,
+)
 def _dynamically_collapsed_pwd():
     """Return the compact current working directory.  It respects the
     environment variable DYNAMIC_CWD_WIDTH.
@@ -48,9 +81,13 @@ def _dynamically_collapsed_pwd():
     if target_width == float("inf"):
         return original_path
     if units == "%":
-        cols, _ = shutil.get_terminal_size()
-        target_width = (cols * target_width) // 100
-    sep = xt.get_sep()
+        target_width = (_cwd_columns() * target_width) // 100
+    return _elide_path(original_path, target_width, elision_char, xt.get_sep())
+
+
+@functools.lru_cache(maxsize=64)
+def _elide_path(original_path: str, target_width, elision_char: str, sep: str):
+    """Shorten the parts of the path so that it fits in ``target_width``"""
     pwd = original_path.split(sep)
     last = pwd.pop()
     remaining_space = target_width - len(last)
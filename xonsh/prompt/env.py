@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Optional
 
 from xonsh.built_ins import XSH
+from xonsh.prompt.base import field_deps
 
 
 def find_env_name() -> Optional[str]:
@@ -25,6 +26,14 @@ def find_env_name() -> Optional[str]:
         return conda_default_env
 
 
+@field_deps(
+    "$VIRTUAL_ENV_DISABLE_PROMPT",
+    "$VIRTUAL_ENV_PROMPT",
+    "$VIRTUAL_ENV",
+    "$CONDA_DEFAULT_ENV",
+    "env_prefix",
+    "env_postfix",
+)
 def env_name() -> str:
     """Build env_name based on different sources. Respect order of precedence.
 
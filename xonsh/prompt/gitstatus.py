@@ -18,6 +18,7 @@ Following fields are available other than ``gitstatus``
 * gitstatus.porcelain
 * gitstatus.repo_path
 * gitstatus.short_head
+* gitstatus.snapshot
 * gitstatus.staged
 * gitstatus.stash_count
 * gitstatus.tag
@@ -27,6 +28,20 @@ Following fields are available other than ``gitstatus``
 All the fields have prefix and suffix attribute that can be set in the configuration as shown below.
 Other attributes can also be changed.
 
+Apart from ``repo_path``, which is only looked up again when the current
+directory changes, all the fields read from ``gitstatus.snapshot``. It runs
+a single ``git status --porcelain=v2`` and reads the rest (stash, ongoing
+operations) from files in the git directory. The snapshot is kept across
+prompts until ``HEAD``, the index, the refs or the working tree change, so
+pressing Enter in an unchanged repository runs no git command.
+
+The working tree is checked through the directories holding tracked files,
+which are watched with inotify on Linux, and otherwise compared by their
+``stat`` results along with the tracked files. Ignored directories are
+never looked at. For trees with more than ``MAX_WATCHED_DIRS`` directories
+or ``MAX_STAT_PATHS`` paths respectively, ``git status`` is run for every
+prompt.
+
 See some examples below,
 
 .. code-block:: xonsh
@@ -54,6 +69,7 @@ import contextlib
 import os
 import subprocess
 
+from xonsh.fswatch import HAVE_INOTIFY, DirWatcher, fingerprint
 from xonsh.prompt.base import MultiPromptField, PromptField, PromptFields
 
 
@@ -94,6 +110,8 @@ def _get_sp_output(xsh, *args: str, **kwargs) -> str:
 
 class _GitDir(PromptField):
     _cwd = ""
+    toplevel: "str|None" = None
+    """top level of the working tree, None for bare repositories"""
 
     def update(self, ctx):
         # call the subprocess only if cwd changed
@@ -103,11 +121,11 @@ class _GitDir(PromptField):
         cwd = _get_cwd()
         if cwd != self._cwd or self.value is None:
             self._cwd = cwd
-            self.value = _get_sp_output(
-                ctx.xsh, "git", "rev-parse", "--git-dir"
-            ).strip()
-            if self.value == "":
-                self.value = None
+            out = _get_sp_output(
+                ctx.xsh, "git", "rev-parse", "--git-dir", "--show-toplevel"
+            ).splitlines()
+            self.value = out[0] if out and out[0] else None
+            self.toplevel = out[1] if len(out) > 1 else None
 
 
 repo_path = _GitDir()
@@ -134,16 +152,7 @@ class _GSField(GitStatusPromptField):
     _args: "tuple[str, ...]" = ()
 
     def updator(self, fld, ctx):
-        self.value = _get_sp_output(ctx.xsh, *self._args).strip()
-
-
-short_head = _GSField(prefix=":", _args=("git", "rev-parse", "--short", "HEAD"))
-tag = _GSField(_args=("git", "describe", "--always"))
-
-
-@GitStatusPromptField.wrap()
-def tag_or_hash(fld: PromptField, ctx):
-    fld.value = ctx.pick(tag) or ctx.pick(short_head)
+        self.value = ctx.pick_val(snapshot).git(ctx.xsh, *self._args).strip()
 
 
 def _parse_int(val: str, default=0):
@@ -160,29 +169,322 @@ def get_stash_count(gitdir: str):
     return 0
 
 
-@GitStatusPromptField.wrap(prefix="⚑")
-def stash_count(fld: PromptField, ctx: PromptFields):
-    fld.value = get_stash_count(ctx.pick_val(repo_path))
+_OPERATIONS = (
+    ("rebase-merge", "REBASE"),
+    ("rebase-apply", "AM/REBASE"),
+    ("MERGE_HEAD", "MERGING"),
+    ("CHERRY_PICK_HEAD", "CHERRY-PICKING"),
+    ("REVERT_HEAD", "REVERTING"),
+    ("BISECT_LOG", "BISECTING"),
+)
 
 
 def get_operations(gitdir: str):
     """get the current git operation e.g. MERGE/REBASE..."""
-    for file, name in (
-        ("rebase-merge", "REBASE"),
-        ("rebase-apply", "AM/REBASE"),
-        ("MERGE_HEAD", "MERGING"),
-        ("CHERRY_PICK_HEAD", "CHERRY-PICKING"),
-        ("REVERT_HEAD", "REVERTING"),
-        ("BISECT_LOG", "BISECTING"),
-    ):
+    for file, name in _OPERATIONS:
         if os.path.exists(os.path.join(gitdir, file)):
             yield name
 
 
+class GitSnapshot:
+    """State of the repository for one prompt.
+
+    It is parsed from the output of
+    ``git status --porcelain=v2 --branch -z``, the stash count and the
+    ongoing operations are read from the git directory when first needed.
+
+    A snapshot made by :meth:`take` is kept for the following prompts until
+    :meth:`stale` tells that the git metadata or the working tree changed.
+    """
+
+    # number of parts before the path in the porcelain v2 entries
+    _path_index = {"1": 8, "2": 9, "u": 10}
+
+    def __init__(self, gitdir: str, status: str = "", tree=None):
+        self.gitdir = gitdir
+        self.status = status
+        self.oid = ""
+        """commit of HEAD, empty before the first commit"""
+        self.head = ""
+        """current branch, empty when HEAD is detached"""
+        self.upstream = ""
+        self.ahead = self.behind = 0
+        self.untracked = self.changed = self.deleted = 0
+        self.conflicts = self.staged = 0
+        self.unstaged_paths: "list[str]" = []
+        """paths with changes in the worktree, relative to the top level"""
+        self._stash_count: "int|None" = None
+        self._operations: "tuple[str, ...]|None" = None
+        self._outputs: "dict[tuple[str, ...], str]" = {}
+        self._watched: "tuple[list[str], tuple]|None" = None
+        """files the snapshot depends on and their fingerprint"""
+        self.tree: "WorkTree|None" = tree
+        """tells about changes in the working tree, snapshots without one
+        are always stale"""
+        self._parse(status)
+
+    @classmethod
+    def take(cls, xsh, gitdir: str, toplevel: "str|None" = None) -> "GitSnapshot":
+        """Run ``git status`` and remember the state of the git metadata and
+        of the files with unstaged changes under ``toplevel``."""
+        gitdir = os.path.abspath(gitdir)
+        paths = _metadata_paths(gitdir)
+        # taken before running git, so that concurrent changes invalidate it
+        before = fingerprint(paths)
+        tree = WorkTree.of(xsh, gitdir, toplevel)
+        status = _get_sp_output(
+            xsh, "git", "status", "--porcelain=v2", "--branch", "-z"
+        )
+        snap = cls(gitdir, status, tree)
+        rest = snap._ref_paths()
+        if toplevel is not None:
+            # their line counts change without changing the status
+            rest += [os.path.join(toplevel, p) for p in snap.unstaged_paths]
+        snap._watched = (paths + rest, before + fingerprint(rest))
+        return snap
+
+    def _ref_paths(self):
+        common = _common_dir(self.gitdir)
+        paths = []
+        if self.head:
+            paths.append(os.path.join(common, "refs", "heads", self.head))
+        if self.upstream:
+            for kind in ("remotes", "heads"):
+                paths.append(os.path.join(common, "refs", kind, self.upstream))
+        return paths
+
+    def stale(self) -> bool:
+        """Whether the repository may have changed since the snapshot"""
+        if self.tree is None or self._watched is None:
+            return True
+        # always ask the tree, to consume its pending changes
+        changed = self.tree.changed()
+        paths, prints = self._watched
+        return changed or fingerprint(paths) != prints
+
+    def same_as(self, other: "GitSnapshot") -> bool:
+        """Whether the repository didn't change between the two snapshots,
+        so that the older one, with the outputs cached on it, can be kept."""
+        return (
+            self._watched is not None
+            and self.gitdir == other.gitdir
+            and self.status == other.status
+            and self._watched == other._watched
+        )
+
+    def git(self, xsh, *args: str) -> str:
+        """Output of a git command, run once for the snapshot"""
+        if args not in self._outputs:
+            self._outputs[args] = _get_sp_output(xsh, *args)
+        return self._outputs[args]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.gitdir!r}, head={self.head!r})"
+
+    def _parse(self, status: str):
+        entries = iter(status.split("\0"))
+        for entry in entries:
+            kind, _, rest = entry.partition(" ")
+            if kind == "#":
+                key, _, val = rest.partition(" ")
+                if key == "branch.oid":
+                    self.oid = "" if val == "(initial)" else val
+                elif key == "branch.head":
+                    self.head = "" if val == "(detached)" else val
+                elif key == "branch.upstream":
+                    self.upstream = val
+                elif key == "branch.ab":
+                    ahead, _, behind = val.partition(" ")
+                    self.ahead = _parse_int(ahead[1:])
+                    self.behind = _parse_int(behind[1:])
+            elif kind == "?":
+                self.untracked += 1
+            elif kind in self._path_index and len(rest) > 1:
+                x, y = rest[0], rest[1]
+                if y == "M":
+                    self.changed += 1
+                elif y == "D":
+                    self.deleted += 1
+                if kind == "u":
+                    self.conflicts += 1
+                elif x != ".":
+                    self.staged += 1
+                if y != ".":
+                    path = entry.split(" ", self._path_index[kind])[-1]
+                    self.unstaged_paths.append(path)
+                if kind == "2":
+                    # the original path of a rename/copy is a separate entry
+                    next(entries, None)
+
+    @property
+    def short_head(self) -> str:
+        return self.oid[:7]
+
+    @property
+    def stash_count(self) -> int:
+        if self._stash_count is None:
+            self._stash_count = get_stash_count(self.gitdir)
+        return self._stash_count
+
+    @property
+    def operations(self) -> "tuple[str, ...]":
+        if self._operations is None:
+            self._operations = tuple(get_operations(self.gitdir))
+        return self._operations
+
+
+def _common_dir(gitdir: str) -> str:
+    """The directory holding the refs, shared by linked worktrees"""
+    with contextlib.suppress(OSError):
+        with open(os.path.join(gitdir, "commondir")) as f:
+            return os.path.normpath(os.path.join(gitdir, f.read().strip()))
+    return gitdir
+
+
+def _metadata_paths(gitdir: str) -> "list[str]":
+    """Files in the git directory whose changes invalidate a snapshot"""
+    common = _common_dir(gitdir)
+    paths = [
+        os.path.join(gitdir, name)
+        for name in ("HEAD", "index", os.path.join("logs", "HEAD"))
+    ]
+    paths.extend(os.path.join(gitdir, file) for file, _ in _OPERATIONS)
+    paths.extend(
+        os.path.join(common, name)
+        for name in (
+            "packed-refs",
+            "FETCH_HEAD",
+            os.path.join("refs", "stash"),
+            os.path.join("logs", "refs", "stash"),
+            os.path.join("refs", "tags"),
+        )
+    )
+    return paths
+
+
+MAX_WATCHED_DIRS = 2000
+"""The most directories of a working tree that are watched with inotify"""
+MAX_STAT_PATHS = 5000
+"""The most directories and files of a working tree compared by their
+``stat`` results when they can't be watched"""
+
+
+class WorkTree:
+    """Tells whether the files tracked by git, or the entries of their
+    directories, may have changed.
+
+    The directories are watched with a :class:`~xonsh.fswatch.DirWatcher`
+    when inotify is available and there are at most ``MAX_WATCHED_DIRS`` of
+    them. Otherwise, the directories and the tracked files are compared by
+    their :func:`~xonsh.fswatch.fingerprint` when there are at most
+    ``MAX_STAT_PATHS`` of them. Larger trees always count as changed.
+    """
+
+    _current: "WorkTree|None" = None
+
+    def __init__(self, xsh, toplevel: str, index: tuple):
+        self.toplevel = toplevel
+        self.index = index
+        """fingerprint of the index the tracked files were listed from"""
+        out = _get_sp_output(xsh, "git", "-C", toplevel, "ls-files", "-z")
+        files = [os.path.join(toplevel, p) for p in out.split("\0") if p]
+        dirs = {toplevel}
+        for path in files:
+            path = os.path.dirname(path)
+            while path not in dirs and len(path) > len(toplevel):
+                dirs.add(path)
+                path = os.path.dirname(path)
+        self.dirs = sorted(dirs)
+        self._watcher: "DirWatcher|None" = None
+        self._paths: "list[str]|None" = None
+        self._prints = ()
+        if HAVE_INOTIFY and len(self.dirs) <= MAX_WATCHED_DIRS:
+            with contextlib.suppress(OSError):
+                self._watcher = DirWatcher(self.dirs)
+        if self._watcher is None and len(self.dirs) + len(files) <= MAX_STAT_PATHS:
+            self._paths = self.dirs + files
+            self._prints = fingerprint(self._paths)
+
+    @classmethod
+    def of(cls, xsh, gitdir: str, toplevel: "str|None") -> "WorkTree|None":
+        """The tree of the repository, listed again when the index changed"""
+        if toplevel is None:
+            return None
+        index = fingerprint([os.path.join(gitdir, "index")])
+        tree = cls._current
+        if (
+            tree is not None
+            and tree.toplevel == toplevel
+            and tree.index == index
+            and tree.valid
+        ):
+            return tree
+        if tree is not None:
+            tree.close()
+        tree = cls._current = cls(xsh, toplevel, index)
+        return tree
+
+    @property
+    def valid(self) -> bool:
+        return self._watcher is None or self._watcher.valid
+
+    def changed(self) -> bool:
+        """Whether something may have changed since the tree was listed or
+        this method was last called."""
+        if self._watcher is not None:
+            return self._watcher.changed() or not self._watcher.valid
+        if self._paths is not None:
+            prints = fingerprint(self._paths)
+            changed, self._prints = prints != self._prints, prints
+            return changed
+        return True
+
+    def close(self):
+        if self._watcher is not None:
+            self._watcher.close()
+
+
+@GitStatusPromptField.wrap()
+def snapshot(fld, ctx: PromptFields):
+    """The :class:`GitSnapshot` of the current repository.
+
+    It is reused from the previous prompt when nothing changed, in which case
+    no git command is run. When ``git status`` had to run, but its output
+    and the files with unstaged changes are the same, the previous snapshot
+    is kept along with the outputs of the other git commands.
+    """
+    gitdir = os.path.abspath(ctx.pick_val(repo_path))
+    prev = fld.value if isinstance(fld.value, GitSnapshot) else None
+    if prev is not None and prev.gitdir == gitdir and not prev.stale():
+        return
+    snap = GitSnapshot.take(ctx.xsh, gitdir, repo_path.toplevel)
+    if prev is not None and snap.same_as(prev):
+        prev.tree = snap.tree
+        return
+    fld.value = snap
+
+
+@GitStatusPromptField.wrap(prefix=":")
+def short_head(fld, ctx: PromptFields):
+    fld.value = ctx.pick_val(snapshot).short_head
+
+
+tag = _GSField(_args=("git", "describe", "--always"))
+
+
+@GitStatusPromptField.wrap()
+def tag_or_hash(fld: PromptField, ctx):
+    fld.value = ctx.pick(tag) or ctx.pick(short_head)
+
+
+@GitStatusPromptField.wrap(prefix="⚑")
+def stash_count(fld: PromptField, ctx: PromptFields):
+    fld.value = ctx.pick_val(snapshot).stash_count
+
+
 @GitStatusPromptField.wrap(prefix="{CYAN}", separator="|")
 def operations(fld, ctx: PromptFields) -> None:
-    gitdir = ctx.pick_val(repo_path)
-    op = fld.separator.join(get_operations(gitdir))
+    op = fld.separator.join(ctx.pick_val(snapshot).operations)
     if op:
         fld.value = fld.separator + op
     else:
@@ -192,52 +494,16 @@ def operations(fld, ctx: PromptFields) -> None:
 @GitStatusPromptField.wrap()
 def porcelain(fld, ctx: PromptFields):
     """Return parsed values from ``git status --porcelain``"""
-
-    status = _get_sp_output(ctx.xsh, "git", "status", "--porcelain", "--branch")
-    branch = ""
-    ahead, behind = 0, 0
-    untracked, changed, deleted, conflicts, staged = 0, 0, 0, 0, 0
-    for line in status.splitlines():
-        if line.startswith("##"):
-            line = line[2:].strip()
-            if "Initial commit on" in line:
-                branch = line.split()[-1]
-            elif "no branch" in line:
-                branch = ctx.pick(tag_or_hash) or ""
-            elif "..." not in line:
-                branch = line
-            else:
-                branch, rest = line.split("...")
-                if " " in rest:
-                    divergence = rest.split(" ", 1)[-1]
-                    divergence = divergence.strip("[]")
-                    for div in divergence.split(", "):
-                        if "ahead" in div:
-                            ahead = int(div[len("ahead ") :].strip())
-                        elif "behind" in div:
-                            behind = int(div[len("behind ") :].strip())
-        elif line.startswith("??"):
-            untracked += 1
-        else:
-            if len(line) > 1:
-                if line[1] == "M":
-                    changed += 1
-                elif line[1] == "D":
-                    deleted += 1
-            if len(line) > 0 and line[0] == "U":
-                conflicts += 1
-            elif len(line) > 0 and line[0] != " ":
-                staged += 1
-
+    snap = ctx.pick_val(snapshot)
     fld.value = {
-        "branch": branch,
-        "ahead": ahead,
-        "behind": behind,
-        "untracked": untracked,
-        "changed": changed,
-        "deleted": deleted,
-        "conflicts": conflicts,
-        "staged": staged,
+        "branch": snap.head or ctx.pick(tag_or_hash) or "",
+        "ahead": snap.ahead,
+        "behind": snap.behind,
+        "untracked": snap.untracked,
+        "changed": snap.changed,
+        "deleted": snap.deleted,
+        "conflicts": snap.conflicts,
+        "staged": snap.staged,
     }
 
 
@@ -264,15 +530,22 @@ deleted = _GSInfo(prefix="{RED}-", suffix="{RESET}", info="deleted")
 conflicts = _GSInfo(prefix="{RED}×", suffix="{RESET}", info="conflicts")
 staged = _GSInfo(prefix="{RED}●", suffix="{RESET}", info="staged")
 
+NUMSTAT_MAX_PATHS = 64
+"""Above this number of changed files, ``git diff`` looks at the whole tree"""
+
 
 @GitStatusPromptField.wrap()
 def numstat(fld, ctx):
-    changed = _get_sp_output(ctx.xsh, "git", "diff", "--numstat")
-
     insert = 0
     delete = 0
 
-    if changed:
+    paths = ctx.pick_val(snapshot).unstaged_paths
+    if paths:
+        args = ["git", "diff", "--numstat"]
+        if len(paths) <= NUMSTAT_MAX_PATHS:
+            args.append("--")
+            args.extend(f":(top,literal){path}" for path in paths)
+        changed = ctx.pick_val(snapshot).git(ctx.xsh, *args)
         for line in changed.splitlines():
             x = line.split(maxsplit=2)
             if len(x) > 1:
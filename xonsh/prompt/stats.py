@@ -0,0 +1,94 @@
+"""Timing statistics of the prompt fields, see ``xonfig prompt-stats``"""
+
+import collections
+import math
+import sys
+import threading
+import typing as tp
+
+from xonsh.built_ins import XSH
+from xonsh.events import events
+
+WINDOW = 100
+"""number of the latest computations of a field the percentiles are taken from"""
+
+events.doc(
+    "on_prompt_field_timing",
+    """
+on_prompt_field_timing(field: str, seconds: float) -> None
+
+Fired after a prompt field was computed, with the wall time it took. It may be
+fired from the threads of the async prompt.
+""",
+)
+
+
+class FieldStats:
+    """Rolling wall times of a prompt field"""
+
+    def __init__(self):
+        self.count = 0
+        self.timeouts = 0
+        self.times: "collections.deque[float]" = collections.deque(maxlen=WINDOW)
+
+    def percentile(self, pct: float) -> float:
+        """nearest-rank percentile of the latest times, in seconds"""
+        if not self.times:
+            return 0.0
+        times = sorted(self.times)
+        return times[max(0, math.ceil(len(times) * pct / 100) - 1)]
+
+    def summary(self) -> tp.Dict[str, tp.Any]:
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self.times, default=0.0),
+            "timeouts": self.timeouts,
+        }
+
+
+_STATS: tp.Dict[str, FieldStats] = {}
+_LOCK = threading.Lock()
+
+
+def _stats_of(field: str) -> FieldStats:
+    stats = _STATS.get(field)
+    if stats is None:
+        stats = _STATS.setdefault(field, FieldStats())
+    return stats
+
+
+def record(field: str, seconds: float):
+    """Add the wall time of a computation of the field"""
+    with _LOCK:
+        stats = _stats_of(field)
+        stats.count += 1
+        stats.times.append(seconds)
+    events.on_prompt_field_timing.fire(field=field, seconds=seconds)
+    limit = XSH.env.get("PROMPT_FIELD_WARN_TIME") if XSH.env is not None else None
+    if limit and seconds > limit:
+        print(
+            f"prompt: field {field!r} took {seconds:.3f}s "
+            f"(more than $PROMPT_FIELD_WARN_TIME={limit})",
+            file=sys.stderr,
+        )
+
+
+def record_timeout(field: str):
+    """Count a field that the async prompt stopped waiting for"""
+    with _LOCK:
+        _stats_of(field).timeouts += 1
+
+
+def summary() -> tp.Dict[str, tp.Dict[str, tp.Any]]:
+    """Statistics of every field computed so far, slowest first"""
+    with _LOCK:
+        result = {name: stats.summary() for name, stats in _STATS.items()}
+    return dict(sorted(result.items(), key=lambda item: -item[1]["p95"]))
+
+
+def clear():
+    """Forget the statistics"""
+    with _LOCK:
+        _STATS.clear()
@@ -1,6 +1,7 @@
 """Prompt formatter for simple version control branches"""
 # pylint:disable=no-member, invalid-name
 import contextlib
+import itertools
 import os
 import pathlib
 import queue
@@ -11,7 +12,9 @@ import threading
 
 import xonsh.tools as xt
 from xonsh.built_ins import XSH
+from xonsh.fswatch import fingerprint
 from xonsh.lazyasd import LazyObject
+from xonsh.prompt.base import field_deps
 
 RE_REMOVE_ANSI = LazyObject(
     lambda: re.compile(r"(?:\x1B[@-_]|[\x80-\x9F])[0-?]*[ -/]*[@-~]"),
@@ -19,6 +22,97 @@ RE_REMOVE_ANSI = LazyObject(
     "RE_REMOVE_ANSI",
 )
 
+RE_GIT_OID = LazyObject(
+    lambda: re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?"),
+    globals(),
+    "RE_GIT_OID",
+)
+
+_FOUND_MAX = 256
+_FOUND: "dict[tuple[str, str], tuple[list[str], tuple, str|None]]" = {}
+"""(marker, directory) -> (directories searched, their fingerprint, result)"""
+
+
+def _find_up(marker: str, path: str) -> "str|None":
+    """Find the closest directory containing ``marker``, from ``path`` up.
+
+    The result is cached per directory, and searched again when one of the
+    directories looked at was modified (e.g. by ``git init``).
+    """
+    key = (marker, path)
+    cached = _FOUND.get(key)
+    if cached is not None:
+        dirs, prints, found = cached
+        if fingerprint(dirs) == prints:
+            return found
+    dirs = []
+    found = None
+    curr = path
+    while True:
+        dirs.append(curr)
+        if os.path.lexists(os.path.join(curr, marker)):
+            found = curr
+            break
+        parent = os.path.dirname(curr)
+        if parent == curr:
+            break
+        curr = parent
+    if len(_FOUND) >= _FOUND_MAX:
+        _FOUND.clear()
+    _FOUND[key] = (dirs, fingerprint(dirs), found)
+    return found
+
+
+def _vc_cwd():
+    return XSH.env.get("PWD") or os.getcwd()
+
+
+def find_git_dir(path=None) -> "str|None":
+    """Find the git directory of the repository containing ``path``
+    (the current directory by default), without running git.
+
+    ``.git`` files, as used by worktrees and submodules, are followed.
+    """
+    path = path or _vc_cwd()
+    gitdir = XSH.env.get("GIT_DIR") if XSH.env else None
+    if gitdir:
+        return os.path.join(path, gitdir)
+    root = _find_up(".git", path)
+    if root is None:
+        return None
+    gitdir = os.path.join(root, ".git")
+    if os.path.isfile(gitdir):
+        with contextlib.suppress(OSError):
+            with open(gitdir) as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                return os.path.join(root, content[len("gitdir:") :].strip())
+        return None
+    return gitdir
+
+
+def find_hg_root(path=None) -> "str|None":
+    """Find the root of the mercurial repository containing ``path``
+    (the current directory by default)."""
+    return _find_up(".hg", path or _vc_cwd())
+
+
+def _read_git_head(gitdir: str) -> "str|None":
+    """Get the branch, or the short hash of a detached HEAD, from the
+    ``HEAD`` file. Returns None for anything git should be asked about."""
+    try:
+        with open(os.path.join(gitdir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        branch = head[len("ref: refs/heads/") :]
+        # repositories using reftable keep a placeholder in HEAD
+        return None if branch == ".invalid" else branch
+    if RE_GIT_OID.fullmatch(head):
+        return head[:7]
+    return None
+
 
 def _run_git_cmd(cmd):
     # create a safe detyped env dictionary and update with the additional git environment variables
@@ -46,7 +140,20 @@ def _get_git_branch(q):
 def get_git_branch():
     """Attempts to find the current git branch. If this could not
     be determined (timeout, not in a git repo, etc.) then this returns None.
+
+    The branch is read from the ``HEAD`` file of the repository. Git is only
+    run when that file can't be understood.
     """
+    gitdir = find_git_dir()
+    if gitdir is None:
+        return None
+    branch = _read_git_head(gitdir)
+    if branch is not None:
+        return branch
+    return _run_git_branch()
+
+
+def _run_git_branch():
     branch = None
     timeout = XSH.env.get("VC_BRANCH_TIMEOUT")
     q = queue.Queue()
@@ -63,39 +170,15 @@ def get_git_branch():
     return branch
 
 
-def _get_hg_root(q):
-    _curpwd = XSH.env["PWD"]
-    while True:
-        if not os.path.isdir(_curpwd):
-            return False
-        try:
-            dot_hg_is_in_curwd = any([b.name == ".hg" for b in os.scandir(_curpwd)])
-        except OSError:
-            return False
-        if dot_hg_is_in_curwd:
-            q.put(_curpwd)
-            break
-        else:
-            _oldpwd = _curpwd
-            _curpwd = os.path.split(_curpwd)[0]
-            if _oldpwd == _curpwd:
-                return False
-
-
 def get_hg_branch(root=None):
     """Try to get the mercurial branch of the current directory,
-    return None if not in a repo or subprocess.TimeoutExpired if timed out.
+    return None if not in a repo.
     """
     env = XSH.env
-    timeout = env["VC_BRANCH_TIMEOUT"]
-    q = queue.Queue()
-    t = threading.Thread(target=_get_hg_root, args=(q,))
-    t.start()
-    t.join(timeout=timeout)
-    try:
-        root = pathlib.Path(q.get_nowait())
-    except queue.Empty:
+    root = root or find_hg_root()
+    if root is None:
         return None
+    root = pathlib.Path(root)
     if env.get("VC_HG_SHOW_BRANCH"):
         # get branch name
         branch_path = root / ".hg" / "branch"
@@ -154,6 +237,28 @@ def _vc_has(binary):
         return bool(cmds.lazy_locate_binary(binary, ignore_alias=True))
 
 
+_UNCACHED = itertools.count()
+
+
+def _branch_files():
+    """The state of the files the branch is read from. When git has to be
+    asked for the branch, the result changes for every call."""
+    gitdir = find_git_dir()
+    hgroot = find_hg_root()
+    paths = []
+    if gitdir is not None:
+        if _read_git_head(gitdir) is None:
+            return next(_UNCACHED)
+        paths.append(os.path.join(gitdir, "HEAD"))
+    if hgroot is not None:
+        paths.extend(
+            os.path.join(hgroot, ".hg", name)
+            for name in ("branch", "bookmarks.current", "topic")
+        )
+    return gitdir, hgroot, fingerprint(paths)
+
+
+@field_deps("$PWD", "$GIT_DIR", "$VC_HG_SHOW_BRANCH", _branch_files)
 def current_branch():
     """Gets the branch for a current working directory. Returns an empty string
     if the cwd is not a repository.  This currently only works for git and hg
@@ -240,9 +345,9 @@ def dirty_working_directory():
     None. Currently supports git and hg.
     """
     dwd = None
-    if _vc_has("git"):
+    if _vc_has("git") and find_git_dir() is not None:
         dwd = git_dirty_working_directory()
-    if dwd is None and _vc_has("hg"):
+    if dwd is None and _vc_has("hg") and find_hg_root() is not None:
         dwd = hg_dirty_working_directory()
     return dwd
 
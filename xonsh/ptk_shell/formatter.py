@@ -3,6 +3,7 @@
 import functools
 import typing as tp
 
+from xonsh.built_ins import XSH
 from xonsh.prompt.base import DEFAULT_PROMPT, PromptFormatter
 from xonsh.ptk_shell.updator import AsyncPrompt, PromptUpdator
 
@@ -14,16 +15,15 @@ class PTKPromptFormatter(PromptFormatter):
         super().__init__()
         self.shell = shell
 
-    def __call__(
+    def _render(
         self,
-        template=DEFAULT_PROMPT,
-        fields=None,
+        template,
+        fields,
+        finish,
         threaded=False,
         prompt_name: str = None,
         **_,
-    ) -> str:
-        """Formats a xonsh prompt template string."""
-
+    ):
         kwargs = {}
         if threaded:
             # init only for async prompts
@@ -34,8 +34,7 @@ class PTKPromptFormatter(PromptFormatter):
             # set these attributes per call. one can enable/disable async-prompt inside a session.
             kwargs["async_prompt"] = self.updator.add(prompt_name)
 
-        # in case of failure it returns a fail-over template. otherwise it returns list of tokens
-        return super().__call__(template, fields, **kwargs)
+        return super()._render(template, fields, finish, **kwargs)
 
     def _format_prompt(
         self,
@@ -56,8 +55,17 @@ class PTKPromptFormatter(PromptFormatter):
     ):
         func = functools.partial(super()._get_field_value, field)
         if async_prompt is not None and self.fields.needs_calling(field):
+            inputs = self.fields.inputs_of(field)
+            if inputs is None:
+                # without declared inputs, reuse a computation in the same directory only
+                inputs = XSH.env.get("PWD")
+            timeout = getattr(self.fields[field], "timeout", None)
+            if timeout is None:
+                timeout = XSH.env.get("ASYNC_PROMPT_FIELD_TIMEOUT") or None
             # create a thread and return an intermediate result
-            return async_prompt.submit_section(func, field, idx, spec, conv)
+            return async_prompt.submit_section(
+                func, field, idx, spec, conv, inputs=inputs, timeout=timeout
+            )
         return func()
 
     def start_update(self):
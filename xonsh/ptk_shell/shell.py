@@ -421,13 +421,12 @@ class PromptToolkitShell(BaseShell):
             return kwargs.pop("default")
 
         try:
-            p = self.prompt_formatter(
+            toks = self.prompt_formatter.color_tokens(
                 template=p, threaded=env["ENABLE_ASYNC_PROMPT"], prompt_name=prompt_name
             )
         except Exception:  # pylint: disable=broad-except
             print_exception()
-
-        toks = partial_color_tokenize(p)
+            toks = partial_color_tokenize(p)
 
         return tokenize_ansi(PygmentsTokens(toks))
 
@@ -1,32 +1,64 @@
 """Has classes that help updating Prompt sections using Threads."""
 
 import concurrent.futures
+import itertools
 import threading
+import time
 import typing as tp
 
 from prompt_toolkit import PromptSession
 from prompt_toolkit.formatted_text import PygmentsTokens
 
 from xonsh.built_ins import XSH
-from xonsh.prompt.base import ParsedTokens
-from xonsh.style_tools import partial_color_tokenize, style_as_faded
+from xonsh.prompt import stats as prompt_stats
+from xonsh.prompt.base import ParsedTokens, prompt_thread_pool
+from xonsh.style_tools import style_as_faded
 
 
 class Executor:
-    """Caches thread results across prompts."""
+    """Caches thread results across prompts.
+
+    A field that is still being computed for the same inputs is not submitted
+    again, the new prompt waits for the running computation instead. So a slow
+    field takes at most one worker, however fast the prompts follow each other.
+    """
 
     def __init__(self):
-        self.thread_pool = concurrent.futures.ThreadPoolExecutor(
-            max_workers=XSH.env["ASYNC_PROMPT_THREAD_WORKERS"]
-        )
+        self.thread_pool = prompt_thread_pool()
 
         # the attribute, .cache is cleared between calls.
         # This caches results from callback alone by field name.
         self.thread_results = {}
 
-    def submit(self, func: tp.Callable, field: str):
-        future = self.thread_pool.submit(self._run_func, func, field)
+        # field -> (inputs, future) of the last computation submitted
+        self._running: tp.Dict[str, tp.Tuple[tp.Any, concurrent.futures.Future]] = {}
+        # number of prompts waiting on a future
+        self._holders: tp.Dict[concurrent.futures.Future, int] = {}
+        # field -> submission number of the value in thread_results
+        self._result_seq: tp.Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    def submit(self, func: tp.Callable, field: str, inputs=None):
+        """Submit the computation of a field, unless it is already running for
+        the same ``inputs``.
+
+        Returns the future, the value to show until it is done and the
+        placeholder of the field.
+        """
         place_holder = "{" + field + "}"
+        with self._lock:
+            running = self._running.get(field)
+            if running is None or running[1].done() or running[0] != inputs:
+                future = self.thread_pool.submit(
+                    self._run_func, func, field, next(self._seq)
+                )
+                self._running[field] = (inputs, future)
+                future.add_done_callback(self._forget)
+            else:
+                future = running[1]
+            if not future.done():
+                self._holders[future] = self._holders.get(future, 0) + 1
 
         return (
             future,
@@ -38,12 +70,31 @@ class Executor:
             place_holder,
         )
 
-    def _run_func(self, func, field):
-        """Run the callback and store the result."""
+    def release(self, future: concurrent.futures.Future):
+        """A prompt no longer waits for the future. It is cancelled if it
+        hasn't started and no other prompt waits for it."""
+        with self._lock:
+            holders = self._holders.get(future, 1) - 1
+            if holders > 0:
+                self._holders[future] = holders
+                return
+            self._holders.pop(future, None)
+        future.cancel()
+
+    def _forget(self, future):
+        with self._lock:
+            self._holders.pop(future, None)
+
+    def _run_func(self, func, field, seq=0):
+        """Run the callback and store the result, unless a later submission
+        of the same field finished first."""
         result = func()
-        self.thread_results[field] = (
-            result if result is None else style_as_faded(result)
-        )
+        with self._lock:
+            if seq >= self._result_seq.get(field, -1):
+                self._result_seq[field] = seq
+                self.thread_results[field] = (
+                    result if result is None else style_as_faded(result)
+                )
         return result
 
 
@@ -69,11 +120,19 @@ class AsyncPrompt:
         self.session = session
         self.executor = executor
 
-        # (Key: the future object) that is created for the (value: index/field_name) in the tokens list
+        # (Key: the future object) that is created for the (value: index/field_name) in the tokens list.
+        # A field used twice in the prompt shares the future.
         self.futures: tp.Dict[
             concurrent.futures.Future,
-            tp.Tuple[str, tp.Optional[int], tp.Optional[str], tp.Optional[str]],
+            tp.List[
+                tp.Tuple[str, tp.Optional[int], tp.Optional[str], tp.Optional[str]]
+            ],
         ] = {}
+        # when to stop waiting for a future, the prompt keeps the last value then
+        self.deadlines: tp.Dict[concurrent.futures.Future, float] = {}
+
+        # done once a newer prompt replaced this one, its results are discarded then
+        self.stopped: concurrent.futures.Future = concurrent.futures.Future()
 
     def start_update(self, on_complete):
         """Listen on futures and update the prompt as each one completed.
@@ -88,18 +147,43 @@ class AsyncPrompt:
         if not self.tokens:
             print(f"Warn: AsyncPrompt is created without tokens - {self.name}")
             return
-        for fut in concurrent.futures.as_completed(self.futures):
-            try:
-                val = fut.result()
-            except concurrent.futures.CancelledError:
-                continue
+        pending = set(self.futures)
+        while pending:
+            deadline = min((self.deadlines.get(fut, float("inf")) for fut in pending))
+            timeout = None if deadline == float("inf") else deadline - time.monotonic()
+            done, pending = concurrent.futures.wait(
+                pending | {self.stopped},
+                timeout=None if timeout is None else max(timeout, 0),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            if self.stopped.done():
+                # a new prompt was started, whatever is left belongs to the old one
+                return
+            pending.discard(self.stopped)
+            for fut in done:
+                self._update_tokens(fut)
+            now = time.monotonic()
+            for fut in [f for f in pending if self.deadlines.get(f, now + 1) <= now]:
+                pending.discard(fut)
+                targets = self.futures.get(fut)
+                if targets:
+                    placeholder = targets[0][0]
+                    prompt_stats.record_timeout(placeholder[1:-1])
 
-            if fut not in self.futures:
-                # rare case where the future is completed but the container is already cleared
-                # because new prompt is called
-                continue
+        on_complete(self.name)
 
-            placeholder, idx, spec, conv = self.futures[fut]
+    def _update_tokens(self, fut):
+        try:
+            val = fut.result()
+        except concurrent.futures.CancelledError:
+            return
+
+        if fut not in self.futures:
+            # rare case where the future is completed but the container is already cleared
+            # because new prompt is called
+            return
+
+        for placeholder, idx, spec, conv in self.futures[fut]:
             # example: placeholder="{field}", idx=10, spec="env: {}"
 
             if isinstance(idx, int):
@@ -110,10 +194,8 @@ class AsyncPrompt:
                         val = ptok.value.replace(placeholder, val)
                         self.tokens.update(idx, val, spec, conv)
 
-            # calling invalidate in less period is inefficient
-            self.invalidate()
-
-        on_complete(self.name)
+        # calling invalidate in less period is inefficient
+        self.invalidate()
 
     def invalidate(self):
         """Create a timer to update the prompt. The timing can be configured through env variables.
@@ -125,10 +207,9 @@ class AsyncPrompt:
             self.timer.cancel()
 
         def _invalidate():
-            new_prompt = self.tokens.process()
-            formatted_tokens = tokenize_ansi(
-                PygmentsTokens(partial_color_tokenize(new_prompt))
-            )
+            if self.stopped.done():
+                return
+            formatted_tokens = tokenize_ansi(PygmentsTokens(self.tokens.color_tokens()))
             setattr(self.session, self.name, formatted_tokens)
             self.session.app.invalidate()
 
@@ -136,10 +217,17 @@ class AsyncPrompt:
         self.timer.start()
 
     def stop(self):
-        """Stop any running threads"""
-        for fut in self.futures:
-            fut.cancel()
+        """Stop any running threads.
+        Running fields are kept going, a newer prompt may wait for them."""
+        if not self.stopped.done():
+            self.stopped.set_result(None)
+        if self.timer:
+            self.timer.cancel()
+        for fut, targets in self.futures.items():
+            for _ in targets:
+                self.executor.release(fut)
         self.futures.clear()
+        self.deadlines.clear()
 
     def submit_section(
         self,
@@ -148,9 +236,27 @@ class AsyncPrompt:
         idx: tp.Optional[int] = None,
         spec: tp.Optional[str] = None,
         conv=None,
+        inputs=None,
+        timeout: tp.Optional[float] = None,
     ):
-        future, intermediate_value, placeholder = self.executor.submit(func, field)
-        self.futures[future] = (placeholder, idx, spec, conv)
+        """Compute a field in the background.
+
+        Parameters
+        ----------
+        inputs
+            values the field depends on, a computation of the field that is
+            still running for the same inputs is reused
+        timeout
+            seconds after which the prompt stops waiting for the field.
+            ``None`` waits until it is done.
+        """
+        future, intermediate_value, placeholder = self.executor.submit(
+            func, field, inputs
+        )
+        self.futures.setdefault(future, []).append((placeholder, idx, spec, conv))
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            self.deadlines[future] = max(deadline, self.deadlines.get(future, 0))
         return intermediate_value
 
 
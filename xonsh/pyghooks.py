@@ -1,4 +1,5 @@
 """Hooks for pygments syntax highlighting."""
+import functools
 import os
 import re
 import stat
@@ -86,6 +87,7 @@ FALLBACK_STYLE_DICT = LazyObject(
 )
 
 
+@functools.lru_cache(maxsize=1024)
 def color_by_name(name, fg=None, bg=None):
     """Converts a color name to a color token, foreground name,
     and background name.  Will take into consideration current foreground
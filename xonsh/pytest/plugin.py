@@ -17,7 +17,7 @@ import pytest
 from xonsh import commands_cache
 from xonsh.aliases import Aliases
 from xonsh.built_ins import XSH, XonshSession
-from xonsh.completer import Completer
+from xonsh.completer import Completer, invalidate_cache, watch_cache_events
 from xonsh.events import events
 from xonsh.execer import Execer
 from xonsh.jobs import get_tasks
@@ -326,6 +326,10 @@ def completer_obj():
 def check_completer(completer_obj):
     """Helper function to run completer and parse the results as set of strings"""
     completer = completer_obj
+    # the completions cached during other tests are stale, and the events
+    # are renewed for every test
+    invalidate_cache()
+    watch_cache_events()
 
     def _factory(
         line: str, prefix: "None|str" = "", send_original=False, complete_fn=None
@@ -1,4 +1,5 @@
 """Xonsh color styling tools that simulate pygments, when it is unavailable."""
+import functools
 from collections import defaultdict
 
 from xonsh.color_tools import RE_BACKGROUND, iscolor, warn_deprecated_no_color
@@ -63,24 +64,85 @@ def partial_color_tokenize(template):
     of tuples mapping the token to the string which has that color.
     These sub-strings maybe templates themselves.
     """
+    styles = _current_styles()
+    color = Color.RESET
+    try:
+        toks, color = _partial_color_tokenize_main(template, styles)
+    except Exception:
+        toks = [(Color.RESET, template)]
+    if styles is not None:
+        styles[color]  # ensure color is available
+    return toks
+
+
+def _current_styles():
     from xonsh.built_ins import XSH
 
     if HAS_PYGMENTS and XSH.shell is not None:
-        styles = XSH.shell.shell.styler.styles
+        return XSH.shell.shell.styler.styles
     elif XSH.shell is not None:
-        styles = DEFAULT_STYLE_DICT
-    else:
-        styles = None
+        return DEFAULT_STYLE_DICT
+    return None
+
+
+def partial_color_tokenize_parts(parts):
+    """Same as ``partial_color_tokenize("".join(parts))``. The parsing of
+    each part is cached, so that only the parts that changed since an earlier
+    call are parsed again.
+    """
+    styles = _current_styles()
     color = Color.RESET
+    fg = bg = None
+    value = ""
+    toks = []
     try:
-        toks, color = _partial_color_tokenize_main(template, styles)
+        for part in parts:
+            events, fg, bg = _parse_color_part(part, fg, bg)
+            for event in events:
+                if type(event) is str:
+                    value += event
+                elif event is not color:
+                    if len(value) > 0:
+                        toks.append((color, value))
+                        if styles is not None:
+                            styles[color]  # ensure color is available
+                    color = event
+                    value = ""
     except Exception:
-        toks = [(Color.RESET, template)]
+        # e.g. a brace escaped in one part and closed in the next one
+        return partial_color_tokenize("".join(parts))
+    toks.append((color, value))
     if styles is not None:
         styles[color]  # ensure color is available
     return toks
 
 
+@functools.lru_cache(maxsize=512)
+def _parse_color_part(part, fg, bg):
+    """Split a part of a template into texts and the colors it switches to,
+    given the foreground and background colors set before it."""
+    events = []
+    for literal, field, spec, conv in FORMATTER.parse(part):
+        if literal:
+            events.append(literal)
+        if field is None:
+            continue
+        if iscolor(field):
+            color, fg, bg = color_by_name(field, fg, bg)
+            events.append(color)
+        else:
+            parts = ["{", field]
+            if conv is not None and len(conv) > 0:
+                parts.append("!")
+                parts.append(conv)
+            if spec is not None and len(spec) > 0:
+                parts.append(":")
+                parts.append(spec)
+            parts.append("}")
+            events.append("".join(parts))
+    return tuple(events), fg, bg
+
+
 def _partial_color_tokenize_main(template, styles):
     bopen = "{"
     bclose = "}"
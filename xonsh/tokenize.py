@@ -867,7 +867,7 @@ def tokopen(filename):
         raise
 
 
-def _tokenize(readline, encoding, tolerant=False):
+def _tokenize(readline, encoding, tolerant=False, checkpoint=None, resume=None):
     lnum = parenlev = continued = 0
     numchars = "0123456789"
     contstr, needcont = "", 0
@@ -880,12 +880,29 @@ def _tokenize(readline, encoding, tolerant=False):
     async_def_indent = 0
     async_def_nl = False
 
-    if encoding is not None:
+    if resume is not None:
+        encoding, lnum, indents, async_def, async_def_indent, async_def_nl = resume
+        indents = list(indents)
+    elif encoding is not None:
         if encoding == "utf-8-sig":
             # BOM will already have been stripped.
             encoding = "utf-8"
         yield TokenInfo(ENCODING, encoding, (0, 0), (0, 0), "")
     while True:  # loop over lines in stream
+        if checkpoint is not None and not (
+            contstr or parenlev or continued or stashed
+        ):
+            # nothing is pending, the following lines may be lexed on their own
+            checkpoint(
+                (
+                    encoding,
+                    lnum,
+                    tuple(indents),
+                    async_def,
+                    async_def_indent,
+                    async_def_nl,
+                )
+            )
         try:
             line = readline()
         except StopIteration:
@@ -1139,7 +1156,7 @@ def _tokenize(readline, encoding, tolerant=False):
     yield TokenInfo(ENDMARKER, "", (lnum, 0), (lnum, 0), "")
 
 
-def tokenize(readline, tolerant=False):
+def tokenize(readline, tolerant=False, checkpoint=None, resume=None):
     """
     The tokenize() generator requires one argument, readline, which
     must be a callable object which provides the same interface as the
@@ -1160,12 +1177,25 @@ def tokenize(readline, tolerant=False):
 
     If ``tolerant`` is True, yield ERRORTOKEN with the erroneous string instead of
     throwing an exception when encountering an error.
+
+    If ``checkpoint`` is given, it is called with the state of the tokenizer,
+    as an opaque tuple, before each line that starts a new statement with no
+    bracket, string or line continuation pending.  Passing such a state as
+    ``resume`` tokenizes the lines that followed it, as read from ``readline``,
+    as if the preceding lines had just been tokenized.
     """
-    encoding, consumed = detect_encoding(readline)
+    if resume is None:
+        encoding, consumed = detect_encoding(readline)
+    else:
+        encoding, consumed = None, []
     rl_gen = iter(readline, b"")
     empty = itertools.repeat(b"")
     return _tokenize(
-        itertools.chain(consumed, rl_gen, empty).__next__, encoding, tolerant
+        itertools.chain(consumed, rl_gen, empty).__next__,
+        encoding,
+        tolerant,
+        checkpoint=checkpoint,
+        resume=resume,
     )
 
 
@@ -25,6 +25,7 @@ import datetime
 import functools
 import glob
 import itertools
+import keyword
 import operator
 import os
 import pathlib
@@ -349,16 +350,45 @@ def _is_not_lparen_and_rparen(lparens, rtok):
     return rtok.type == "RPAREN" and any(x != "LPAREN" for x in lparens)
 
 
+def _line_tokens(line, lexer):
+    """The tokens of ``line``, shared with every other helper looking at the
+    same line when the lexer supports immutable token arrays.
+    """
+    if hasattr(lexer, "token_array"):
+        return lexer.token_array(line)
+    lexer.input(line)
+    return list(lexer)
+
+
+def _col_tokens(line, mincol, maxcol, lexer):
+    """The tokens of ``line[mincol:maxcol]``, with positions relative to
+    ``mincol``.  For a single physical line whose tokens (and comment) do
+    not straddle ``mincol`` or ``maxcol``, these are sliced from the tokens of
+    the whole line instead of lexing the substring again.  Returns a ``(tokens,
+    offset)`` tuple, where ``offset`` must be added to ``lexpos``.
+    """
+    if (
+        hasattr(lexer, "token_array")
+        and "\n" not in line.rstrip("\n")
+        and "#" not in line[:mincol]
+    ):
+        arr = lexer.token_array(line)
+        if arr.is_boundary(mincol) and (maxcol is None or arr.is_boundary(maxcol)):
+            return arr.slice_cols(mincol, maxcol), 0
+    lexer.input(line[mincol:maxcol])
+    return lexer, mincol
+
+
 def balanced_parens(line, mincol=0, maxcol=None, lexer=None):
     """Determines if parentheses are balanced in an expression."""
-    line = line[mincol:maxcol]
     if lexer is None:
         lexer = xsh.execer.parser.lexer
-    if "(" not in line and ")" not in line:
+    part = line[mincol:maxcol]
+    if "(" not in part and ")" not in part:
         return True
     cnt = 0
-    lexer.input(line)
-    for tok in lexer:
+    toks, _ = _col_tokens(line, mincol, maxcol, lexer)
+    for tok in toks:
         if tok.type in LPARENS:
             cnt += 1
         elif tok.type == "RPAREN":
@@ -372,8 +402,7 @@ def ends_with_colon_token(line, lexer=None):
     """Determines whether a line ends with a colon token, ignoring comments."""
     if lexer is None:
         lexer = xsh.execer.parser.lexer
-    lexer.input(line)
-    toks = list(lexer)
+    toks = _line_tokens(line, lexer)
     return len(toks) > 0 and toks[-1].type == "COLON"
 
 
@@ -382,29 +411,28 @@ def find_next_break(line, mincol=0, lexer=None):
     This function may be useful in finding the maxcol argument of
     subproc_toks().
     """
-    if mincol >= 1:
-        line = line[mincol:]
+    mincol = max(mincol, 0)
     if lexer is None:
         lexer = xsh.execer.parser.lexer
-    if RE_END_TOKS.search(line) is None:
+    if RE_END_TOKS.search(line, mincol) is None:
         return None
     maxcol = None
     lparens = []
-    lexer.input(line)
-    for tok in lexer:
+    toks, offset = _col_tokens(line, mincol, None, lexer)
+    for tok in toks:
         if tok.type in LPARENS:
             lparens.append(tok.type)
         elif tok.type in END_TOK_TYPES:
             if _is_not_lparen_and_rparen(lparens, tok):
                 lparens.pop()
             else:
-                maxcol = tok.lexpos + mincol + 1
+                maxcol = tok.lexpos + offset + 1
                 break
         elif tok.type == "ERRORTOKEN" and ")" in tok.value:
-            maxcol = tok.lexpos + mincol + 1
+            maxcol = tok.lexpos + offset + 1
             break
         elif tok.type == "BANG":
-            maxcol = mincol + len(line) + 1
+            maxcol = len(line) + 1
             break
     return maxcol
 
@@ -414,6 +442,46 @@ def _offset_from_prev_lines(line, last):
     return sum(map(len, lines))
 
 
+def _fake_newline(tok, lexpos):
+    if hasattr(tok, "_replace"):
+        # tokens from a token array are shared and immutable
+        return tok._replace(
+            type="NEWLINE", value="\n", lineno=tok.lineno - 1, lexpos=lexpos
+        )
+    tok.type = "NEWLINE"
+    tok.value = "\n"
+    tok.lineno -= 1
+    tok.lexpos = lexpos
+    return tok
+
+
+RE_PLAIN_WORD = LazyObject(
+    lambda: re.compile(r"[A-Za-z0-9_.,:=+%/~^@-]+"), globals(), "RE_PLAIN_WORD"
+)
+RE_PLAIN_WORDS = LazyObject(
+    lambda: re.compile(r"{0}(?:[ \t]+{0})*".format(RE_PLAIN_WORD.pattern)),
+    globals(),
+    "RE_PLAIN_WORDS",
+)
+
+
+def plain_subproc_words(cmd):
+    """Splits a command into its words if each of them is passed on as it is
+    in subprocess mode, i.e. when there is no quoting, globbing, redirection,
+    boolean operator or Python syntax in ``cmd``.  Returns a list of
+    ``(offset, word)`` tuples, or None for any other command.
+    """
+    if RE_PLAIN_WORDS.fullmatch(cmd) is None or cmd.endswith(":"):
+        return None
+    words = [(m.start(), m.group()) for m in RE_PLAIN_WORD.finditer(cmd)]
+    first = words[0][1]
+    if first.startswith("@") or keyword.iskeyword(first):
+        return None
+    if any(w in ("and", "or") for _, w in words):
+        return None
+    return words
+
+
 def subproc_toks(
     line, mincol=-1, maxcol=None, lexer=None, returnline=False, greedy=False
 ):
@@ -426,13 +494,11 @@ def subproc_toks(
         lexer = xsh.execer.parser.lexer
     if maxcol is None:
         maxcol = len(line) + 1
-    lexer.reset()
-    lexer.input(line)
     toks = []
     lparens = []
     saw_macro = False
     end_offset = 0
-    for tok in lexer:
+    for tok in _line_tokens(line, lexer):
         pos = tok.lexpos
         if tok.type not in END_TOK_TYPES and pos >= maxcol:
             break
@@ -469,17 +535,15 @@ def subproc_toks(
             break
         elif tok.type == "DEDENT":
             # fake a newline when dedenting without a newline
-            tok.type = "NEWLINE"
-            tok.value = "\n"
-            tok.lineno -= 1
             if len(toks) >= 2:
                 prev_tok_end = toks[-2].lexpos + len(toks[-2].value)
             else:
                 prev_tok_end = len(line)
             if "#" in line[prev_tok_end:]:
-                tok.lexpos = prev_tok_end  # prevents wrapping comments
+                lexpos = prev_tok_end  # prevents wrapping comments
             else:
-                tok.lexpos = len(line)
+                lexpos = len(line)
+            toks[-1] = _fake_newline(tok, lexpos)
             break
         elif check_bad_str_token(tok):
             return
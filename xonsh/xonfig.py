@@ -679,6 +679,39 @@ def _colors(
     XSH.env["XONSH_COLOR_STYLE"] = style_stash
 
 
+def _prompt_stats(to_json=False, reset=False, _stdout=None):
+    """Prints how long the prompt fields take to compute
+
+    Parameters
+    ----------
+    to_json: -j, --json
+        reports results as json
+    reset: -r, --reset
+        forget the timings recorded so far
+    """
+    from xonsh.prompt import stats
+
+    data = stats.summary()
+    if reset:
+        stats.clear()
+    if to_json:
+        print(json.dumps(data, indent=1), file=_stdout)
+        return
+    if not data:
+        print("No prompt field was computed yet.", file=_stdout)
+        return
+    header = ("field", "count", "p50 ms", "p95 ms", "max ms", "timeouts")
+    rows = [header]
+    for name, vals in data.items():
+        times = [f"{vals[key] * 1000:.2f}" for key in ("p50", "p95", "max")]
+        rows.append((name, str(vals["count"]), *times, str(vals["timeouts"])))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))
+        print("  ".join(cells), file=_stdout)
+
+
 def _tutorial():
     """Launch tutorial in browser."""
     import webbrowser
@@ -722,6 +755,7 @@ class XonfigAlias(ArgParserAlias):
         parser.add_command(_wizard)
         parser.add_command(_styles)
         parser.add_command(_colors)
+        parser.add_command(_prompt_stats)
         parser.add_command(_tutorial)
         for fn in self.extra_commands:
             parser.add_command(fn)
@@ -1,8 +1,139 @@
 """Populate rich completions using fish and remove the default bash based completer"""
 
+import os
+import select
+import subprocess
+import threading
+import time
+import uuid
+
+from xonsh.built_ins import XSH, XonshSession
 from xonsh.completers import completer
-from xonsh.completers.tools import complete_from_sub_proc, contextual_command_completer
+from xonsh.completers.bash_completion import stable_env
+from xonsh.completers.tools import (
+    complete_from_output,
+    complete_from_sub_proc,
+    contextual_command_completer,
+)
 from xonsh.parsers.completion_context import CommandContext
+from xonsh.platform import ON_WINDOWS
+
+# the requests are fish scripts terminated by NUL
+WORKER_SCRIPT = """
+while read -z -l __xonsh_request
+    eval $__xonsh_request
+end
+"""
+
+
+def fish_quote(s: str) -> str:
+    """Quotes a string for fish, where only ``\\`` and ``'`` are escaped
+    inside single quotes."""
+    return "'" + s.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class FishWorker:
+    """A fish process answering ``complete -C`` queries over its stdin and
+    stdout, so that fish starts once instead of on every completion.
+    """
+
+    def __init__(self, env):
+        self.detyped = env
+        self.env = stable_env(env)
+        # printed after each reply, completions can't look like it
+        self.marker = f"__xonsh_fish_{uuid.uuid4().hex}__"
+        self.proc = subprocess.Popen(
+            ["fish", "-c", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def uses(self, env):
+        """Whether the worker runs with the given detyped environment."""
+        return env is self.detyped or stable_env(env) == self.env
+
+    def complete(self, command: str, line: str, cwd: str, timeout: float) -> bytes:
+        """The output of ``complete -C line`` run in ``cwd``.
+
+        Raises ``TimeoutError`` when there is no reply within ``timeout``
+        seconds, and ``OSError`` or ``EOFError`` when the worker died.
+        """
+        request = "; ".join(
+            [
+                f"builtin cd {fish_quote(cwd)}",
+                # switch off basic file completions for the executable
+                f"complete --no-files -- {fish_quote(command)}",
+                f"complete -C {fish_quote(line)}",
+                f"echo {self.marker}",
+            ]
+        )
+        self.proc.stdin.write(os.fsencode(request) + b"\0")
+        self.proc.stdin.flush()
+        end = (self.marker + "\n").encode()
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        data = b""
+        while not data.endswith(end):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError(f"fish did not complete {line!r} in {timeout}s")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("fish completion worker exited")
+            data += chunk
+        return data[: -len(end)]
+
+    def close(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+
+
+_WORKER: "FishWorker | None" = None
+_WORKER_LOCK = threading.Lock()
+
+
+def worker_output(command: str, line: str) -> bytes:
+    """Completes the line with the fish worker, which is (re)started when it
+    is not running or the environment changed. The worker is stopped when it
+    doesn't reply within ``$FISH_COMPLETER_TIMEOUT`` seconds.
+    """
+    global _WORKER
+    env = XSH.env.detype()
+    timeout = XSH.env.get("FISH_COMPLETER_TIMEOUT")
+    with _WORKER_LOCK:
+        worker = _WORKER
+        if worker is not None and not (worker.alive() and worker.uses(env)):
+            worker.close()
+            worker = _WORKER = None
+        try:
+            if worker is None:
+                worker = _WORKER = FishWorker(env)
+            return worker.complete(command, line, os.getcwd(), timeout)
+        except BaseException as e:
+            # a late reply can't be told apart from the next one
+            if worker is not None:
+                worker.close()
+            _WORKER = None
+            if isinstance(e, (OSError, EOFError)):  # TimeoutError is an OSError
+                return b""
+            raise
+
+
+def close_worker():
+    """Stops the fish worker, if there is one."""
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is not None:
+            _WORKER.close()
+            _WORKER = None
 
 
 @contextual_command_completer
@@ -11,20 +142,30 @@ def fish_proc_completer(ctx: CommandContext):
         return
     line = ctx.text_before_cursor
 
-    script_lines = [
-        f"complete --no-files {ctx.command}",  # switch off basic file completions for the executable
-        f"complete -C '{line}'",
-    ]
-
-    return (
-        complete_from_sub_proc(
-            "fish",
-            "-c",
-            "; ".join(script_lines),
-        ),
-        False,
-    )
+    if ON_WINDOWS:
+        script_lines = [
+            # switch off basic file completions for the executable
+            f"complete --no-files -- {fish_quote(ctx.command)}",
+            f"complete -C {fish_quote(line)}",
+        ]
+        comps = complete_from_sub_proc("fish", "-c", "; ".join(script_lines))
+    else:
+        comps = complete_from_output(worker_output(ctx.command, line))
+
+    return comps, False
 
 
-def _load_xontrib_(**_):
+def _load_xontrib_(xsh: XonshSession, **_):
+    xsh.env.register(
+        "FISH_COMPLETER_TIMEOUT",
+        type="float",
+        default=2.0,
+        doc="Seconds to wait for the completions of fish. When they take longer, "
+        "the fish process is restarted and nothing is completed.",
+    )
     completer.add_one_completer("fish", fish_proc_completer, "<bash")
+
+
+def _unload_xontrib_(xsh: XonshSession, **_):
+    close_worker()
+    xsh.env.deregister("FISH_COMPLETER_TIMEOUT")